@@ -4,34 +4,88 @@ app.py
 Flask application entry point.
 This file only does three things:
   1. Creates the Flask app
-  2. Registers blueprints
-  3. Defines the two simple routes that don't belong to a blueprint (/ and /ping)
+  2. Registers blueprints, server-side sessions, admission counting,
+     response compression and the proxy fix-up of the client address
+  3. Defines the simple routes that don't belong to a blueprint (/, /ping,
+     the lazily loaded tool markup at /modules/<name>.html and the service
+     worker at /sw.js)
+and starts background threads: the DB outbox replay (if a previous process
+left writes buffered) and, with SNAPSHOT_SCHEDULER=1, the weekly
+leaderboard snapshot thread.
 
 All business logic lives in services/.
 All route handlers live in routes/.
 All config and clients live in config.py.
 """
 
-from flask import Flask, render_template, session
-from config import FLASK_SECRET_KEY
+import hashlib
+import os
+from flask import Flask, abort, render_template, request, session
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import FLASK_SECRET_KEY, SNAPSHOT_SCHEDULER
 from comics import COMIC_OPTIONS
+from middleware.admission import AdmissionMiddleware
+from middleware.compression import CompressionMiddleware
+from middleware.sessions import ServerSessionInterface
 
 from routes.auth  import auth_bp
 from routes.user  import user_bp
 from routes.tools import tools_bp
+from routes.admin import admin_bp
+from routes.jobs  import jobs_bp
+from services.db_service import DatabaseService
+from services.leaderboard_service import LeaderboardService
 
 # ── App factory ────────────────────────────────────────────────────────────
 app = Flask(__name__)
 app.secret_key = FLASK_SECRET_KEY
+app.session_interface = ServerSessionInterface()
+# Everything under /static is requested with ?v=<SHELL_VERSION>; any other
+# ?v= is downgraded to no-cache by static_cache_control() below
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 365 * 24 * 3600
 
 # ── Register blueprints ────────────────────────────────────────────────────
 app.register_blueprint(auth_bp)
 app.register_blueprint(user_bp)
 app.register_blueprint(tools_bp)
+app.register_blueprint(admin_bp)
+app.register_blueprint(jobs_bp)
+
+# ── Middleware ─────────────────────────────────────────────────────────────
+app.wsgi_app = AdmissionMiddleware(app.wsgi_app)
+app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+# Render's proxy appends the real client to X-Forwarded-For; trust only that
+# one hop so request.remote_addr can't be spoofed by a client-sent header
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+
+# ── Background jobs ────────────────────────────────────────────────────────
+DatabaseService.start_outbox()
+
+# Enable on one process (or use `python cli.py snapshot` from cron instead);
+# extra runs are harmless, snapshots are idempotent.
+if SNAPSHOT_SCHEDULER:
+    LeaderboardService.start_scheduler()
 
 
 # ── Core routes ────────────────────────────────────────────────────────────
 
+# Per-tool frontend modules, loaded on first open by index.html's
+# loadModule(name): static/js/modules/<name>.js and, for all but the
+# to-do list, markup in templates/modules/<name>.html.
+MODULES = sorted(f[:-3] for f in os.listdir(os.path.join(app.root_path, "static", "js", "modules"))
+                 if f.endswith(".js"))
+MODULE_MARKUP = sorted(f[:-5] for f in os.listdir(os.path.join(app.root_path, "templates", "modules"))
+                       if f.endswith(".html"))
+
+# Changes whenever the shell, a module or the worker does, so browsers
+# install the new worker and drop the old shell cache (templates/sw.js).
+SHELL_VERSION = hashlib.blake2b(b"".join(
+    open(os.path.join(app.root_path, *path), "rb").read()
+    for path in [("templates", "index.html"), ("templates", "sw.js")]
+    + [("templates", "modules", f"{name}.html") for name in MODULE_MARKUP]
+    + [("static", "js", "modules", f"{name}.js") for name in MODULES]
+), digest_size=6).hexdigest()
+
 @app.route("/ping")
 def ping():
     return "pong", 200
@@ -40,7 +94,41 @@ def ping():
 @app.route("/")
 def index():
     user = session.get("user")
-    return render_template("index.html", comic_options=COMIC_OPTIONS, user=user)
+    return render_template("index.html", comic_options=COMIC_OPTIONS, user=user,
+                           version=SHELL_VERSION, module_markup=MODULE_MARKUP)
+
+
+@app.route("/modules/<name>.html")
+def module_partial(name):
+    if name not in MODULE_MARKUP:
+        abort(404)
+    resp = app.response_class(render_template(f"modules/{name}.html", comic_options=COMIC_OPTIONS),
+                              mimetype="text/html")
+    # Nothing per user, so any cache may keep it — for good only under the
+    # current ?v=; an old shell asking under its own version gets today's
+    # markup, which must not stick.
+    current = request.args.get("v") == SHELL_VERSION
+    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable" if current else "no-cache"
+    return resp
+
+
+@app.after_request
+def static_cache_control(resp):
+    # Same rule for /static/js/modules/*.js: an old shell's ?v= gets
+    # today's file, which must not be kept for a year under that URL.
+    if request.endpoint == "static" and request.args.get("v") != SHELL_VERSION:
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers.pop("Expires", None)
+    return resp
+
+
+@app.route("/sw.js")
+def service_worker():
+    resp = app.response_class(render_template("sw.js", version=SHELL_VERSION, modules=MODULES,
+                                              module_markup=MODULE_MARKUP),
+                              mimetype="application/javascript")
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 # ── Dev server ─────────────────────────────────────────────────────────────
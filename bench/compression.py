@@ -0,0 +1,80 @@
+"""
+bench/compression.py
+────────────────────
+Bytes saved and CPU cost of middleware/compression.py per payload size.
+
+Payloads: the rendered index.html shell, a linkedin_pdf analyse response
+(JSON with fake_groq's WAS/NOW blocks, parsed like the route does) and
+slices of that JSON at a few sizes. For each payload and encoding it prints
+compressed size, ratio and mean CPU time per compression, plus the cost of
+a precompressed-cache hit for the HTML shell.
+
+    python -m bench.compression --repeat 50
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from bench.fake_groq import fake_reply
+
+
+def _payloads() -> list[tuple[str, bytes]]:
+    from app import app
+    from services.format_service import parse_pdf_analysis
+
+    with app.test_request_context("/"):
+        html = app.view_functions["index"]().encode()
+
+    rng = random.Random(3)
+    issues = []
+    while len(json.dumps(issues)) < 40_000:
+        issues += [i.to_dict() for i in parse_pdf_analysis(fake_reply("[SECTION:", rng)).issues]
+    analysis = json.dumps({"issues": issues, "message": fake_reply("[SECTION:", rng)}).encode()
+
+    out = [(f"json {n // 1024}k", analysis[:n]) for n in (1024, 4096, 16384) if n < len(analysis)]
+    out.append((f"analysis json {len(analysis) // 1024}k", analysis))
+    out.append((f"index.html {len(html) // 1024}k", html))
+    return out
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Response compression benchmark")
+    parser.add_argument("--repeat", type=int, default=30, help="compressions per payload/encoding")
+    args = parser.parse_args()
+
+    from middleware import compression
+    encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+    if "br" not in encodings:
+        print("[BENCH] brotli not installed — gzip only")
+
+    print(f"  {'payload':<22}{'enc':<6}{'raw B':>9}{'out B':>9}{'ratio':>7}{'cpu ms':>9}")
+    for label, body in _payloads():
+        for enc in encodings:
+            for cached in (False, True):
+                out = compression.compress_body(body, enc, cached=cached)
+                cpu = _time(lambda: compression.compress_body(body, enc, cached=cached), args.repeat)
+                tag = f"{enc}{'*' if cached else ''}"
+                print(f"  {label:<22}{tag:<6}{len(body):>9}{len(out):>9}"
+                      f"{len(out) / len(body):>7.2f}{cpu * 1000:>9.3f}")
+    print("  (* = cache-fill quality, paid once per distinct body)")
+
+    html = _payloads()[-1][1]
+    cache = compression._PrecompressedCache(4)
+    cache.get_or_compress(html, encodings[-1])
+    hit = _time(lambda: cache.get_or_compress(html, encodings[-1]), args.repeat * 10)
+    print(f"\n  cache hit ({encodings[-1]}, index.html): {hit * 1000:.3f} ms cpu")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+bench/db_outage.py
+──────────────────
+Supabase outage drill: signed-in traffic (fresh tool calls, stats, rank,
+leaderboards) against the in-process app while fake Supabase hangs every
+request for --stall seconds, longer than any SUPABASE_TIMEOUTS read or
+write, and then recovers.
+
+Per phase (before / outage / after) and endpoint it reports status codes
+and p50 / p99 latency. Once the outbox has drained it checks the books:
+every tool call answered 200 should be exactly one tool_uses row, whether
+it was written at the time or replayed from the outbox.
+
+    python -m bench.db_outage
+    python -m bench.db_outage --no-breaker   # same drill, breakers never open
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.load import COMICS, _json_body, _pct, start_inprocess
+from bench.samples import SAMPLE_IDEAS, SAMPLE_PROFILE
+
+# endpoint → (weight, method, path, build(rng) → requests kwargs); tool calls skip history so each one logs XP
+OUTAGE_MIX = {
+    "ping":        (3, "GET",  "/ping", None),
+    "idea":        (6, "POST", "/api/idea", lambda rng: _json_body(
+        dict(zip(("idea", "market"), rng.choice(SAMPLE_IDEAS)), mode="check", comic=rng.choice(COMICS), fresh=True))),
+    "linkedin":    (4, "POST", "/api/linkedin", lambda rng: _json_body(
+        {"mode": "check", "content_type": "post", "comic": rng.choice(COMICS), "content": SAMPLE_PROFILE,
+         "fresh": True})),
+    "user_stats":  (4, "GET",  "/api/user/stats", None),
+    "personal":    (4, "GET",  "/api/leaderboard/personal", None),
+    "leaderboard": (5, "GET",  "/api/leaderboard", None),
+    "weekly":      (3, "GET",  "/api/leaderboard/weekly", None),
+}
+TOOLS = ("idea", "linkedin")
+
+_local = threading.local()
+
+
+def _send(base: str, name: str, seed: int, sid: str, timeout: float, phase: str) -> dict:
+    import requests
+
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = _local.http = requests.Session()
+    _, method, path, build = OUTAGE_MIX[name]
+    kwargs = build(random.Random(seed)) if build else {}
+    http.cookies.clear()
+    start = time.perf_counter()
+    try:
+        status = http.request(method, base + path, headers={"Cookie": f"session={sid}"},
+                              timeout=timeout, **kwargs).status_code
+    except Exception as e:
+        status = type(e).__name__
+    return {"endpoint": name, "phase": phase, "status": status, "latency": time.perf_counter() - start}
+
+
+async def drive(base: str, sids: list[str], args, supa) -> list[dict]:
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=128)
+    rng = random.Random(args.seed)
+    names = list(OUTAGE_MIX)
+    weights = [OUTAGE_MIX[n][0] for n in names]
+    phases = (("before", args.warm, 0.0), ("outage", args.outage, args.stall), ("after", args.recover, 0.0))
+
+    tasks = []
+    for phase, seconds, stall in phases:
+        supa.stall_s = stall
+        end = loop.time() + seconds
+        while loop.time() < end:
+            await asyncio.sleep(rng.expovariate(args.rps))
+            tasks.append(loop.run_in_executor(pool, _send, base, rng.choices(names, weights)[0],
+                                              rng.getrandbits(32), rng.choice(sids), args.timeout, phase))
+    results = await asyncio.gather(*tasks)
+    pool.shutdown()
+    return results
+
+
+def report(results: list[dict]) -> None:
+    for phase in ("before", "outage", "after"):
+        rows = [r for r in results if r["phase"] == phase]
+        print(f"\n  [{phase}]  {'n':>4}  {'statuses':<24}{'p50 ms':>9}{'p99 ms':>9}")
+        for name in OUTAGE_MIX:
+            mine = [r for r in rows if r["endpoint"] == name]
+            if not mine:
+                continue
+            counts: dict = {}
+            for r in mine:
+                counts[r["status"]] = counts.get(r["status"], 0) + 1
+            statuses = " ".join(f"{s}×{n}" for s, n in sorted(counts.items(), key=str))
+            lat = [r["latency"] for r in mine]
+            print(f"  {name:<12}{len(mine):>4}  {statuses:<24}{_pct(lat, 50) * 1000:>9.0f}{_pct(lat, 99) * 1000:>9.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Supabase outage drill against the in-process app")
+    parser.add_argument("--rps", type=float, default=6.0)
+    parser.add_argument("--warm", type=float, default=5.0, help="seconds before the outage")
+    parser.add_argument("--outage", type=float, default=20.0, help="seconds Supabase hangs")
+    parser.add_argument("--recover", type=float, default=15.0, help="seconds after it recovers")
+    parser.add_argument("--stall", type=float, default=10.0, help="how long each Supabase request hangs")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout")
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--no-breaker", action="store_true", help="breakers never open (old behaviour)")
+    args = parser.parse_args()
+
+    os.environ.update({"TOOL_RATE_PER_MIN": "0", "DB_OUTBOX_POLL_S": "1",
+                       "DB_OUTBOX_PATH": os.path.join(os.environ.get("TMPDIR", "/tmp"), f"bench-outbox-{os.getpid()}.db")})
+    if args.no_breaker:
+        os.environ["SUPABASE_BREAKER_FAILURES"] = str(10 ** 9)
+    setup = argparse.Namespace(groq_error_rate=0.0, distribution="uniform", jitter=0.25,
+                               db_latency=0.01, users=20, threads=16)
+    base, _, sids, stops, _, supa = start_inprocess(setup)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = asyncio.run(drive(base, sids, args, supa))
+            from services.db_service import DatabaseService
+            deadline = time.monotonic() + 60
+            while DatabaseService.outage_stats()["outbox"]["pending"] and time.monotonic() < deadline:
+                time.sleep(0.5)
+            time.sleep(0.5)
+            stats = DatabaseService.outage_stats()
+        print(f"[OUTAGE] breaker {'off' if args.no_breaker else 'on'}, {len(results)} requests, "
+              f"Supabase hanging {args.stall}s per request for {args.outage}s")
+        report(results)
+
+        served = sum(r["endpoint"] in TOOLS and r["status"] == 200 for r in results)
+        with supa.lock:
+            uses = list(supa.tables.get("tool_uses", []))
+        ids = [u.get("use_id") for u in uses]
+        print(f"\n  tool calls answered 200: {served}   tool_uses rows: {len(uses)}   "
+              f"duplicate use ids: {len(ids) - len(set(ids))}")
+        outbox = stats["outbox"]
+        print(f"  outbox: buffered {outbox['buffered']}, replayed {outbox['replayed']}, "
+              f"dropped {outbox['dropped']}, pending {outbox['pending']}   stale reads served: {stats['stale_served']}")
+        print("  breakers: " + ", ".join(f"{op} {b['state']} (trips {b['trips']}, rejected {b['rejected']})"
+                                          for op, b in stats["breakers"].items()))
+    finally:
+        for stop in stops:
+            stop()
+        for suffix in ("", "-wal", "-shm"):
+            with contextlib.suppress(OSError):
+                os.remove(os.environ["DB_OUTBOX_PATH"] + suffix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
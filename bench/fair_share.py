@@ -0,0 +1,135 @@
+"""
+bench/fair_share.py
+───────────────────
+Simulation of the LLM slot scheduler (AdmissionService's gate) under a
+heavy-user flood: one client running --heavy concurrent loops of Groq
+calls, back to back, while --light-rate calls/s arrive from --light-users
+other clients and a trickle of background (speculative) jobs runs.
+
+Calls don't touch Groq or Flask — each one takes a real gate slot and
+sleeps a lognormal service time — so it runs in seconds and isolates the
+scheduling policy. Runs twice: FIFO (LLM_FAIR_SHARE=0, the old gate) and
+fair share with the shipped config, and prints per client class the calls
+served / shed and p50 / p99 wait and end-to-end latency.
+
+    python -m bench.fair_share --seconds 20 --heavy 16 --light-rate 3
+"""
+
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+
+from bench.load import _pct
+
+
+def _service(rng: random.Random, median: float) -> float:
+    return median * math.exp(rng.gauss(0.0, 0.5))
+
+
+def simulate(gate, fair: bool, args) -> dict[str, dict]:
+    from services.admission_service import OverloadedError
+
+    results: dict[str, list] = {"light": [], "heavy": [], "background": []}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + args.seconds
+
+    def call(kind: str, tenant: str, priority: str, rng: random.Random) -> bool:
+        if not fair:
+            tenant, priority = "all", "interactive"
+        start = time.monotonic()
+        try:
+            waited = gate.acquire(tenant, priority, cost=1000.0)
+        except OverloadedError:
+            with lock:
+                results[kind].append(None)
+            return False
+        try:
+            time.sleep(_service(rng, args.median))
+        finally:
+            gate.release(tenant, priority)
+        with lock:
+            results[kind].append((waited, time.monotonic() - start))
+        return True
+
+    def heavy_loop(seed: int) -> None:
+        rng = random.Random(seed)
+        while time.monotonic() < stop_at:
+            if not call("heavy", "user:heavy", "interactive", rng):
+                time.sleep(0.05)   # shed — the script retries straight away
+
+    def arrivals(kind: str, rate: float, seed: int) -> None:
+        rng = random.Random(seed)
+        threads = []
+        while True:
+            time.sleep(rng.expovariate(rate))
+            if time.monotonic() >= stop_at:
+                break
+            tenant = f"user:light{rng.randrange(args.light_users)}" if kind == "light" else "user:spec"
+            priority = "interactive" if kind == "light" else "background"
+            t = threading.Thread(target=call, args=(kind, tenant, priority, random.Random(rng.getrandbits(32))))
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+
+    workers = [threading.Thread(target=heavy_loop, args=(i,)) for i in range(args.heavy)]
+    workers.append(threading.Thread(target=arrivals, args=("light", args.light_rate, 101)))
+    workers.append(threading.Thread(target=arrivals, args=("background", args.background_rate, 202)))
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    summary = {}
+    for kind, rows in results.items():
+        served = [r for r in rows if r is not None]
+        waits, totals = [w for w, _ in served], [t for _, t in served]
+        summary[kind] = {
+            "served": len(served), "shed": len(rows) - len(served),
+            "wait_p50": _pct(waits, 50), "wait_p99": _pct(waits, 99),
+            "p50": _pct(totals, 50), "p99": _pct(totals, 99),
+        }
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fair-share LLM scheduler simulation")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--heavy", type=int, default=16, help="concurrent loops run by the heavy client")
+    parser.add_argument("--light-rate", type=float, default=3.0, help="calls/s from everyone else")
+    parser.add_argument("--light-users", type=int, default=30)
+    parser.add_argument("--background-rate", type=float, default=0.5, help="speculative jobs/s")
+    parser.add_argument("--median", type=float, default=0.8, help="median seconds per Groq call")
+    args = parser.parse_args()
+
+    from config import (
+        LLM_MAX_INFLIGHT, LLM_MAX_WAITING, LLM_MAX_QUEUE_WAIT_S, ADMISSION_WINDOW_S,
+        LLM_TENANT_MAX_INFLIGHT, LLM_TENANT_MAX_WAITING, LLM_BACKGROUND_SLOTS,
+    )
+    from services.admission_service import _FairGate
+
+    print(f"[FAIR SHARE] {LLM_MAX_INFLIGHT} slots, {args.heavy} heavy loops, {args.light_rate}/s light "
+          f"from {args.light_users} users, {args.background_rate}/s background, {args.seconds:.0f}s")
+    for label, fair in (("fifo", False), ("fair share", True)):
+        gate = _FairGate(
+            LLM_MAX_INFLIGHT, LLM_MAX_WAITING, LLM_MAX_QUEUE_WAIT_S, ADMISSION_WINDOW_S,
+            tenant_slots=LLM_TENANT_MAX_INFLIGHT if fair else LLM_MAX_INFLIGHT,
+            tenant_waiting=LLM_TENANT_MAX_WAITING if fair else LLM_MAX_WAITING,
+            background_slots=LLM_BACKGROUND_SLOTS if fair else LLM_MAX_INFLIGHT,
+        )
+        summary = simulate(gate, fair, args)
+        print(f"\n  [{label}]  {'served':>7}{'shed':>7}{'wait p50':>10}{'wait p99':>10}{'p50 ms':>9}{'p99 ms':>9}")
+        for kind, s in summary.items():
+            if not s["served"]:
+                print(f"  {kind:<12}{0:>7}{s['shed']:>7}{'-':>10}{'-':>10}{'-':>9}{'-':>9}")
+                continue
+            print(f"  {kind:<12}{s['served']:>7}{s['shed']:>7}{s['wait_p50'] * 1000:>10.0f}"
+                  f"{s['wait_p99'] * 1000:>10.0f}{s['p50'] * 1000:>9.0f}{s['p99'] * 1000:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+bench/fake_groq.py
+──────────────────
+Local stand-in for Groq's OpenAI-compatible chat API, for benchmarks only.
+
+Serves POST /openai/v1/chat/completions (plain and stream=true) with a
+per-model latency model: time-to-first-token + output tokens / token rate.
+TTFT is drawn from a bench/latency.py distribution (uniform ±25% by
+default; lognormal gives a realistic tail for hedging / p99 work).
+The reply is shaped after what the prompt asks for ([QUESTION:] blocks for
+scan, [QUIP:] for quips, [SECTION:] blocks for analyse, a short roast
+otherwise) so downstream parsing behaves realistically. With --ramble P a
+reply overshoots that structure with probability P — extra blocks, a
+closing paragraph — the way real models do; max_tokens and stop sequences
+are honoured (finish_reason "length" when the reply was truncated).
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:<port>/openai/v1
+(config.get_groq_client passes it through) or run standalone:
+
+    python -m bench.fake_groq --port 8765 --error-rate 0.05 \
+        --distribution lognormal --jitter 0.6 --ramble 0.3 --model llama-3.1-8b-instant=0.2:500
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench import latency
+
+# model → (ttft seconds, output tokens per second)
+DEFAULT_MODELS: dict[str, tuple[float, float]] = {
+    "llama-3.3-70b-versatile": (0.45, 275.0),
+    "llama-3.1-8b-instant":    (0.12, 750.0),
+}
+
+WORDS = ("yaar", "bhai", "resume", "backend", "shipped", "scale", "honestly", "metrics",
+         "built", "users", "latency", "placement", "startup", "profile", "headline")
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def fake_reply(prompt: str, rng: random.Random) -> str:
+    """A reply in the structure the prompt asks for."""
+    if "[QUESTION:" in prompt:
+        return "\n\n".join(
+            f"[QUESTION: q{i} | {_sentence(rng, 5)} | e.g. {_sentence(rng, 8)}]" for i in range(1, 6)
+        )
+    if "[QUIP:" in prompt:
+        sections = ("Headline", "About", "Experience", "Skills", "Education")
+        return "\n".join(f"[QUIP: section={s} | quip={_sentence(rng, 12)}]" for s in sections)
+    if "[SECTION:" in prompt:
+        blocks = []
+        for section in ("Headline", "About", "Experience", "Experience", "Skills", "Education"):
+            blocks.append(
+                f"[SECTION: {section}]\n[PRIORITY: {rng.choice(('High', 'Medium', 'Low'))}]\n"
+                f"[ISSUE: {_sentence(rng, 14)}]\n[WAS: {_sentence(rng, 18)}]\n[NOW: {_sentence(rng, 30)}]"
+            )
+        return "\n\n".join(blocks)
+    if "[ROAST]" in prompt:
+        return f"[ROAST]\n{_sentence(rng, 60)}\n\n[FIXED]\n{_sentence(rng, 120)}\n\n[WHY]\n{_sentence(rng, 40)}"
+    if "[VERDICT]" in prompt:
+        return f"[VERDICT]\n{_sentence(rng, 60)}\n\n[FIXED]\n{_sentence(rng, 150)}"
+    if "[CREATED]" in prompt:
+        return f"[CREATED]\n{_sentence(rng, 180)}"
+    return " ".join(_sentence(rng, 15) for _ in range(3))
+
+
+def overshoot(prompt: str, rng: random.Random) -> str:
+    """What a rambling model tacks on after the structure it was asked for."""
+    if "[QUESTION:" in prompt:
+        extra = "\n\n".join(f"[QUESTION: q{i} | {_sentence(rng, 5)} | e.g. {_sentence(rng, 8)}]"
+                            for i in range(6, 6 + rng.randint(2, 4)))
+    elif "[QUIP:" in prompt:
+        extra = "\n".join(f"[QUIP: section=Projects | quip={_sentence(rng, 12)}]" for _ in range(rng.randint(2, 4)))
+    else:
+        extra = ""
+    return ("\n\n" + extra if extra else "") + "\n\n" + " ".join(_sentence(rng, 20) for _ in range(rng.randint(3, 8)))
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeGroq:
+    """Owns the HTTP server thread; knobs can be changed while it runs."""
+
+    def __init__(self, port: int = 0, models: dict[str, tuple[float, float]] | None = None,
+                 error_rate: float = 0.0, jitter: float = 0.25, seed: int = 7,
+                 distribution: str = "uniform", ramble: float = 0.0):
+        self.models = dict(models or DEFAULT_MODELS)
+        self.ramble = ramble
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.distribution = distribution
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/openai/v1"
+
+    def start(self) -> "FakeGroq":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _plan(self, model: str, prompt: str, max_tokens: int | None,
+              stop: list[str] | str | None = None) -> tuple[str, str, float, float, bool]:
+        """(reply, finish_reason, ttft, per-token delay, fail?) for one request."""
+        ttft, rate = self.models.get(model, DEFAULT_MODELS["llama-3.3-70b-versatile"])
+        with self.rng_lock:
+            self.requests += 1
+            reply = fake_reply(prompt, self.rng)
+            if self.rng.random() < self.ramble:
+                reply += overshoot(prompt, self.rng)
+            ttft = latency.sample(self.rng, ttft, self.distribution, self.jitter)
+            fail = self.rng.random() < self.error_rate
+        for seq in ([stop] if isinstance(stop, str) else stop or []):
+            reply = reply.split(seq, 1)[0]
+        finish = "stop"
+        if max_tokens and len(reply) > max_tokens * 4:
+            reply, finish = reply[: max_tokens * 4], "length"
+        return reply, finish, ttft, 1.0 / rate, fail
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # small SSE chunks must not wait on delayed ACKs
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                model  = body.get("model", "")
+                prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+                reply, finish, ttft, per_token, fail = fake._plan(model, prompt, body.get("max_tokens"),
+                                                                  body.get("stop"))
+
+                time.sleep(ttft)
+                if fail:
+                    self._json(503, {"error": {"message": "fake_groq injected failure"}})
+                    return
+                if body.get("stream"):
+                    self._stream(model, reply, finish, per_token)
+                    return
+                time.sleep(per_token * _tokens(reply))
+                self._json(200, {
+                    "id":      f"fake-{fake.requests}",
+                    "object":  "chat.completion",
+                    "created": int(time.time()),
+                    "model":   model,
+                    "choices": [{"index": 0, "finish_reason": finish,
+                                 "message": {"role": "assistant", "content": reply}}],
+                    "usage":   {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(reply),
+                                "total_tokens": _tokens(prompt) + _tokens(reply)},
+                })
+
+            def _json(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, model: str, reply: str, finish: str, per_token: float) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = reply.split(" ")
+                try:
+                    for i, word in enumerate(words):
+                        piece = word if i == 0 else " " + word
+                        self._chunk({"id": "fake", "object": "chat.completion.chunk", "model": model,
+                                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+                        time.sleep(per_token * _tokens(piece))
+                    self._chunk({"id": "fake", "object": "chat.completion.chunk", "model": model,
+                                 "choices": [{"index": 0, "delta": {}, "finish_reason": finish}]})
+                    self._raw(b"data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass   # client cancelled (hedging / early cut-off)
+
+            def _chunk(self, payload: dict) -> None:
+                self._raw(f"data: {json.dumps(payload)}\n\n".encode())
+
+            def _raw(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Groq chat-completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--distribution", default="uniform", choices=latency.DISTRIBUTIONS)
+    parser.add_argument("--jitter", type=float, default=0.25, help="spread for the TTFT distribution")
+    parser.add_argument("--ramble", type=float, default=0.0,
+                        help="probability a reply runs past the structure it was asked for")
+    parser.add_argument("--model", action="append", default=[], metavar="NAME=TTFT:RATE",
+                        help="override a model's TTFT seconds and tokens/s (repeatable)")
+    args = parser.parse_args()
+    models = dict(DEFAULT_MODELS)
+    for spec in args.model:
+        name, _, numbers = spec.partition("=")
+        ttft, _, rate = numbers.partition(":")
+        models[name] = (float(ttft), float(rate))
+    fake = FakeGroq(port=args.port, models=models, error_rate=args.error_rate,
+                    jitter=args.jitter, distribution=args.distribution, ramble=args.ramble).start()
+    print(f"[FAKE GROQ] listening on {fake.base_url}")
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+bench/fake_supabase.py
+──────────────────────
+Local stand-in for Supabase's PostgREST API, for benchmarks only.
+
+In-memory tables behind the subset of PostgREST that services/db_service.py
+uses — enough for supabase-py's query builder to work unchanged:
+
+  GET    /rest/v1/<table>?select=..&<col>=<op>.<val>&order=..&limit=..
+         ops: eq neq gt gte lt lte in is; embedded `users(cols)` joins on
+         user_id; Prefer: count=exact → Content-Range total
+  POST   /rest/v1/<table>            insert (object or list); upsert with
+                                     Prefer: resolution=merge-duplicates
+                                     (or ignore-duplicates)
+  PATCH  /rest/v1/<table>?filters    update
+  DELETE /rest/v1/<table>?filters
+  POST   /rest/v1/rpc/<fn>           record_tool_use, refresh_usage_rollups,
+                                     reset_usage_rollups,
+                                     snapshot_weekly_leaderboard (Python
+                                     versions of sql/)
+
+Every request sleeps for a bench/latency.py sample first, so DB round trips
+cost something realistic; `handshake_s` adds a one-off delay per new
+connection, standing in for the TCP + TLS setup a reused connection skips.
+Set `stall_s` to make every request hang that long on top (an outage the
+client only notices by timing out). Point the app at it with SUPABASE_URL=<base_url>
+and any SUPABASE_ANON_KEY, or run standalone:
+
+    python -m bench.fake_supabase --port 8766 --latency 0.03 --distribution lognormal
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from bench import latency
+
+PRIMARY_KEYS = {"users": "id", "user_stats": "user_id", "weekly_snapshot_runs": "week"}   # everything else: auto-increment id
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _coerce(raw: str, like):
+    """Turn a filter value string into the type of the column it's compared with."""
+    if raw == "null":
+        return None
+    if isinstance(like, bool):
+        return raw == "true"
+    if isinstance(like, int):
+        return int(raw)
+    if isinstance(like, float):
+        return float(raw)
+    return raw
+
+
+def _matches(row: dict, col: str, expr: str) -> bool:
+    op, _, raw = expr.partition(".")
+    value = row.get(col)
+    if op == "is":
+        return value is None if raw == "null" else value == (raw == "true")
+    if op == "in":
+        return str(value) in {v.strip().strip('"') for v in raw.strip("()").split(",")}
+    if value is None:
+        return False
+    other = _coerce(raw, value)
+    return {
+        "eq":  value == other, "neq": value != other,
+        "gt":  value > other,  "gte": value >= other,
+        "lt":  value < other,  "lte": value <= other,
+    }.get(op, False)
+
+
+def _split_select(select: str) -> list[str]:
+    """Split a select list on top-level commas: 'a, b, users(x, y)' → ['a', 'b', 'users(x, y)']."""
+    parts, depth, cur = [], 0, ""
+    for ch in select:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(cur.strip())
+            cur = ""
+        else:
+            cur += ch
+    if cur.strip():
+        parts.append(cur.strip())
+    return parts
+
+
+class FakeSupabase:
+    """Owns the HTTP server thread and the in-memory tables."""
+
+    def __init__(self, port: int = 0, latency_s: float = 0.02, distribution: str = "lognormal",
+                 spread: float = 0.5, seed: int = 11, handshake_s: float = 0.0):
+        self.latency_s = latency_s
+        self.handshake_s = handshake_s
+        self.stall_s = 0.0
+        self.distribution = distribution
+        self.spread = spread
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tables: dict[str, list[dict]] = {}
+        self._ids: dict[str, int] = {}
+        self.requests = 0
+        self.connections = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "FakeSupabase":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def seed_users(self, n: int) -> list[str]:
+        """Create n users with random XP; returns their ids."""
+        ids = []
+        with self.lock:
+            for i in range(n):
+                uid = str(uuid.UUID(int=self.rng.getrandbits(128)))
+                ids.append(uid)
+                self._upsert("users", {"id": uid, "email": f"bench{i}@example.com",
+                                       "display_name": f"Bench User {i}", "avatar_url": ""})
+                self._upsert("user_stats", {"user_id": uid, "xp": self.rng.randint(0, 3000),
+                                            "streak": self.rng.randint(0, 9), "tools_used": self.rng.randint(0, 80),
+                                            "last_active": None})
+        return ids
+
+    # ── Table operations (caller holds self.lock) ──────────────────────────
+
+    def _rows(self, table: str) -> list[dict]:
+        return self.tables.setdefault(table, [])
+
+    def _insert(self, table: str, row: dict) -> dict:
+        row = dict(row)
+        if table not in PRIMARY_KEYS and "id" not in row:
+            self._ids[table] = self._ids.get(table, 0) + 1
+            row["id"] = self._ids[table]
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        self._rows(table).append(row)
+        return row
+
+    def _upsert(self, table: str, row: dict, key: str | None = None) -> dict:
+        key = key or PRIMARY_KEYS.get(table, "id")
+        for existing in self._rows(table):
+            if key in row and existing.get(key) == row[key]:
+                existing.update(row)
+                return existing
+        return self._insert(table, row)
+
+    def _select(self, table: str, params: list[tuple[str, str]]) -> tuple[list[dict], int]:
+        rows = self._rows(table)
+        for col, expr in params:
+            if col not in RESERVED_PARAMS:
+                rows = [r for r in rows if _matches(r, col, expr)]
+        total = len(rows)
+        p = dict(params)
+        for clause in reversed(p.get("order", "").split(",") if p.get("order") else []):
+            col, *mods = clause.split(".")
+            rows = sorted(rows, key=lambda r: (r.get(col) is None, r.get(col)), reverse="desc" in mods)
+        offset = int(p.get("offset", 0))
+        rows = rows[offset:offset + int(p["limit"])] if "limit" in p else rows[offset:]
+        return [self._project(r, p.get("select", "*")) for r in rows], total
+
+    def _project(self, row: dict, select: str) -> dict:
+        out = {}
+        for part in _split_select(select):
+            if part == "*":
+                out.update(row)
+            elif "(" in part:
+                name, cols = part[:-1].split("(", 1)
+                target = next((u for u in self._rows(name) if u.get("id") == row.get("user_id")), None)
+                out[name] = self._project(target, cols) if target else None
+            else:
+                out[part] = row.get(part)
+        return out
+
+    # ── RPCs (Python versions of sql/*.sql) ────────────────────────────────
+
+    def _rpc(self, fn: str, args: dict):
+        if fn == "record_tool_use":
+            used = datetime.fromisoformat(args["p_used_at"]).astimezone(IST) if args.get("p_used_at") else datetime.now(IST)
+            use_id = args.get("p_use_id")
+            seen = use_id is not None and any(u.get("use_id") == use_id for u in self._rows("tool_uses"))
+            stats = self._upsert("user_stats", {"user_id": args["p_user_id"]})
+            if not seen:
+                self._insert("tool_uses", {"user_id": args["p_user_id"], "tool_name": args["p_tool_name"],
+                                           "xp_earned": args["p_xp"], "used_at": used.isoformat(), "use_id": use_id})
+                today, last = used.date().isoformat(), stats.get("last_active")
+                yesterday = (used.date() - timedelta(days=1)).isoformat()
+                stats["streak"] = max(stats.get("streak", 0), 1) if last and last >= today else (
+                    stats.get("streak", 0) + 1 if last == yesterday else 1)
+                stats["xp"] = stats.get("xp", 0) + args["p_xp"]
+                stats["tools_used"] = stats.get("tools_used", 0) + 1
+                stats["last_active"] = max(last or today, today)
+            return [{"xp": stats.get("xp", 0), "streak": stats.get("streak", 0),
+                     "tools_used": stats.get("tools_used", 0)}]
+        if fn == "refresh_usage_rollups":
+            return [{"processed": 0}]
+        if fn == "reset_usage_rollups":
+            return None
+        if fn == "snapshot_weekly_leaderboard":
+            # No rollups here: total the week straight from tool_uses
+            day = datetime.fromisoformat(args["p_week"]).date()
+            week = day - timedelta(days=day.weekday())
+            totals: dict[str, list[int]] = {}
+            for use in self._rows("tool_uses"):
+                used = datetime.fromisoformat(use["used_at"]).astimezone(timezone.utc).date()
+                if used - timedelta(days=used.weekday()) == week:
+                    t = totals.setdefault(use["user_id"], [0, 0])
+                    t[0] += use.get("xp_earned") or 0
+                    t[1] += 1
+            users = {u["id"]: u for u in self._rows("users")}
+            ranked = sorted(((uid, xp, n) for uid, (xp, n) in totals.items() if uid in users),
+                            key=lambda r: (-r[1], -r[2], r[0]))
+            rows = self._rows("weekly_leaderboard_snapshots")
+            rows[:] = [r for r in rows if r["week"] != week.isoformat()]
+            for position, (uid, xp, n) in enumerate(ranked, 1):
+                rows.append({"week": week.isoformat(), "user_id": uid, "position": position, "xp": xp, "uses": n,
+                             "display_name": users[uid].get("display_name"),
+                             "avatar_url": users[uid].get("avatar_url")})
+            self._upsert("weekly_snapshot_runs", {"week": week.isoformat(), "users": len(ranked),
+                                                  "taken_at": datetime.now(timezone.utc).isoformat()})
+            return [{"week": week.isoformat(), "users": len(ranked)}]
+        raise KeyError(fn)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # headers and body are separate writes — avoid the 40ms delayed-ACK stall
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with fake.lock:
+                    fake.connections += 1
+                if fake.handshake_s:
+                    time.sleep(fake.handshake_s)
+
+            def _begin(self) -> tuple[str, list[tuple[str, str]], object]:
+                with fake.lock:
+                    fake.requests += 1
+                    delay = latency.sample(fake.rng, fake.latency_s, fake.distribution, fake.spread)
+                time.sleep(delay + fake.stall_s)
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length)) if length else None
+                return url.path, parse_qsl(url.query, keep_blank_values=True), body
+
+            def _table(self, path: str) -> str | None:
+                prefix = "/rest/v1/"
+                return path[len(prefix):] if path.startswith(prefix) else None
+
+            def do_GET(self):
+                path, params, _ = self._begin()
+                table = self._table(path)
+                if not table:
+                    self._json(404, {"message": "not found"})
+                    return
+                with fake.lock:
+                    rows, total = fake._select(table, params)
+                count = total if "count=exact" in self.headers.get("Prefer", "") else "*"
+                self._json(200, rows, {"Content-Range": f"0-{max(len(rows) - 1, 0)}/{count}"})
+
+            def do_POST(self):
+                path, params, body = self._begin()
+                table = self._table(path)
+                if table and table.startswith("rpc/"):
+                    try:
+                        with fake.lock:
+                            result = fake._rpc(table[4:], body or {})
+                    except KeyError:
+                        self._json(404, {"code": "PGRST202", "message": f"function {table[4:]} not found"})
+                        return
+                    self._json(200, result)
+                    return
+                if not table:
+                    self._json(404, {"message": "not found"})
+                    return
+                rows = body if isinstance(body, list) else [body or {}]
+                prefer = self.headers.get("Prefer", "")
+                upsert = "merge-duplicates" in prefer
+                on_conflict = dict(params).get("on_conflict")
+                with fake.lock:
+                    if "ignore-duplicates" in prefer:
+                        key = on_conflict or PRIMARY_KEYS.get(table, "id")
+                        existing = {r.get(key) for r in fake._rows(table)}
+                        rows = [r for r in rows if r.get(key) not in existing]
+                    out = [fake._upsert(table, r, on_conflict) if upsert else fake._insert(table, r) for r in rows]
+                self._json(201, out)
+
+            def do_PATCH(self):
+                path, params, body = self._begin()
+                table = self._table(path)
+                with fake.lock:
+                    matched = [r for r in fake._rows(table)
+                               if all(_matches(r, c, e) for c, e in params if c not in RESERVED_PARAMS)]
+                    for r in matched:
+                        r.update(body or {})
+                self._json(200, matched)
+
+            def do_DELETE(self):
+                path, params, _ = self._begin()
+                table = self._table(path)
+                with fake.lock:
+                    keep, gone = [], []
+                    for r in fake._rows(table):
+                        hit = all(_matches(r, c, e) for c, e in params if c not in RESERVED_PARAMS)
+                        (gone if hit else keep).append(r)
+                    fake.tables[table] = keep
+                self._json(200, gone)
+
+            def _json(self, status: int, payload, headers: dict | None = None) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Supabase PostgREST server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.02, help="median/mean seconds per request")
+    parser.add_argument("--distribution", default="lognormal", choices=latency.DISTRIBUTIONS)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--handshake", type=float, default=0.0, help="extra seconds per new connection")
+    parser.add_argument("--seed-users", type=int, default=50)
+    args = parser.parse_args()
+    fake = FakeSupabase(port=args.port, latency_s=args.latency, distribution=args.distribution,
+                        spread=args.spread, handshake_s=args.handshake).start()
+    fake.seed_users(args.seed_users)
+    print(f"[FAKE SUPABASE] listening on {fake.base_url} with {args.seed_users} users")
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+bench/first_load.py
+───────────────────
+First-load cost of the index shell on a throttled low-end phone, measured
+the way Lighthouse's mobile preset does it, headless against the app
+served in-process (guest visitor, no Groq / Supabase needed).
+
+Always: byte accounting of the page as served — HTML, inline <style> and
+<script> (the JS a first visit parses before it is interactive), and per
+lazy module (index.html loadModule) the markup + script it defers, raw and
+gzip.
+
+With Playwright (pip install playwright && python -m playwright install
+chromium): headless Chromium with --cpu x CPU slowdown, Slow 4G (150 ms
+RTT, 1.6 Mbps down) and a 412x823 mobile viewport, service workers blocked
+and off-host requests (fonts) dropped. Per page, median over --runs of
+FCP, LCP, TBT, TTI (end of the last long task before a 5 s quiet window)
+and main-thread script time; then, once per tool card, how long the modal
+takes to open cold and after a 300 ms hover prefetch.
+
+--baseline REV renders templates/index.html as of a git revision (e.g. the
+monolithic page before the split) and serves it alongside for comparison.
+
+    python -m bench.first_load --baseline HEAD~1 --runs 5 --cpu 4
+"""
+
+import argparse
+import gzip
+import re
+import statistics
+import subprocess
+import sys
+import threading
+from collections.abc import Callable
+
+TOOLS = (("roaster", ".card-roaster"), ("idea", ".card-idea"), ("stack", ".card-stack"), ("resume", ".card-resume"))
+
+# Recorded from before the first script runs
+OBSERVERS = """
+window.__longtasks = []; window.__lcp = 0;
+new PerformanceObserver(l => l.getEntries().forEach(e => __longtasks.push([e.startTime, e.duration])))
+  .observe({ type: 'longtask', buffered: true });
+new PerformanceObserver(l => { const e = l.getEntries(); if (e.length) __lcp = e[e.length - 1].startTime; })
+  .observe({ type: 'largest-contentful-paint', buffered: true });
+"""
+
+COLLECT = """() => ({
+  now: performance.now(),
+  fcp: (performance.getEntriesByName('first-contentful-paint')[0] || {}).startTime || 0,
+  lcp: window.__lcp,
+  longtasks: window.__longtasks,
+})"""
+
+OPEN_TOOL = """async ([card, modal, hover]) => {
+  const el = document.querySelector(card);
+  if (hover) {
+    el.dispatchEvent(new PointerEvent('pointerover', { bubbles: true }));
+    await new Promise(r => setTimeout(r, 300));
+  }
+  const start = performance.now();
+  el.click();
+  while (!document.querySelector(modal + '.active')) await new Promise(r => setTimeout(r, 5));
+  return performance.now() - start;
+}"""
+
+
+def _gz(data: bytes) -> int:
+    return len(gzip.compress(data, 6))
+
+
+def _serve(baseline: str | None) -> tuple[str, dict[str, str], Callable[[], None]]:
+    """(base url, {label: path}, stop)."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app import app, MODULE_MARKUP, SHELL_VERSION
+    from comics import COMIC_OPTIONS
+
+    pages = {"current": "/"}
+    if baseline:
+        source = subprocess.run(["git", "show", f"{baseline}:templates/index.html"],
+                                cwd=app.root_path, capture_output=True, text=True, check=True).stdout
+        html = app.jinja_env.from_string(source).render(
+            comic_options=COMIC_OPTIONS, user=None, version=SHELL_VERSION, module_markup=MODULE_MARKUP)
+        app.add_url_rule("/__baseline", "bench_baseline", lambda: html)
+        pages = {f"baseline ({baseline})": "/__baseline", **pages}
+
+    quiet = type("QuietHandler", (WSGIRequestHandler,), {"log_request": lambda *a, **k: None})
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=quiet)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", pages, server.shutdown
+
+
+def byte_report(base: str, pages: dict[str, str]) -> None:
+    import requests
+
+    print(f"\n  {'page':<22}{'html':>9}{'html gz':>9}{'css':>9}{'first-load js':>15}{'js gz':>8}")
+    for label, path in pages.items():
+        html = requests.get(base + path, headers={"Accept-Encoding": "identity"}).text
+        scripts = "".join(re.findall(r"<script>(.*?)</script>", html, re.S)).encode()
+        styles = "".join(re.findall(r"<style>(.*?)</style>", html, re.S)).encode()
+        print(f"  {label:<22}{len(html.encode()):>9}{_gz(html.encode()):>9}{len(styles):>9}"
+              f"{len(scripts):>15}{_gz(scripts):>8}")
+
+    from app import MODULE_MARKUP, MODULES, SHELL_VERSION
+    print(f"\n  {'deferred module':<22}{'markup':>9}{'script':>9}{'gz total':>10}")
+    for name in MODULES:
+        markup = requests.get(f"{base}/modules/{name}.html?v={SHELL_VERSION}").content if name in MODULE_MARKUP else b""
+        script = requests.get(f"{base}/static/js/modules/{name}.js?v={SHELL_VERSION}").content
+        print(f"  {name:<22}{len(markup):>9}{len(script):>9}{_gz(markup) + _gz(script):>10}")
+
+
+def _tti(fcp: float, longtasks: list, now: float) -> tuple[float, float]:
+    """(TTI, TBT) from long tasks; TTI is the end of the last long task
+    before the first 5 s window without one (network quiet not checked)."""
+    tti = fcp
+    for start, duration in sorted(longtasks):
+        if start >= tti + 5000:
+            break
+        tti = max(tti, start + duration)
+    if tti + 5000 > now:
+        tti = float("inf")   # never went quiet while we watched
+    tbt = sum(max(0.0, d - 50) for s, d in longtasks if s >= fcp and s + d <= tti)
+    return tti, tbt
+
+
+def _page(browser, base: str, path: str, args):
+    context = browser.new_context(viewport={"width": 412, "height": 823}, device_scale_factor=1.75,
+                                  is_mobile=True, has_touch=True, service_workers="block")
+    page = context.new_page()
+    page.route(re.compile(r"^https?://(?!127\.0\.0\.1)"), lambda route: route.abort())
+    cdp = context.new_cdp_session(page)
+    cdp.send("Network.enable")
+    cdp.send("Network.emulateNetworkConditions", {
+        "offline": False, "latency": 150, "downloadThroughput": 1.6e6 / 8, "uploadThroughput": 750e3 / 8,
+    })
+    cdp.send("Emulation.setCPUThrottlingRate", {"rate": args.cpu})
+    cdp.send("Performance.enable")
+    page.add_init_script(OBSERVERS)
+    page.goto(base + path, wait_until="load")
+    return context, page, cdp
+
+
+def browser_report(base: str, pages: dict[str, str], args) -> None:
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        print(f"\n  [{args.cpu:g}x cpu, slow 4g, median of {args.runs}]")
+        print(f"  {'page':<22}{'fcp':>8}{'lcp':>8}{'tbt':>8}{'tti':>8}{'script':>9}")
+        for label, path in pages.items():
+            rows = []
+            for _ in range(args.runs):
+                context, page, cdp = _page(browser, base, path, args)
+                while True:
+                    m = page.evaluate(COLLECT)
+                    tti, tbt = _tti(m["fcp"], m["longtasks"], m["now"])
+                    if tti != float("inf") or m["now"] > args.timeout * 1000:
+                        break
+                    page.wait_for_timeout(500)
+                metrics = {x["name"]: x["value"] for x in cdp.send("Performance.getMetrics")["metrics"]}
+                rows.append((m["fcp"], m["lcp"], tbt, tti, metrics.get("ScriptDuration", 0) * 1000))
+                context.close()
+            med = [statistics.median(col) for col in zip(*rows)]
+            print(f"  {label:<22}" + "".join(f"{v:>8.0f}" for v in med[:4]) + f"{med[4]:>9.0f}")
+
+        print(f"\n  {'open tool (ms)':<22}" + "".join(f"{t:>9}" for t, _ in TOOLS))
+        for label, path in pages.items():
+            for hover in (False, True):
+                cells = []
+                for tool, card in TOOLS:
+                    context, page, _ = _page(browser, base, path, args)
+                    page.wait_for_timeout(1000)
+                    cells.append(page.evaluate(OPEN_TOOL, [card, f"#modal-{tool}", hover]))
+                    context.close()
+                tag = f"{label} {'hover' if hover else 'cold'}"
+                print(f"  {tag:<22}" + "".join(f"{c:>9.0f}" for c in cells))
+        browser.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="First-load cost of the index shell, Lighthouse-style")
+    parser.add_argument("--baseline", help="git revision whose templates/index.html to compare against")
+    parser.add_argument("--runs", type=int, default=3, help="page loads per page (browser mode)")
+    parser.add_argument("--cpu", type=float, default=4.0, help="CPU slowdown factor (Lighthouse mobile: 4)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for a quiet window")
+    args = parser.parse_args()
+
+    base, pages, stop = _serve(args.baseline)
+    try:
+        byte_report(base, pages)
+        try:
+            import playwright  # noqa: F401
+        except ImportError:
+            print("\n[FIRST LOAD] playwright not installed — byte accounting only "
+                  "(pip install playwright && python -m playwright install chromium)")
+            return 0
+        browser_report(base, pages, args)
+    finally:
+        stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
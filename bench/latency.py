@@ -0,0 +1,27 @@
+"""
+bench/latency.py
+────────────────
+Latency distributions shared by the bench fakes (fake_groq, fake_supabase).
+
+  fixed        always `base`
+  uniform      base × (1 ± spread)                       — the old fake_groq jitter
+  lognormal    median `base`, sigma `spread`              — realistic long right tail
+  exponential  mean `base` (spread ignored)               — memoryless, heavy-ish tail
+"""
+
+import math
+import random
+
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+
+def sample(rng: random.Random, base: float, distribution: str = "uniform", spread: float = 0.25) -> float:
+    if base <= 0 or distribution == "fixed":
+        return max(0.0, base)
+    if distribution == "uniform":
+        return base * (1 + rng.uniform(-spread, spread))
+    if distribution == "lognormal":
+        return base * math.exp(rng.gauss(0.0, spread))
+    if distribution == "exponential":
+        return rng.expovariate(1.0 / base)
+    raise ValueError(f"unknown latency distribution {distribution!r} — expected one of {DISTRIBUTIONS}")
@@ -0,0 +1,301 @@
+"""
+bench/load.py
+─────────────
+Replayable load test: a realistic mix of /api/* calls against the app, with
+Groq and Supabase replaced by bench/fake_groq.py and bench/fake_supabase.py.
+
+By default the app runs in-process behind a gthread model — at most
+--threads requests execute at once, like the Procfile's
+`gunicorn --workers 1 --threads 16` — so the report can show worker
+saturation (busy-thread utilisation, queue depth, queue wait) alongside
+per-endpoint RPS and p50 / p99 latency. With --target the driver hits an
+already-running server instead (no saturation numbers, its own backends).
+
+Arrivals are open-loop Poisson at --rps, generated from --seed. --record
+saves the schedule as JSONL; --replay runs a saved schedule again, so a
+perf change can be compared against exactly the same traffic.
+
+    python -m bench.load --rps 4 --duration 30 --record /tmp/mix.jsonl
+    python -m bench.load --replay /tmp/mix.jsonl --json /tmp/after.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fake_groq import FakeGroq
+from bench.fake_supabase import FakeSupabase
+from bench.samples import SAMPLE_IDEAS, SAMPLE_PROFILE, SAMPLE_RESUME, sample_pdf
+
+COMICS = ("abhishek_upmanyu", "ravi_gupta", "samay_raina")
+
+
+def _json_body(payload: dict) -> dict:
+    return {"json": payload}
+
+
+# endpoint → (weight, method, path, build(rng) → requests kwargs)
+MIX = {
+    "ping":         (4,  "GET",  "/ping", None),
+    "index":        (6,  "GET",  "/", None),
+    "resume":       (18, "POST", "/api/resume", lambda rng: _json_body(
+        {"mode": "paste", "comic": rng.choice(COMICS), "resume_text": SAMPLE_RESUME + f"\nRef {rng.randint(1, 40)}"})),
+    "linkedin":     (10, "POST", "/api/linkedin", lambda rng: _json_body(
+        {"mode": "check", "content_type": "post", "comic": rng.choice(COMICS), "content": SAMPLE_PROFILE})),
+    "idea":         (8,  "POST", "/api/idea", lambda rng: _json_body(
+        dict(zip(("idea", "market"), rng.choice(SAMPLE_IDEAS)), mode="check", comic=rng.choice(COMICS)))),
+    "stack":        (5,  "POST", "/api/stack", lambda rng: _json_body(
+        {"mode": "check", "project": "A canteen queue tracker with live updates",
+         "level": "beginner", "priority": "speed", "comic": rng.choice(COMICS)})),
+    "pdf_quips":    (7,  "POST", "/api/linkedin-pdf", lambda rng: _pdf_body(rng, "quips")),
+    "pdf_scan":     (7,  "POST", "/api/linkedin-pdf", lambda rng: _pdf_body(rng, "scan")),
+    "pdf_analyse":  (7,  "POST", "/api/linkedin-pdf", lambda rng: _pdf_body(rng, "analyse")),
+    "leaderboard":  (12, "GET",  "/api/leaderboard", None),
+    "weekly":       (6,  "GET",  "/api/leaderboard/weekly", None),
+    "user_stats":   (5,  "GET",  "/api/user/stats", None),
+    "history":      (5,  "GET",  "/api/history?limit=20", None),
+}
+
+_PDF = None
+
+
+def _pdf_body(rng: random.Random, mode: str) -> dict:
+    global _PDF
+    if _PDF is None:
+        _PDF = sample_pdf()
+    return {"data": {"mode": mode, "comic": rng.choice(COMICS)},
+            "files": {"pdf": ("profile.pdf", _PDF, "application/pdf")}}
+
+
+# ── Schedule ───────────────────────────────────────────────────────────────
+
+def make_schedule(rps: float, duration: float, users: int, logged_in: float, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    names = list(MIX)
+    weights = [MIX[n][0] for n in names]
+    t, out = 0.0, []
+    while True:
+        t += rng.expovariate(rps)
+        if t >= duration:
+            return out
+        user = rng.randrange(users) if rng.random() < logged_in else None
+        out.append({"t": round(t, 4), "endpoint": rng.choices(names, weights)[0],
+                    "user": user, "seed": rng.getrandbits(32)})
+
+
+# ── In-process server with a gthread model ─────────────────────────────────
+
+class GthreadModel:
+    """WSGI wrapper: at most `threads` requests run at once; the rest queue."""
+
+    def __init__(self, app, threads: int):
+        self.app = app
+        self.threads = threads
+        self._slots = threading.Semaphore(threads)
+        self._lock = threading.Lock()
+        self.busy_s = 0.0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.waits: list[float] = []
+
+    def __call__(self, environ, start_response):
+        arrived = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+        self._slots.acquire()
+        started = time.perf_counter()
+        with self._lock:
+            self.waiting -= 1
+            self.waits.append(started - arrived)
+        try:
+            # Materialise the body inside the slot, as a gthread worker would
+            app_iter = self.app(environ, start_response)
+            try:
+                return list(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+        finally:
+            with self._lock:
+                self.busy_s += time.perf_counter() - started
+            self._slots.release()
+
+
+def start_inprocess(args) -> tuple[str, GthreadModel, list[str], list, FakeGroq, FakeSupabase]:
+    """(base url, thread model, session ids, stop callbacks, the fakes — their knobs stay live)."""
+    groq = FakeGroq(error_rate=args.groq_error_rate, distribution=args.distribution, jitter=args.jitter).start()
+    supa = FakeSupabase(latency_s=args.db_latency).start()
+    user_ids = supa.seed_users(args.users)
+    os.environ.update({
+        "GROQ_BASE_URL": groq.base_url, "GROQ_API_KEY": "fake",
+        "SUPABASE_URL": supa.base_url, "SUPABASE_ANON_KEY": "fake",
+    })
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app import app
+
+    # Sessions for the seeded users, straight into the server-side store
+    store = app.session_interface.store
+    serializer = app.session_interface.serializer
+    sids = []
+    for i, uid in enumerate(user_ids):
+        sid = f"bench-session-{i}"
+        store.set(sid, serializer.dumps({"user": {"id": uid, "email": f"bench{i}@example.com",
+                                                  "name": f"Bench User {i}", "avatar": ""}}), 3600)
+        sids.append(sid)
+
+    model = GthreadModel(app, args.threads)
+    quiet = type("QuietHandler", (WSGIRequestHandler,), {"log_request": lambda *a, **k: None})
+    server = make_server("127.0.0.1", 0, model, threaded=True, request_handler=quiet)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", model, sids, [server.shutdown, groq.stop, supa.stop], groq, supa
+
+
+# ── Driver ─────────────────────────────────────────────────────────────────
+
+_local = threading.local()
+
+
+def _send(base: str, entry: dict, sids: list[str], timeout: float) -> dict:
+    import requests
+
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = _local.http = requests.Session()
+    _, method, path, build = MIX[entry["endpoint"]]
+    kwargs = build(random.Random(entry["seed"])) if build else {}
+    headers = {"Accept-Encoding": "gzip, br"}
+    if entry["user"] is not None and sids:
+        headers["Cookie"] = f"session={sids[entry['user'] % len(sids)]}"
+    http.cookies.clear()   # each entry carries its own identity; don't leak Set-Cookie between them
+    start = time.perf_counter()
+    try:
+        resp = http.request(method, base + path, headers=headers, timeout=timeout, **kwargs)
+        status = resp.status_code
+    except Exception as e:
+        status = type(e).__name__
+    return {"endpoint": entry["endpoint"], "status": status, "latency": time.perf_counter() - start}
+
+
+async def drive(base: str, schedule: list[dict], sids: list[str], concurrency: int, timeout: float) -> list[dict]:
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    t0 = loop.time()
+    tasks = []
+    for entry in schedule:
+        delay = t0 + entry["t"] - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(loop.run_in_executor(pool, _send, base, entry, sids, timeout))
+    results = await asyncio.gather(*tasks)
+    pool.shutdown()
+    return results
+
+
+# ── Report ─────────────────────────────────────────────────────────────────
+
+def _pct(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0.0
+
+
+def report(results: list[dict], wall: float, model: GthreadModel | None) -> dict:
+    by_endpoint: dict[str, list[dict]] = {}
+    for r in results:
+        by_endpoint.setdefault(r["endpoint"], []).append(r)
+
+    out = {"wall_s": round(wall, 2), "requests": len(results), "endpoints": {}}
+    print(f"\n  {'endpoint':<14}{'n':>6}{'rps':>7}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for name in MIX:
+        rows = by_endpoint.get(name)
+        if not rows:
+            continue
+        lat = [r["latency"] for r in rows]
+        errors = sum(1 for r in rows if not isinstance(r["status"], int) or r["status"] >= 500)
+        row = {"n": len(rows), "rps": len(rows) / wall, "p50_ms": _pct(lat, 50) * 1000,
+               "p99_ms": _pct(lat, 99) * 1000, "max_ms": max(lat) * 1000, "errors": errors}
+        out["endpoints"][name] = row
+        print(f"  {name:<14}{row['n']:>6}{row['rps']:>7.2f}{row['p50_ms']:>9.0f}"
+              f"{row['p99_ms']:>9.0f}{row['max_ms']:>9.0f}{errors:>8}")
+
+    lat = [r["latency"] for r in results]
+    out["total"] = {"rps": len(results) / wall, "p50_ms": _pct(lat, 50) * 1000, "p99_ms": _pct(lat, 99) * 1000}
+    print(f"  {'ALL':<14}{len(results):>6}{out['total']['rps']:>7.2f}"
+          f"{out['total']['p50_ms']:>9.0f}{out['total']['p99_ms']:>9.0f}")
+
+    if model is not None:
+        util = model.busy_s / (model.threads * wall)
+        out["saturation"] = {
+            "threads": model.threads, "utilisation": util, "max_queue": model.max_waiting,
+            "queue_wait_p50_ms": _pct(model.waits, 50) * 1000, "queue_wait_p99_ms": _pct(model.waits, 99) * 1000,
+        }
+        s = out["saturation"]
+        print(f"\n  worker saturation: {util:.0%} of {model.threads} threads busy, max queue {s['max_queue']}, "
+              f"queue wait p50 {s['queue_wait_p50_ms']:.0f} ms / p99 {s['queue_wait_p99_ms']:.0f} ms")
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replayable /api load test")
+    parser.add_argument("--rps", type=float, default=4.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of arrivals")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--users", type=int, default=40, help="seeded fake users")
+    parser.add_argument("--logged-in", type=float, default=0.6, help="fraction of requests with a session")
+    parser.add_argument("--record", help="write the generated schedule to this JSONL")
+    parser.add_argument("--replay", help="run a schedule saved with --record")
+    parser.add_argument("--target", help="hit a running server instead of an in-process app")
+    parser.add_argument("--threads", type=int, default=16, help="gthread model size (in-process only)")
+    parser.add_argument("--concurrency", type=int, default=64, help="max client requests in flight")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--db-latency", type=float, default=0.02, help="fake Supabase median seconds")
+    parser.add_argument("--distribution", default="lognormal", help="fake Groq TTFT distribution")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's [TAG] logs during the run")
+    args = parser.parse_args()
+
+    if args.replay:
+        with open(args.replay) as f:
+            schedule = [json.loads(line) for line in f if line.strip()]
+    else:
+        schedule = make_schedule(args.rps, args.duration, args.users, args.logged_in, args.seed)
+    if args.record:
+        with open(args.record, "w") as f:
+            f.writelines(json.dumps(e) + "\n" for e in schedule)
+    print(f"[LOAD] {len(schedule)} requests over {schedule[-1]['t'] if schedule else 0:.0f}s")
+
+    model, sids, stops = None, [], []
+    if args.target:
+        base = args.target.rstrip("/")
+    else:
+        base, model, sids, stops, _, _ = start_inprocess(args)
+
+    try:
+        start = time.perf_counter()
+        logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with logs:
+            results = asyncio.run(drive(base, schedule, sids, args.concurrency, args.timeout))
+        summary = report(results, time.perf_counter() - start, model)
+    finally:
+        for stop in stops:
+            stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+bench/micro.py
+──────────────
+Micro-benchmarks for the CPU work a request does before/after the LLM call:
+
+  - comics.is_garbage_input on clean text, keyboard mash and a long resume
+  - every comics.py prompt builder the routes use
+  - LinkedInService.extract_pdf_text on 1- and 5-page generated PDFs
+
+Each case reports the best-of-`--repeat` mean per call (timeit style).
+
+    python -m bench.micro --repeat 5
+    python -m bench.micro --only garbage
+"""
+
+import argparse
+import sys
+import timeit
+
+from bench.samples import SAMPLE_PROFILE, SAMPLE_RESUME, sample_pdf
+
+COMIC = "abhishek_upmanyu"
+LONG_RESUME = (SAMPLE_RESUME + "\n" + SAMPLE_PROFILE) * 20
+
+
+def _cases() -> dict[str, dict[str, callable]]:
+    import comics
+    from services.linkedin_service import LinkedInService
+
+    pdf_1, pdf_5 = sample_pdf(pages=1), sample_pdf(pages=5)
+    return {
+        "garbage": {
+            "clean sentence":  lambda: comics.is_garbage_input("Built a payments API handling 2k rps"),
+            "keyboard mash":   lambda: comics.is_garbage_input("asdfghjklqwrtzxcvbnm"),
+            "long resume":     lambda: comics.is_garbage_input(LONG_RESUME),
+        },
+        "prompts": {
+            "garbage":         lambda: comics.get_garbage_prompt(COMIC, "resume", "asdfgh", "keyboard_mash"),
+            "resume":          lambda: comics.get_resume_prompt(COMIC, SAMPLE_RESUME),
+            "resume_create":   lambda: comics.get_resume_create_prompt(COMIC, "A", "SDE", "2y", "x", "py", "btech"),
+            "linkedin":        lambda: comics.get_linkedin_prompt(COMIC, "post", SAMPLE_PROFILE),
+            "linkedin_create": lambda: comics.get_linkedin_create_prompt(COMIC, "post", "got promoted"),
+            "idea_create":     lambda: comics.get_idea_create_prompt(COMIC, "python", "fintech"),
+            "stack_create":    lambda: comics.get_stack_create_prompt(COMIC, "web apps"),
+            "pdf_quips":       lambda: comics.get_linkedin_pdf_quips_prompt(SAMPLE_PROFILE, COMIC),
+            "pdf_scan":        lambda: comics.get_linkedin_pdf_scan_prompt(SAMPLE_PROFILE),
+            "pdf_analyse":     lambda: comics.get_linkedin_pdf_prompt(COMIC, SAMPLE_PROFILE, answers={"q1": "yes"}),
+        },
+        "pdf": {
+            "extract 1 page":  lambda: LinkedInService.extract_pdf_text(pdf_1),
+            "extract 5 pages": lambda: LinkedInService.extract_pdf_text(pdf_5),
+        },
+    }
+
+
+def _bench(fn, repeat: int) -> tuple[float, int]:
+    """Best mean seconds per call, and the loop count timeit settled on."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number, number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for request-path CPU work")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", choices=("garbage", "prompts", "pdf"))
+    args = parser.parse_args()
+
+    for group, cases in _cases().items():
+        if args.only and group != args.only:
+            continue
+        print(f"\n[{group}]")
+        print(f"  {'case':<20}{'µs/call':>12}{'loops':>9}")
+        for name, fn in cases.items():
+            per_call, number = _bench(fn, args.repeat)
+            print(f"  {name:<20}{per_call * 1e6:>12.1f}{number:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+bench/model_routing.py
+──────────────────────
+Latency and cost per route for the model-routing tier in AIService,
+measured against bench/fake_groq.py (no network, no API key needed).
+
+Runs every (tool, mode) route twice — once with config.MODEL_ROUTES as
+shipped, once with everything forced onto the big model — and prints
+p50 / p95 latency, fallbacks and USD cost per 1k calls for each.
+
+    python -m bench.model_routing --calls 20 --error-rate 0.05
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from bench.fake_groq import FakeGroq
+from bench.samples import SAMPLE_PROFILE, SAMPLE_RESUME
+
+
+def _routes():
+    from comics import (
+        get_garbage_prompt, get_linkedin_pdf_quips_prompt, get_linkedin_pdf_scan_prompt,
+        get_linkedin_pdf_prompt, get_linkedin_prompt, get_resume_prompt,
+    )
+    comic = "abhishek_upmanyu"
+    return [
+        ("garbage",      None,      lambda: get_garbage_prompt(comic, "resume", "asdfgh", "keyboard_mash")),
+        ("linkedin_pdf", "quips",   lambda: get_linkedin_pdf_quips_prompt(SAMPLE_PROFILE, comic)),
+        ("linkedin_pdf", "scan",    lambda: get_linkedin_pdf_scan_prompt(SAMPLE_PROFILE)),
+        ("linkedin_pdf", "analyse", lambda: get_linkedin_pdf_prompt(comic, SAMPLE_PROFILE)),
+        ("linkedin",     "check",   lambda: get_linkedin_prompt(comic, "post", SAMPLE_PROFILE)),
+        ("resume",       "paste",   lambda: get_resume_prompt(comic, SAMPLE_RESUME)),
+    ]
+
+
+def _run(label: str, calls: int) -> dict[str, list[float]]:
+    from services.ai_service import AIService
+
+    latencies: dict[str, list[float]] = {}
+    for tool, mode, build in _routes():
+        route = f"{tool}:{mode or '-'}"
+        for _ in range(calls):
+            prompt = build()
+            start = time.perf_counter()
+            AIService.ask(prompt, tool=tool, mode=mode)
+            latencies.setdefault(route, []).append(time.perf_counter() - start)
+
+    stats = AIService.stats()
+    print(f"\n[{label}]")
+    print(f"  {'route':<24}{'tier':<6}{'p50 ms':>9}{'p95 ms':>9}{'fallbk':>8}{'$/1k calls':>12}")
+    for tool, mode, _ in _routes():
+        route = f"{tool}:{mode or '-'}"
+        samples = sorted(latencies[route])
+        s = stats.get(route, {})
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        cost_per_1k = s.get("cost_usd", 0.0) / max(s.get("calls", 1), 1) * 1000
+        print(f"  {route:<24}{AIService.route_tier(tool, mode):<6}"
+              f"{statistics.median(samples) * 1000:>9.0f}{p95 * 1000:>9.0f}"
+              f"{s.get('fallbacks', 0):>8}{cost_per_1k:>12.4f}")
+    AIService._stats.clear()
+    return latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Model routing latency/cost benchmark")
+    parser.add_argument("--calls", type=int, default=10, help="calls per route")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake_groq failure rate")
+    args = parser.parse_args()
+
+    fake = FakeGroq(error_rate=args.error_rate).start()
+    os.environ["GROQ_BASE_URL"] = fake.base_url
+    os.environ.setdefault("GROQ_API_KEY", "fake")
+    import config
+
+    try:
+        _run("routed (config.MODEL_ROUTES)", args.calls)
+        shipped = dict(config.MODEL_ROUTES)
+        config.MODEL_ROUTES.clear()
+        try:
+            _run("baseline (everything on big)", args.calls)
+        finally:
+            config.MODEL_ROUTES.update(shipped)
+    finally:
+        fake.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+bench/neardup.py
+────────────────
+Near-duplicate index (services/similarity_service.py) at scale: fills a
+NearDupIndex with --entries random fingerprints spread over scopes of
+--scope-size entries (a scope is one user + tool + other inputs, so real
+scopes are small; the index caps one at NearDupIndex.PER_SCOPE), then times
+
+  - SimHash of a resume-sized text (the per-request fingerprint cost)
+  - query hits: a stored fingerprint with a few bits flipped
+  - query misses: a random fingerprint in an existing scope
+
+and reports the index's resident memory. Pure Python, no Supabase.
+
+    python -m bench.neardup --entries 1000000
+    python -m bench.neardup --entries 1000000 --scope-size 1000   # heavy users
+"""
+
+import argparse
+import random
+import resource
+import sys
+import time
+import timeit
+
+from bench.samples import SAMPLE_PROFILE, SAMPLE_RESUME
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _flip(rng: random.Random, fp: int, bits: int) -> int:
+    for b in rng.sample(range(64), bits):
+        fp ^= 1 << b
+    return fp
+
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, repeat=5, number=number)) / number * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Near-duplicate index lookup benchmark")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--scope-size", type=int, default=20)
+    parser.add_argument("--distance", type=int, default=8, help="index max Hamming distance")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from services.similarity_service import NearDupIndex, fingerprint
+
+    rng = random.Random(args.seed)
+    resume = (SAMPLE_RESUME + "\n" + SAMPLE_PROFILE) * 4
+    print(f"  fingerprint ({len(resume.split())} words)  {_per_call_us(lambda: fingerprint(resume), 200):>8.1f} µs")
+
+    index = NearDupIndex(args.distance, args.entries)
+    scopes = max(1, args.entries // args.scope_size)
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    stored = []
+    for i in range(args.entries):
+        scope, fp = f"user-{i % scopes}\x00resume\x00{i % 3}", rng.getrandbits(64)
+        index.add(scope, fp, f"{i:064x}")
+        if i % 997 == 0:
+            stored.append((scope, fp))
+    build = time.perf_counter() - start
+    print(f"  built {len(index):,} entries over {scopes:,} users in {build:.1f}s "
+          f"(~{(_rss_mb() - rss_before):.0f} MB resident)")
+
+    hits = [(s, _flip(rng, fp, rng.randint(0, args.distance))) for s, fp in stored]
+    misses = [(s, rng.getrandbits(64)) for s, _ in stored]
+    found = sum(index.query(s, fp) is not None for s, fp in hits)
+    false = sum(index.query(s, fp) is not None for s, fp in misses)
+
+    it = iter(hits * 1000)
+    hit_us = _per_call_us(lambda: index.query(*next(it)), 2000)
+    it = iter(misses * 1000)
+    miss_us = _per_call_us(lambda: index.query(*next(it)), 2000)
+    print(f"  query hit                  {hit_us:>8.1f} µs   ({found}/{len(hits)} found within {args.distance} bits)")
+    print(f"  query miss                 {miss_us:>8.1f} µs   ({false}/{len(misses)} false matches)")
+    return 0 if max(hit_us, miss_us) < 1000 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
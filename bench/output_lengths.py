@@ -0,0 +1,84 @@
+"""
+bench/output_lengths.py
+───────────────────────
+Output budgets (config.OUTPUT_BUDGETS) against a rambling model: fake_groq
+overshoots the structure each prompt asks for on --ramble of replies.
+
+Runs every (tool, mode) route twice — once with budgets as shipped, once
+with no max_tokens / stop / early cut-off — and prints per route the p50 /
+p99 latency, output-token percentiles, replies capped or cut early, and
+whether the reply still parses (5 questions for scan, quips for quips).
+
+    python -m bench.output_lengths --calls 20 --ramble 0.4
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+from bench.fake_groq import FakeGroq
+from bench.model_routing import _routes
+
+CHECKS = {
+    "linkedin_pdf:scan":  lambda text: len(re.findall(r"\[\s*QUESTION\b", text)) == 5,
+    "linkedin_pdf:quips": lambda text: len(re.findall(r"\[\s*QUIP\b", text)) >= 5,
+}
+
+
+def _run(label: str, calls: int) -> None:
+    from services.ai_service import AIService
+
+    print(f"\n[{label}]")
+    print(f"  {'route':<24}{'p50 ms':>8}{'p99 ms':>8}{'tok p50':>9}{'tok p90':>9}{'tok max':>9}"
+          f"{'capped':>8}{'cut':>6}{'parses':>8}")
+    for tool, mode, build in _routes():
+        route = f"{tool}:{mode or '-'}"
+        latencies, ok = [], 0
+        for _ in range(calls):
+            start = time.perf_counter()
+            text = AIService.ask(build(), tool=tool, mode=mode)
+            latencies.append(time.perf_counter() - start)
+            ok += CHECKS.get(route, bool)(text)
+        latencies.sort()
+        s = AIService.stats().get(route, {})
+        out = s.get("output_tokens", {})
+        print(f"  {route:<24}{statistics.median(latencies) * 1000:>8.0f}"
+              f"{latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000:>8.0f}"
+              f"{out.get('p50', 0):>9}{out.get('p90', 0):>9}{out.get('max', 0):>9}"
+              f"{s.get('capped', 0):>8}{s.get('cut_early', 0):>6}{f'{ok}/{calls}':>8}")
+    AIService._stats.clear()
+    AIService._lengths.clear()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Output budget benchmark against a rambling model")
+    parser.add_argument("--calls", type=int, default=10, help="calls per route")
+    parser.add_argument("--ramble", type=float, default=0.4, help="share of replies that overshoot")
+    args = parser.parse_args()
+
+    fake = FakeGroq(ramble=args.ramble).start()
+    os.environ.update({"GROQ_BASE_URL": fake.base_url, "HEDGING_ENABLED": "0"})
+    os.environ.setdefault("GROQ_API_KEY", "fake")
+    import config
+    import services.ai_service as ai
+
+    try:
+        _run("budgets (config.OUTPUT_BUDGETS)", args.calls)
+        shipped, default = dict(config.OUTPUT_BUDGETS), ai.OUTPUT_DEFAULT_MAX_TOKENS
+        config.OUTPUT_BUDGETS.clear()
+        ai.OUTPUT_DEFAULT_MAX_TOKENS = 8192
+        try:
+            _run("baseline (no budgets)", args.calls)
+        finally:
+            config.OUTPUT_BUDGETS.update(shipped)
+            ai.OUTPUT_DEFAULT_MAX_TOKENS = default
+    finally:
+        fake.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+bench/overload.py
+─────────────────
+Admission control under a Groq slowdown: drives bench/load.py's traffic mix
+(plus garbage inputs and roast battles) at the in-process app, and part way
+through uses fake Groq's latency knobs to make every model --slow-ttft
+seconds to first token, then restores them.
+
+Per phase (before / slow / after) and endpoint it reports how many requests
+were served normally, served degraded (cached / template answers), shed
+with 503 + Retry-After, or failed (other 5xx, client timeout), with p50 /
+p99 latency — /ping and the leaderboards should stay fast throughout.
+
+    python -m bench.overload
+    python -m bench.overload --no-admission   # same traffic, limits lifted
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.load import COMICS, MIX, _json_body, _pct, start_inprocess
+from bench.samples import SAMPLE_RESUME
+
+OVERLOAD_MIX = {
+    **MIX,
+    "garbage": (6, "POST", "/api/idea", lambda rng: _json_body(
+        {"mode": "check", "idea": rng.choice(("asdfgh", "qwrtzp", "....", "")), "market": "India",
+         "comic": rng.choice(COMICS)})),
+    "battle":  (3, "POST", "/api/resume", lambda rng: _json_body(
+        {"mode": "paste", "comics": list(COMICS), "stream": False,
+         "resume_text": SAMPLE_RESUME + f"\nRef {rng.randint(1, 10_000)}"})),
+}
+
+# Limits high enough that nothing is ever degraded or shed
+NO_ADMISSION_ENV = {
+    "LLM_MAX_INFLIGHT": "100000", "LLM_MAX_WAITING": "100000", "ADMISSION_MAX_TOOL_REQUESTS": "100000",
+    "ADMISSION_DEGRADE_WAIT_S": "1e9", "ADMISSION_SHED_WAIT_S": "1e9", "LLM_MAX_QUEUE_WAIT_S": "1e9",
+}
+
+_local = threading.local()
+
+
+def _send(base: str, name: str, seed: int, sid: str | None, timeout: float, phase: str) -> dict:
+    import requests
+
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = _local.http = requests.Session()
+    _, method, path, build = OVERLOAD_MIX[name]
+    kwargs = build(random.Random(seed)) if build else {}
+    headers = {"Cookie": f"session={sid}"} if sid else {}
+    http.cookies.clear()
+    start = time.perf_counter()
+    outcome = "failed"
+    try:
+        resp = http.request(method, base + path, headers=headers, timeout=timeout, **kwargs)
+        if resp.status_code == 503:
+            outcome = "shed"
+        elif resp.status_code < 500:
+            body = resp.json() if resp.headers.get("Content-Type", "").startswith("application/json") else {}
+            outcome = "degraded" if isinstance(body, dict) and body.get("degraded") else "ok"
+    except Exception:
+        pass
+    return {"endpoint": name, "phase": phase, "outcome": outcome, "latency": time.perf_counter() - start}
+
+
+async def drive(base: str, sids: list[str], args, groq) -> list[dict]:
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=256)
+    rng = random.Random(args.seed)
+    names = list(OVERLOAD_MIX)
+    weights = [OVERLOAD_MIX[n][0] for n in names]
+    normal = dict(groq.models)
+    slow = {model: (args.slow_ttft, rate) for model, (_, rate) in normal.items()}
+    phases = (("before", args.warm, normal), ("slow", args.slow, slow), ("after", args.recover, normal))
+
+    tasks = []
+    for phase, seconds, models in phases:
+        groq.models = models
+        end = loop.time() + seconds
+        while loop.time() < end:
+            await asyncio.sleep(rng.expovariate(args.rps))
+            sid = rng.choice(sids) if rng.random() < 0.6 else None
+            tasks.append(loop.run_in_executor(pool, _send, base, rng.choices(names, weights)[0],
+                                              rng.getrandbits(32), sid, args.timeout, phase))
+    results = await asyncio.gather(*tasks)
+    pool.shutdown()
+    return results
+
+
+def report(results: list[dict]) -> None:
+    for phase in ("before", "slow", "after"):
+        rows = [r for r in results if r["phase"] == phase]
+        print(f"\n  [{phase}]  {'n':>4}{'ok':>5}{'degr':>6}{'503':>5}{'fail':>6}{'p50 ms':>9}{'p99 ms':>9}")
+        for name in OVERLOAD_MIX:
+            mine = [r for r in rows if r["endpoint"] == name]
+            if not mine:
+                continue
+            count = {o: sum(r["outcome"] == o for r in mine) for o in ("ok", "degraded", "shed", "failed")}
+            lat = [r["latency"] for r in mine]
+            print(f"  {name:<12}{len(mine):>4}{count['ok']:>5}{count['degraded']:>6}{count['shed']:>5}"
+                  f"{count['failed']:>6}{_pct(lat, 50) * 1000:>9.0f}{_pct(lat, 99) * 1000:>9.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Admission control under a fake Groq slowdown")
+    parser.add_argument("--rps", type=float, default=5.0)
+    parser.add_argument("--warm", type=float, default=5.0, help="seconds at normal Groq latency")
+    parser.add_argument("--slow", type=float, default=25.0, help="seconds with Groq slowed down")
+    parser.add_argument("--recover", type=float, default=10.0, help="seconds after it recovers")
+    parser.add_argument("--slow-ttft", type=float, default=12.0, help="time to first token while slow")
+    parser.add_argument("--threads", type=int, default=16, help="gthread model size")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout (a stand-in for gunicorn's)")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--no-admission", action="store_true", help="lift every admission limit")
+    args = parser.parse_args()
+
+    os.environ["TOOL_RATE_PER_MIN"] = "0"   # measure shedding, not the per-user rate limit
+    if args.no_admission:
+        os.environ.update(NO_ADMISSION_ENV)
+    setup = argparse.Namespace(groq_error_rate=0.0, distribution="uniform", jitter=0.25,
+                               db_latency=0.01, users=20, threads=args.threads)
+    base, _, sids, stops, groq, _ = start_inprocess(setup)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = asyncio.run(drive(base, sids, args, groq))
+        print(f"[OVERLOAD] admission {'off' if args.no_admission else 'on'}, {len(results)} requests, "
+              f"Groq TTFT {args.slow_ttft}s during the slow phase")
+        report(results)
+    finally:
+        for stop in stops:
+            stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
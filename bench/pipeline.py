@@ -0,0 +1,97 @@
+"""
+bench/pipeline.py
+─────────────────
+Per-request overhead of the tool pipeline engine (services/pipeline_service.py)
+against the hand-written route body it replaced — parse, garbage check, input
+hash, history lookup, ask, log_tool_use, record_history, jsonify, inline.
+
+Groq and Supabase are swapped for instant no-ops so only the request-path
+CPU remains; the rate limiter runs with a bucket too big to ever refuse.
+The difference between the two is what the engine costs (budget: < 50 µs).
+
+    python -m bench.pipeline --repeat 5
+"""
+
+import argparse
+import sys
+import timeit
+
+from flask import Flask, jsonify
+
+from bench.samples import SAMPLE_IDEAS
+
+BUDGET_US = 50.0
+USER_ID   = "7f0c1a52-4b6e-4f3e-9d59-3c1c2b7c9a11"
+
+
+def _stub_backends() -> None:
+    from services.ai_service import AIService
+    from services.db_service import DatabaseService
+    from services import pipeline_service
+
+    AIService.ask                  = staticmethod(lambda prompt, tool="", mode=None: "roast")
+    DatabaseService.find_history   = staticmethod(lambda user_id, tool, input_hash: None)
+    DatabaseService.log_tool_use   = staticmethod(lambda tool_name, user_id=None: {"xp": 10})
+    DatabaseService.record_history = staticmethod(lambda *a, **k: None)
+    pipeline_service._buckets      = pipeline_service._Buckets(1e12, 10**12)
+
+
+def _hand_rolled(data: dict, user_id: str):
+    """The idea/check route as it was written before the engine."""
+    from comics import get_idea_analyst_prompt, is_garbage_input
+    from services.ai_service import AIService
+    from services.db_service import DatabaseService
+    from services.pipeline_service import input_hash
+
+    mode        = data.get("mode", "check")
+    comic       = data.get("comic", "abhishek_upmanyu")
+    idea_text   = data.get("idea", "")
+    market_text = data.get("market", "")
+    for val in [idea_text, market_text]:
+        garbage, reason = is_garbage_input(str(val))
+        if garbage:
+            return jsonify({"message": "garbage"})
+    h = input_hash("idea", data)
+    if DatabaseService.find_history(user_id, "idea", h):
+        return jsonify({"message": "replay"})
+    message = AIService.ask(get_idea_analyst_prompt(idea_text, market_text), tool="idea", mode=mode)
+    stats = DatabaseService.log_tool_use("idea", user_id=user_id)
+    DatabaseService.record_history(user_id, "idea", mode, comic, h, message)
+    return jsonify({"message": message, "stats": stats})
+
+
+def _bench(fn, repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tool pipeline engine overhead benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    _stub_backends()
+    import routes.tools  # noqa: F401 — registers the tool specs
+    from services.pipeline_service import PipelineService
+
+    idea, market = SAMPLE_IDEAS[0]
+    data = {"mode": "check", "comic": "abhishek_upmanyu", "idea": idea, "market": market}
+
+    app = Flask("bench_pipeline")
+    with app.test_request_context("/api/idea", method="POST", json=data,
+                                  environ_base={"REMOTE_ADDR": "127.0.0.1"}):
+        baseline = _bench(lambda: _hand_rolled(data, USER_ID), args.repeat)
+        engine   = _bench(lambda: PipelineService.run("idea", data, USER_ID, "check"), args.repeat)
+
+    overhead = (engine - baseline) * 1e6
+    print(f"  {'path':<20}{'µs/request':>12}")
+    print(f"  {'hand-rolled route':<20}{baseline * 1e6:>12.1f}")
+    print(f"  {'pipeline engine':<20}{engine * 1e6:>12.1f}")
+    print(f"\n  engine overhead: {overhead:.1f} µs/request "
+          f"({'within' if overhead < BUDGET_US else 'OVER'} the {BUDGET_US:.0f} µs budget)")
+    return 0 if overhead < BUDGET_US else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
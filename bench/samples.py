@@ -0,0 +1,34 @@
+"""
+bench/samples.py
+────────────────
+Sample inputs shared by the benchmarks: a LinkedIn-style profile, a weak
+resume, and a generated LinkedIn-export-looking PDF of the profile.
+"""
+
+SAMPLE_PROFILE = (
+    "Pushkar Sharma\nBackend Engineer at TCS | B.Tech CSE | Open to Opportunities\n"
+    "About\nI am a passionate software developer with 2 years of experience in Python, Flask and SQL.\n"
+    "Experience\nSoftware Engineer, TCS — Worked on backend systems for the payments team.\n"
+    "Responsible for developing and maintaining APIs.\nSkills\nPython, Java, Problem Solving, Communication\n"
+)
+SAMPLE_RESUME = "Name: Test User\nExperience: Worked on projects\nSkills: Python, teamwork, MS Office"
+
+SAMPLE_IDEAS = (
+    ("An app that tells you which canteen has the shortest queue", "college students"),
+    ("Uber for borrowing calculators before exams", "engineering students"),
+    ("AI that writes your LinkedIn posts about AI", "aspiring thought leaders"),
+)
+
+
+def sample_pdf(text: str = SAMPLE_PROFILE, pages: int = 1) -> bytes:
+    """A PDF with `text` repeated over `pages` pages — needs pymupdf, like the app."""
+    import fitz
+
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"{text}\nlinkedin.com/in/pushkar\n{n + 1}",
+                            fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
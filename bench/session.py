@@ -0,0 +1,112 @@
+"""
+bench/session.py
+────────────────
+Cookie size and per-request session cost: Flask's signed-cookie sessions
+(what auth.callback used to fill with the user dict + access token) versus
+middleware/sessions.py with each store backend.
+
+For each it reports the Cookie request-header bytes a signed-in browser
+sends and the mean time to open + save the session for a read-only request
+(the common case — every tool call reads session["user"]).
+
+    python -m bench.session --requests 5000
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+
+from flask import Flask, session
+from flask.sessions import SecureCookieSessionInterface
+
+
+def _fake_jwt(n_bytes: int = 640) -> str:
+    enc = lambda b: base64.urlsafe_b64encode(b).rstrip(b"=").decode()
+    return ".".join((enc(b'{"alg":"HS256","typ":"JWT"}'), enc(os.urandom(n_bytes)), enc(os.urandom(32))))
+
+
+SIGNED_IN = {
+    "user": {
+        "id":     "7f0c1a52-4b6e-4f3e-9d59-3c1c2b7c9a11",
+        "email":  "pushkar.sharma@example.com",
+        "name":   "Pushkar Sharma",
+        "avatar": "https://lh3.googleusercontent.com/a/ACg8ocJ3xY2bq0yZ9l4Kp7mN5vT1rW8sD6fG0hJ2kL4=s96-c",
+    },
+}
+
+
+def _legacy_data() -> dict:
+    return {"user": {**SIGNED_IN["user"], "access_token": _fake_jwt()}}
+
+
+def _server_data() -> dict:
+    return {**SIGNED_IN, "tokens": {"access_token": _fake_jwt(), "refresh_token": "rt-" + "x" * 20,
+                                    "expires_at": int(time.time()) + 3600}}
+
+
+def _measure(label: str, interface, data: dict, n: int) -> None:
+    app = Flask("bench_session")
+    app.secret_key = "bench-secret"
+    app.session_interface = interface
+
+    @app.route("/seed")
+    def seed():
+        session.update(data)
+        return "ok"
+
+    @app.route("/read")
+    def read():
+        return session.get("user", {}).get("id", "")
+
+    client = app.test_client()
+    client.get("/seed")
+    cookie = client.get_cookie("session")
+    header = f"session={cookie.value}"
+
+    # open + save only — the part the session interface owns
+    with app.test_request_context("/read", headers={"Cookie": header}):
+        from flask import request
+        resp = app.response_class("x")
+        start = time.perf_counter()
+        for _ in range(n):
+            s = interface.open_session(app, request)
+            _ = s.get("user")
+            interface.save_session(app, s, resp)
+        per_req = (time.perf_counter() - start) / n
+
+    print(f"  {label:<22}{len(header):>10}{per_req * 1e6:>12.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Session cookie size / cost benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    from middleware.sessions import ServerSessionInterface, MemoryStore, SQLiteStore, RedisStore
+
+    print(f"  {'backend':<22}{'cookie B':>10}{'µs/request':>12}")
+    _measure("signed cookie (old)", SecureCookieSessionInterface(), _legacy_data(), args.requests)
+    _measure("server / memory", ServerSessionInterface(MemoryStore()), _server_data(), args.requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(os.path.join(tmp, "sessions.db"))
+        _measure("server / sqlite", ServerSessionInterface(store), _server_data(), args.requests)
+
+    try:
+        store = RedisStore()
+        store._redis.ping()
+    except Exception as e:
+        print(f"  server / redis        skipped ({type(e).__name__})")
+    else:
+        _measure("server / redis", ServerSessionInterface(store), _server_data(), args.requests)
+
+    print(f"\n  session JSON kept server-side: {len(json.dumps(_server_data()))} B")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+bench/startup.py
+────────────────
+Cold-start benchmark: how long until a fresh process answers /ping?
+
+Two measurements, each in a brand-new interpreter so nothing is cached:
+  1. `python -X importtime -c "import app"` — parsed into the slowest
+     top-level imports (cumulative µs), to see what boot is paying for
+  2. wall time from interpreter start to the first /ping response via
+     Flask's test client, median over --runs
+
+    python -m bench.startup --runs 5 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PING_SNIPPET = (
+    "import time, sys; t0 = float(sys.argv[1]);"
+    "import app;"
+    "r = app.app.test_client().get('/ping');"
+    "assert r.status_code == 200;"
+    "print(time.time() - t0)"
+)
+
+
+def import_profile(top: int) -> tuple[int, list[tuple[int, str]]]:
+    """Return (total cumulative µs for `import app`, its slowest direct imports)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit("[STARTUP] `import app` failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        name = name.rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, int(cum_us), name.strip()))
+
+    top_level = [(cum, name) for depth, cum, name in rows if depth == 1]
+    total = next((cum for _, cum, name in rows if name == "app"), sum(c for c, _ in top_level))
+    return total, sorted(top_level, reverse=True)[:top]
+
+
+def time_to_first_ping() -> float:
+    proc = subprocess.run(
+        [sys.executable, "-c", PING_SNIPPET, repr(time.time())],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit("[STARTUP] /ping run failed")
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ANVIL cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top",  type=int, default=15)
+    args = parser.parse_args()
+
+    total, slowest = import_profile(args.top)
+    print(f"[STARTUP] import app: {total / 1000:.1f} ms cumulative")
+    for cum, name in slowest:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    samples = [time_to_first_ping() for _ in range(args.runs)]
+    print(f"[STARTUP] time-to-first-/ping over {args.runs} runs: "
+          f"median {statistics.median(samples) * 1000:.0f} ms, "
+          f"min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
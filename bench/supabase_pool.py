@@ -0,0 +1,107 @@
+"""
+bench/supabase_pool.py
+──────────────────────
+Round-trip cost of Supabase data access: a fresh connection per call (what
+the old shared supabase-py client fell back to after every sign-in / token
+refresh rebuilt its PostgREST client) against config.get_postgrest()'s
+shared keep-alive pool, plus row-at-a-time inserts against insert_many.
+
+Runs against bench/fake_supabase.py with a per-connection handshake delay
+standing in for TCP + TLS setup to the Supabase region (HTTP/2 itself needs
+TLS, so locally the pool speaks keep-alive HTTP/1.1), or against a real
+PostgREST with --target / --key.
+
+    python -m bench.supabase_pool --calls 200 --handshake 0.03 --latency 0.005
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _fresh_select(url: str, key: str) -> None:
+    import httpx
+    from postgrest import SyncPostgrestClient
+
+    with httpx.Client() as http:
+        client = SyncPostgrestClient(f"{url}/rest/v1", headers={"apikey": key, "Authorization": f"Bearer {key}"},
+                                     http_client=http)
+        client.table("user_stats").select("xp, streak, tools_used").limit(1).execute()
+
+
+def _pooled_select() -> None:
+    from config import get_postgrest
+    get_postgrest().table("user_stats").select("xp, streak, tools_used").limit(1).execute()
+
+
+def _timed(fn, calls: int, threads: int) -> float:
+    """Mean wall ms per call with `threads` callers sharing the work."""
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(calls):
+            fn()
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda _: fn(), range(calls)))
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Supabase connection pool / bulk write benchmark")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent callers (gunicorn --threads)")
+    parser.add_argument("--rows", type=int, default=1000, help="rows for the bulk insert comparison")
+    parser.add_argument("--latency", type=float, default=0.005, help="fake server time per request")
+    parser.add_argument("--handshake", type=float, default=0.03, help="fake cost of a new connection")
+    parser.add_argument("--target", help="real PostgREST/Supabase base URL instead of the fake")
+    parser.add_argument("--key", default="anon")
+    args = parser.parse_args()
+
+    fake = None
+    if args.target:
+        url = args.target.rstrip("/")
+    else:
+        from bench.fake_supabase import FakeSupabase
+        fake = FakeSupabase(latency_s=args.latency, distribution="fixed", handshake_s=args.handshake).start()
+        fake.seed_users(20)
+        url = fake.base_url
+    os.environ["SUPABASE_URL"], os.environ["SUPABASE_ANON_KEY"] = url, args.key
+
+    from services.db_service import DatabaseService
+
+    _pooled_select()   # open the pool once, as a long-lived worker would have
+    print(f"  {'case':<34}{'ms/call':>10}{'new conns':>11}")
+    for label, fn, threads in (
+        ("select, fresh connection", lambda: _fresh_select(url, args.key), 1),
+        ("select, shared pool", _pooled_select, 1),
+        (f"select ×{args.threads} threads, fresh", lambda: _fresh_select(url, args.key), args.threads),
+        (f"select ×{args.threads} threads, shared pool", _pooled_select, args.threads),
+    ):
+        before = fake.connections if fake else 0
+        ms = _timed(fn, args.calls, threads)
+        conns = (fake.connections - before) if fake else "-"
+        print(f"  {label:<34}{ms:>10.2f}{conns:>11}")
+
+    rows = [{"user_id": f"bench-{i % 20}", "tool": "resume", "mode": "paste", "comic": "abhishek_upmanyu",
+             "input_hash": f"{i:064x}", "output": "roast " * 40, "simhash": None, "near_scope": None}
+            for i in range(args.rows)]
+    from config import get_postgrest
+    start = time.perf_counter()
+    for row in rows[:args.rows // 10]:
+        get_postgrest().table("roast_history").insert(row).execute()
+    one_by_one = (time.perf_counter() - start) / (args.rows // 10) * args.rows
+    start = time.perf_counter()
+    DatabaseService.insert_many("roast_history", rows)
+    bulk = time.perf_counter() - start
+    print(f"\n  insert {args.rows} rows one at a time   {one_by_one * 1000:>10.0f} ms  (extrapolated from {args.rows // 10})")
+    print(f"  insert {args.rows} rows, insert_many     {bulk * 1000:>10.0f} ms")
+
+    if fake:
+        fake.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
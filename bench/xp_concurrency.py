@@ -0,0 +1,82 @@
+"""
+bench/xp_concurrency.py
+───────────────────────
+Concurrency check for the server-side XP engine (sql/record_tool_use.sql).
+
+Needs a live Supabase database with sql/record_tool_use.sql applied
+(SUPABASE_URL / SUPABASE_ANON_KEY) — there is no offline mode; the fake in
+bench/fake_supabase.py doesn't implement the RPC's locking or dedupe. Run it
+against a dev project, never production:
+
+    python -m bench.xp_concurrency --user-id <uuid> --calls 50 --replays 10 --workers 16
+
+Two phases, each checked against the user's xp / tools_used before and after:
+
+  concurrent  N parallel calls, each with its own p_use_id — xp / tools_used
+              must move by exactly N increments (no lost updates)
+  replay      R use ids, each sent twice at once, as an outbox replay racing
+              its first attempt would — only R awards may land (no duplicate XP)
+"""
+
+import argparse
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config import SUPABASE_URL, get_postgrest, TOOL_XP
+from services.db_service import DatabaseService
+
+
+def _record(user_id: str, tool_name: str, use_id: str) -> None:
+    get_postgrest().rpc("record_tool_use", {
+        "p_user_id":   user_id,
+        "p_tool_name": tool_name,
+        "p_xp":        TOOL_XP[tool_name],
+        "p_use_id":    use_id,
+    }).execute()
+
+
+def _phase(name: str, user_id: str, tool: str, use_ids: list[str], awards: int, workers: int) -> bool:
+    """Record every id in use_ids concurrently; True if exactly `awards` uses were counted."""
+    before = DatabaseService.get_user_stats(user_id)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda use_id: _record(user_id, tool, use_id), use_ids))
+    after = DatabaseService.get_user_stats(user_id)
+
+    expected_xp   = before.get("xp", 0) + awards * TOOL_XP[tool]
+    expected_uses = before.get("tools_used", 0) + awards
+    ok = after.get("xp") == expected_xp and after.get("tools_used") == expected_uses
+
+    print(f"[XP] {name}: {len(use_ids)} calls, {awards} distinct use ids")
+    print(f"[XP]   xp:         {before.get('xp', 0)} → {after.get('xp')} (expected {expected_xp})")
+    print(f"[XP]   tools_used: {before.get('tools_used', 0)} → {after.get('tools_used')} (expected {expected_uses})")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--tool",    default="linkedin", choices=sorted(TOOL_XP))
+    parser.add_argument("--calls",   type=int, default=50)
+    parser.add_argument("--replays", type=int, default=10, help="use ids sent twice in the replay phase")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    if not SUPABASE_URL:
+        print("[XP] needs a live Supabase (SUPABASE_URL / SUPABASE_ANON_KEY) — nothing to check offline")
+        return 2
+
+    fresh = [str(uuid.uuid4()) for _ in range(args.calls)]
+    replayed = [str(uuid.uuid4()) for _ in range(args.replays)]
+    print(f"[XP] workers={args.workers}")
+    ok_concurrent = _phase("concurrent", args.user_id, args.tool, fresh, args.calls, args.workers)
+    ok_replay = _phase("replay", args.user_id, args.tool,
+                       [u for u in replayed for _ in (0, 1)], args.replays, args.workers)
+
+    print("[XP] OK — no lost updates" if ok_concurrent else "[XP] FAIL — lost updates detected")
+    print("[XP] OK — replayed use ids awarded once" if ok_replay else "[XP] FAIL — duplicate XP for a replayed use id")
+    return 0 if ok_concurrent and ok_replay else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
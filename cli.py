@@ -0,0 +1,124 @@
+"""
+cli.py
+──────
+Maintenance commands that run outside the request cycle.
+
+  python cli.py rollup      fold new tool_uses rows into usage_rollups
+  python cli.py backfill    rebuild usage_rollups from the full history
+  python cli.py snapshot    freeze completed weeks' leaderboards
+  python cli.py batch SRC   roast a directory / JSONL of resumes or PDFs offline
+  python cli.py lengths     output-length distribution per tool/mode vs its budget
+
+`rollup` is incremental (high-water mark on tool_uses.id) and safe to run
+from cron as often as you like, and so is `snapshot` (it only fills weeks
+that have none; --week re-freezes one on purpose). `batch` checkpoints into its --out JSONL;
+rerun the same command after a crash to pick up where it stopped.
+`lengths` reads recent roast_history rows, so it sees what users were
+actually served; a running app's own counters are at /api/admin/ai-stats.
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+
+from config import BATCH_WORKERS, BATCH_RATE_PER_MIN, BATCH_RETRIES, SNAPSHOT_LOOKBACK_WEEKS
+from services.db_service import DatabaseService
+
+
+def cmd_rollup(args) -> int:
+    start = time.perf_counter()
+    n = DatabaseService.refresh_usage_rollups(batch_size=args.batch)
+    print(f"[ROLLUP] processed {n} new rows in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def cmd_backfill(args) -> int:
+    start = time.perf_counter()
+    n = DatabaseService.rebuild_usage_rollups(batch_size=args.batch)
+    print(f"[ROLLUP] rebuilt from {n} rows in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def cmd_snapshot(args) -> int:
+    from services.leaderboard_service import LeaderboardService
+
+    if args.week:
+        LeaderboardService.snapshot_week(date.fromisoformat(args.week))
+    else:
+        due = LeaderboardService.snapshot_due(lookback=args.lookback)
+        print(f"[LEADERBOARD] {len(due)} week(s) snapshotted")
+    return 0
+
+
+def cmd_batch(args) -> int:
+    from services.batch_service import BatchService
+
+    summary = BatchService.run(
+        args.source, args.out, tool=args.tool, comic=args.comic, workers=args.workers,
+        rate_per_min=args.rate, retries=args.retries, retry_errors=args.retry_errors, limit=args.limit,
+    )
+    print(f"[BATCH] done: {summary}")
+    return 1 if summary["error"] else 0
+
+
+def cmd_lengths(args) -> int:
+    from services.ai_service import AIService
+
+    rows = DatabaseService.get_recent_outputs(args.limit, tool=args.tool)
+    by_route: dict[tuple[str, str], list[int]] = {}
+    for r in rows:
+        by_route.setdefault((r["tool"], r["mode"] or None), []).append(len(r["output"] or "") // 4)
+    print(f"[LENGTHS] {len(rows)} recent outputs, tokens estimated as chars / 4")
+    print(f"  {'route':<24}{'n':>6}{'p50':>7}{'p90':>7}{'p99':>7}{'max':>7}{'budget':>8}{'> budget':>10}")
+    for (tool, mode), lengths in sorted(by_route.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+        lengths.sort()
+        pick = lambda p: lengths[min(len(lengths) - 1, int(len(lengths) * p / 100))]
+        budget = AIService.output_budget(tool, mode)["max_tokens"]
+        over = sum(n > budget for n in lengths)
+        print(f"  {tool + ':' + (mode or '-'):<24}{len(lengths):>6}{pick(50):>7}{pick(90):>7}{pick(99):>7}"
+              f"{lengths[-1]:>7}{budget:>8}{over:>10}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="cli.py", description="ANVIL maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rollup", help="incrementally refresh usage rollups")
+    p.add_argument("--batch", type=int, default=50000)
+    p.set_defaults(func=cmd_rollup)
+
+    p = sub.add_parser("backfill", help="rebuild usage rollups from history")
+    p.add_argument("--batch", type=int, default=50000)
+    p.set_defaults(func=cmd_backfill)
+
+    p = sub.add_parser("snapshot", help="snapshot weekly leaderboards of completed weeks")
+    p.add_argument("--week", help="re-snapshot the week containing this date (YYYY-MM-DD)")
+    p.add_argument("--lookback", type=int, default=SNAPSHOT_LOOKBACK_WEEKS)
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser("batch", help="roast a directory or JSONL of inputs offline")
+    p.add_argument("source", help="directory of .pdf/.txt/.md files, or a .jsonl file")
+    p.add_argument("--out", default="batch_results.jsonl", help="results + checkpoint file (appended)")
+    p.add_argument("--tool", default="resume", choices=("resume", "linkedin", "linkedin_pdf"),
+                   help="tool for text inputs without their own `tool`")
+    p.add_argument("--comic", default="abhishek_upmanyu")
+    p.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    p.add_argument("--rate", type=float, default=BATCH_RATE_PER_MIN, help="max items started per minute")
+    p.add_argument("--retries", type=int, default=BATCH_RETRIES)
+    p.add_argument("--retry-errors", action="store_true", help="redo items recorded as errors")
+    p.add_argument("--limit", type=int, default=None, help="process at most N new items")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("lengths", help="output-length distribution per tool/mode vs its budget")
+    p.add_argument("--limit", type=int, default=5000, help="how many recent history rows to read")
+    p.add_argument("--tool", default=None, help="only this tool")
+    p.set_defaults(func=cmd_lengths)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
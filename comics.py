@@ -361,6 +361,34 @@ ONE WARNING: The one mistake most people make with this stack that they should a
 {PEER_TONE_NOTE}"""
 
 
+def get_idea_analyst_prompt(idea_text, market_text):
+    """Persona-less idea check the /api/idea route has always used (get_idea_check_prompt is the comic-aware one)."""
+    return f"""You are a sharp startup analyst with a dark sense of humor.
+    Analyze this startup idea and tell the person:
+    1. If it already exists (and name competitors)
+    2. How original it actually is (score out of 10)
+    3. Whether it has potential or is dead on arrival
+    4. One savage but constructive piece of advice
+    Idea: {idea_text}
+    Target Market: {market_text}
+    Keep it punchy, honest, and slightly brutal. 4-5 sentences max."""
+
+
+def get_stack_advisor_prompt(project_text, level, priority):
+    """Persona-less stack pick the /api/stack route has always used (get_stack_check_prompt is the comic-aware one)."""
+    return f"""You are an opinionated senior developer who gives direct tech stack recommendations.
+    Recommend a tech stack for this project. Be specific and decisive - no wishy-washy answers.
+    Project: {project_text}
+    Developer Experience Level: {level}
+    Priority: {priority}
+    Format your answer as:
+    FRONTEND: ...
+    BACKEND: ...
+    DATABASE: ...
+    HOSTING: ...
+    WHY: one punchy sentence explaining the choice."""
+
+
 def get_idea_create_prompt(comic, skills, interests, edge="", role="", market="", idea_type="", time_commit="", budget="", team="", current_hour=None):
     if current_hour is None:
         current_hour = get_ist_hour()
@@ -897,6 +925,101 @@ Never run two blocks together on the same line.
 {PEER_TONE_NOTE}
 {LINKEDIN_ENGLISH_NOTE}"""
 
+
+def get_linkedin_pdf_repair_prompt(comic, pdf_text, broken_blocks):
+    """
+    Targeted re-ask — only for analysis blocks that came back incomplete.
+    broken_blocks: the partial blocks, already rendered in tag format.
+    Same output format as get_linkedin_pdf_prompt, one block per input block.
+    """
+    persona = COMIC_PERSONAS.get(comic, COMIC_PERSONAS["abhishek_upmanyu"])
+
+    return f"""{persona}
+
+You already reviewed this LinkedIn profile, but some of your feedback blocks came out incomplete.
+Complete ONLY the blocks below — fill every empty field, keep every filled field as it is.
+
+THE PROFILE:
+{pdf_text}
+
+INCOMPLETE BLOCKS:
+{broken_blocks}
+
+RULES:
+- [WAS] must be the exact text from their profile that has the problem
+- [NOW] must be a benchmark-quality rewrite: action verb → what → result/scale, copy-paste ready
+- [ISSUE] is one punchy sentence in your voice
+- [PRIORITY] is High, Medium or Low
+
+OUTPUT FORMAT — one block per incomplete block, in the same order, nothing else:
+
+[SECTION: ...]
+[PRIORITY: ...]
+[ISSUE: ...]
+[WAS: ...]
+[NOW: ...]
+
+Each tag on its own line. No text before, between, or after the blocks.
+{LINKEDIN_ENGLISH_NOTE}"""
+
+
+def get_linkedin_pdf_scan_repair_prompt(raw_output):
+    """Re-ask for a scan whose output had no parseable [QUESTION] blocks — reformat only."""
+    return f"""Reformat the text below into LinkedIn follow-up questions. Do not invent new content unless the text has none.
+
+TEXT:
+{raw_output}
+
+OUTPUT FORMAT — 3 to 5 blocks, nothing else:
+
+[QUESTION: q1 | short label | placeholder showing what a good answer looks like]
+[QUESTION: q2 | short label | placeholder]
+
+The id must be q1, q2, q3, q4, q5 in sequence. One block per line. No other text."""
+
+
+# ── DEGRADED-MODE TEMPLATES ──
+# Served without calling Groq while AdmissionService is shedding load
+# (services/admission_service.py). Same tag formats as the live prompts so
+# the usual parsers read them.
+
+GARBAGE_TEMPLATES = {
+    "empty":           "Bhai tune kuch likha hi nahi. Khaali submit kar diya. Even the void has more content than this.",
+    "too_short":       "'{text}'? That's it? Yaar itna effort toh OTP type karne mein lagta hai.",
+    "symbols_only":    "'{text}' — pure punctuation, zero words. Bhai ye input hai ya password strength test?",
+    "keyboard_mash":   "'{text}' — face on keyboard detected. Uth ja bhai, neend mein submit ho gaya.",
+    "repeated_char":   "'{text}' — same key, again and again. Keyboard atak gaya ya tu?",
+    "slash_gibberish": "'{text}' — ye file path hai ya elbow se type kiya? Dono case mein, no.",
+}
+
+TOOL_NUDGES = {
+    "idea":     "Ek asli idea likh, phir baat karte hain.",
+    "stack":    "Project describe kar, stack main bata dunga.",
+    "resume":   "Resume paste kar, roast ready hai.",
+    "linkedin": "Asli LinkedIn content daal, tab mazaa aayega.",
+}
+
+
+def get_garbage_template(tool_name, garbage_input, reason):
+    """Canned garbage roast — no persona voice, no Groq call."""
+    line = GARBAGE_TEMPLATES.get(reason, "'{text}'? Bhai ye kya hai. Seriously.")
+    nudge = TOOL_NUDGES.get(tool_name, "Kuch sensible daal aur phir try kar.")
+    return f"{line.format(text=str(garbage_input).strip()[:40])} {nudge}"
+
+
+LINKEDIN_PDF_QUIPS_TEMPLATE = """[QUIP: section=Headline | quip=Headline padh raha hoon... let's see if it says more than your job title.]
+[QUIP: section=About | quip=About section — the place where every profile is "passionate". Dekhte hain.]
+[QUIP: section=Experience | quip=Experience mein numbers dhoondh raha hoon. Abhi tak search chal rahi hai.]
+[QUIP: section=Skills | quip=Skills list itni lambi, endorsements itne kam. Classic.]
+[QUIP: section=Education | quip=Education check ho raha hai — placement cell wali memories aa rahi hain.]"""
+
+LINKEDIN_PDF_SCAN_TEMPLATE = """[QUESTION: q1 | Your strongest achievement in your current or latest role | e.g. Reduced load time by 40%, handled 10k users, saved the team 5 hours/week]
+[QUESTION: q2 | The numbers behind your main project (users, scale, impact) | e.g. 2k monthly users, processed ₹5L/day, cut costs 30%]
+[QUESTION: q3 | What you personally owned, not what the team did | e.g. Designed the payments retry service end to end]
+[QUESTION: q4 | The 2-3 skills you actually use every day | e.g. Python, PostgreSQL, AWS — daily for 2 years]
+[QUESTION: q5 | The kind of role you want next | e.g. Backend roles at early-stage fintech startups]"""
+
+
 COMIC_OPTIONS = [
     {"id": "ravi_gupta",        "name": "Ravi Gupta",         "vibe": "Deadpan Misdirection"},
     {"id": "abhishek_upmanyu",  "name": "Abhishek Upmanyu",   "vibe": "Rapid-Fire Wit"},
@@ -4,34 +4,338 @@ config.py
 Single source of truth for environment variables, client initialisation,
 and app-wide constants. Everything imports from here — nothing else calls
 os.environ directly.
+
+Clients are built lazily on first use (get_groq_client / get_supabase /
+get_postgrest) so importing config — and therefore booting the app for
+/ping — doesn't pay for the groq/supabase SDK imports or fail on a missing
+env var.
 """
 
 import os
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from groq import Groq
-from supabase import create_client, Client
+
+if TYPE_CHECKING:
+    from groq import Groq
+    from supabase import Client
+    from postgrest import SyncPostgrestClient
 
 load_dotenv()
 
+_client_lock = threading.Lock()
+
 # ── Flask ──────────────────────────────────────────────────────────────────
 FLASK_SECRET_KEY: str = os.environ.get("FLASK_SECRET_KEY", "anvil-dev-secret")
 
+ADMIN_EMAILS: set[str] = {
+    e.strip().lower()
+    for e in os.environ.get("ADMIN_EMAILS", "").split(",")
+    if e.strip()
+}
+
 # ── Groq ───────────────────────────────────────────────────────────────────
 GROQ_API_KEY: str = os.environ.get("GROQ_API_KEY", "")
+GROQ_BASE_URL: str | None = os.environ.get("GROQ_BASE_URL") or None   # point at bench/fake_groq.py locally
 GROQ_MODEL: str = "llama-3.3-70b-versatile"
+GROQ_MODEL_FAST: str = os.environ.get("GROQ_MODEL_FAST", "llama-3.1-8b-instant")
+
+# ── Model routing (services/ai_service.py) ─────────────────────────────────
+# Two tiers. Each (tool, mode) route maps to a tier; if that tier errors or
+# times out, AIService retries once on the other tier.
+MODEL_TIERS: dict = {
+    "fast": GROQ_MODEL_FAST,
+    "big":  GROQ_MODEL,
+}
+MODEL_TIMEOUTS: dict = {          # seconds per attempt
+    "fast": float(os.environ.get("GROQ_TIMEOUT_FAST", "15")),
+    "big":  float(os.environ.get("GROQ_TIMEOUT_BIG", "60")),
+}
+# (tool, mode) → tier. mode=None matches every mode of that tool.
+# Anything not listed runs on "big".
+MODEL_ROUTES: dict = {
+    ("garbage",      None):     "fast",   # 2-3 sentence roast of junk input
+    ("linkedin_pdf", "quips"):  "fast",   # reading-animation one-liners
+    ("linkedin_pdf", "scan"):   "fast",   # 3-5 follow-up questions
+}
+# Output budgets: each route is capped at the length its prompt asks for
+# (comics.py) with ~1.5-2× headroom — generation time grows linearly with
+# output, and a 2-3 sentence roast has no business running to 500 tokens.
+# Sized at ~1.5 tokens per (Hing)lish word; `python cli.py lengths` shows
+# how real outputs sit against them. Looked up like MODEL_ROUTES.
+#   max_tokens  hard cap (a reply that hits it is counted as `capped`)
+#   stop        stop sequences (Groq takes up to 4)
+#   done        (block regex, n): stream the reply and close it as soon as
+#               n complete blocks are in — the structure asked for is done
+OUTPUT_BUDGETS: dict = {
+    ("garbage",      None):      {"max_tokens": 160, "stop": ["\n\n"]},   # 2-3 sentences, one paragraph
+    ("linkedin_pdf", "quips"):   {"max_tokens": 400, "done": (r"\[\s*QUIP\b[^\]]*\]", 6)},       # ≤ 6 one-liners
+    ("linkedin_pdf", "scan"):    {"max_tokens": 450, "done": (r"\[\s*QUESTION\b[^\]]*\]", 5)},   # ≤ 5 questions
+    ("linkedin_pdf", "analyse"): {"max_tokens": 2400},   # 4-8 five-tag blocks, ~200 tokens each
+    ("linkedin_pdf", "repair"):  {"max_tokens": 1000},   # ≤ MAX_REPAIR_BLOCKS (4) blocks
+    ("resume",       "create"):  {"max_tokens": 1100},   # one page
+    ("resume",       None):      {"max_tokens": 1000},   # 3-4 sentences + rewrites + 2-3 sentences
+    ("linkedin",     "create"):  {"max_tokens": 600},    # post ≤ 250 words; bio / headline far less
+    ("linkedin",     None):      {"max_tokens": 900},    # 3-4 sentences + a rewrite of their content
+    ("idea",         "create"):  {"max_tokens": 700},    # 3 ideas × 4 lines
+    ("idea",         None):      {"max_tokens": 300},    # 4-5 sentences
+    ("stack",        "create"):  {"max_tokens": 600},    # project + stack + 3 steps
+    ("stack",        None):      {"max_tokens": 250},    # 5 labelled lines
+}
+OUTPUT_DEFAULT_MAX_TOKENS: int = 1500
+OUTPUT_LENGTH_SAMPLES: int = 500   # recent output lengths kept per route for AIService.stats()
+# USD per 1M tokens (input, output) — used for cost reporting only
+MODEL_PRICING: dict = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant":    (0.05, 0.08),
+}
+
+_groq_client: "Groq | None" = None
+
+
+def get_groq_client() -> "Groq":
+    """Return the shared Groq client, building it on first call."""
+    global _groq_client
+    if _groq_client is None:
+        with _client_lock:
+            if _groq_client is None:
+                from groq import Groq
+                # No SDK-level retries — AIService retries on the other tier instead
+                _groq_client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=0)
+    return _groq_client
 
-groq_client: Groq = Groq(api_key=GROQ_API_KEY)
 
 # ── Supabase ───────────────────────────────────────────────────────────────
 SUPABASE_URL: str = os.environ.get("SUPABASE_URL", "")
 SUPABASE_ANON_KEY: str = os.environ.get("SUPABASE_ANON_KEY", "")
 
-if not SUPABASE_URL or not SUPABASE_ANON_KEY:
-    raise RuntimeError(
-        "Missing SUPABASE_URL or SUPABASE_ANON_KEY — check your .env or Render env vars"
-    )
+_supabase: "Client | None" = None
+
+
+def get_supabase() -> "Client":
+    """Return the shared Supabase client, building it on first call. Auth only — data goes through get_postgrest()."""
+    global _supabase
+    if _supabase is None:
+        with _client_lock:
+            if _supabase is None:
+                if not SUPABASE_URL or not SUPABASE_ANON_KEY:
+                    raise RuntimeError(
+                        "Missing SUPABASE_URL or SUPABASE_ANON_KEY — check your .env or Render env vars"
+                    )
+                from supabase import create_client
+                _supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    return _supabase
+
+
+# Data access (DatabaseService) goes through its own PostgREST client, not
+# get_supabase(): supabase-py points its PostgREST headers at whichever user
+# last signed in and rebuilds that client — dropping its connections — on
+# every sign-in and token refresh. This one only ever sends the anon key and
+# keeps one explicitly sized keep-alive pool for the life of the process.
+# HTTP/2 is negotiated over TLS, so threads share multiplexed connections.
+SUPABASE_POOL_SIZE: int     = int(os.environ.get("SUPABASE_POOL_SIZE", "12"))   # busy gthreads + writer + jobs
+SUPABASE_KEEPALIVE_S: float = float(os.environ.get("SUPABASE_KEEPALIVE_S", "60"))
+SUPABASE_HTTP2: bool        = os.environ.get("SUPABASE_HTTP2", "1") == "1"
+SUPABASE_CONNECT_TIMEOUT_S: float = 3.0
+# Per-call read timeouts by kind of query (DatabaseService picks one per call)
+SUPABASE_TIMEOUTS: dict = {
+    "read":   float(os.environ.get("SUPABASE_READ_TIMEOUT_S", "3")),    # request-path lookups
+    "write":  float(os.environ.get("SUPABASE_WRITE_TIMEOUT_S", "5")),
+    "bulk":   float(os.environ.get("SUPABASE_BULK_TIMEOUT_S", "15")),   # insert_many / upsert_many chunks
+    "rollup": float(os.environ.get("SUPABASE_ROLLUP_TIMEOUT_S", "120")),
+}
+SUPABASE_BULK_CHUNK: int = 500   # rows per insert_many / upsert_many request
+
+_postgrest: "SyncPostgrestClient | None" = None
+_call_timeout = threading.local()
+
+
+@contextmanager
+def supabase_timeout(seconds: float):
+    """Bound every get_postgrest() request made on this thread inside the block."""
+    previous = getattr(_call_timeout, "seconds", None)
+    _call_timeout.seconds = seconds
+    try:
+        yield
+    finally:
+        _call_timeout.seconds = previous
+
+
+def get_postgrest() -> "SyncPostgrestClient":
+    """Return the shared, thread-safe PostgREST client, building it on first call."""
+    global _postgrest
+    if _postgrest is None:
+        with _client_lock:
+            if _postgrest is None:
+                if not SUPABASE_URL or not SUPABASE_ANON_KEY:
+                    raise RuntimeError(
+                        "Missing SUPABASE_URL or SUPABASE_ANON_KEY — check your .env or Render env vars"
+                    )
+                import httpx
+                from postgrest import SyncPostgrestClient
+
+                class PooledClient(httpx.Client):
+                    def request(self, *args, **kwargs):
+                        seconds = getattr(_call_timeout, "seconds", None)
+                        if seconds is not None:
+                            kwargs.setdefault("timeout", httpx.Timeout(seconds, connect=SUPABASE_CONNECT_TIMEOUT_S))
+                        return super().request(*args, **kwargs)
+
+                http = PooledClient(
+                    http2=SUPABASE_HTTP2,
+                    limits=httpx.Limits(
+                        max_connections=SUPABASE_POOL_SIZE,
+                        max_keepalive_connections=SUPABASE_POOL_SIZE,
+                        keepalive_expiry=SUPABASE_KEEPALIVE_S,
+                    ),
+                    timeout=httpx.Timeout(SUPABASE_TIMEOUTS["write"], connect=SUPABASE_CONNECT_TIMEOUT_S),
+                    follow_redirects=True,
+                )
+                _postgrest = SyncPostgrestClient(
+                    f"{SUPABASE_URL.rstrip('/')}/rest/v1",
+                    headers={"apikey": SUPABASE_ANON_KEY, "Authorization": f"Bearer {SUPABASE_ANON_KEY}"},
+                    http_client=http,
+                )
+    return _postgrest
+
+
+# ── Roast battle (comics: [...] on the tool endpoints) ─────────────────────
+# One process-wide pool bounds how many persona calls run at once across all
+# battle requests; BATTLE_MAX_COMICS caps the fan-out of a single request.
+BATTLE_MAX_COMICS: int    = int(os.environ.get("BATTLE_MAX_COMICS", "4"))
+LLM_FANOUT_WORKERS: int   = int(os.environ.get("LLM_FANOUT_WORKERS", "8"))
+
+# ── Tool pipeline (services/pipeline_service.py) ───────────────────────────
+# Per user (or client IP when signed out) token bucket on the tool endpoints;
+# a battle costs one token per comic. 0 disables the limit.
+TOOL_RATE_PER_MIN: float = float(os.environ.get("TOOL_RATE_PER_MIN", "20"))
+TOOL_RATE_BURST: int     = int(os.environ.get("TOOL_RATE_BURST", "8"))
+
+# ── Near-duplicate reuse (services/similarity_service.py) ──────────────────
+# A resume / LinkedIn text / PDF whose 64-bit SimHash is within
+# NEARDUP_MAX_DISTANCE bits of one the same user already had roasted (same
+# tool, mode, comic and other inputs) is answered from history. Texts under
+# NEARDUP_MIN_WORDS words only match exactly. A one-word edit to a 300-word
+# resume moves ~3 bits (up to ~6); unrelated texts sit 22+ bits apart.
+# -1 disables near matching.
+NEARDUP_MAX_DISTANCE: int = int(os.environ.get("NEARDUP_MAX_DISTANCE", "8"))
+NEARDUP_MIN_WORDS: int    = int(os.environ.get("NEARDUP_MIN_WORDS", "20"))
+NEARDUP_CAPACITY: int     = int(os.environ.get("NEARDUP_CAPACITY", "200000"))
+NEARDUP_WARM_ROWS: int    = int(os.environ.get("NEARDUP_WARM_ROWS", "200"))   # per user + tool, loaded on first lookup
+
+# ── Request hedging (opt-in) ───────────────────────────────────────────────
+# If a hedged route's call hasn't streamed its first token by the route's
+# p<percentile> time-to-first-token, a duplicate is fired (on `tier`, or the
+# same tier when None) and whichever finishes first wins; the loser's stream
+# is closed. `budget` caps hedges at that fraction of the route's calls.
+HEDGING_ENABLED: bool = os.environ.get("HEDGING_ENABLED", "0") == "1"
+HEDGE_ROUTES: dict = {
+    ("linkedin_pdf", "analyse"): {"percentile": 95, "tier": "fast", "budget": 0.10},
+    ("linkedin_pdf", "scan"):    {"percentile": 90, "tier": None,   "budget": 0.15},
+    ("linkedin_pdf", "quips"):   {"percentile": 90, "tier": None,   "budget": 0.15},
+    ("resume",       None):      {"percentile": 95, "tier": None,   "budget": 0.10},
+    ("linkedin",     None):      {"percentile": 95, "tier": None,   "budget": 0.10},
+}
+HEDGE_DEFAULT_DEADLINE_S: float = 2.0   # used until a route has HEDGE_MIN_SAMPLES TTFTs
+HEDGE_MIN_SAMPLES: int = 20
+
+# ── Admission control (services/admission_service.py) ──────────────────────
+# Threads are budgeted so a Groq slowdown can't take all of them: tool
+# requests get at most ADMISSION_MAX_TOOL_REQUESTS, leaderboard streams
+# LEADERBOARD_SSE_MAX_SUBSCRIBERS, and the rest stay free for /ping, the
+# leaderboards, auth and the shell. WEB_THREADS must match the Procfile.
+WEB_THREADS: int                 = int(os.environ.get("WEB_THREADS", "16"))
+ADMISSION_MAX_TOOL_REQUESTS: int = int(os.environ.get("ADMISSION_MAX_TOOL_REQUESTS", "8"))
+LLM_MAX_INFLIGHT: int            = int(os.environ.get("LLM_MAX_INFLIGHT", "8"))    # Groq calls at once, jobs included
+LLM_MAX_WAITING: int             = int(os.environ.get("LLM_MAX_WAITING", "8"))     # queued for a slot before shedding
+LLM_MAX_QUEUE_WAIT_S: float      = float(os.environ.get("LLM_MAX_QUEUE_WAIT_S", "20"))   # then 503, far from 120s
+ADMISSION_DEGRADE_WAIT_S: float  = float(os.environ.get("ADMISSION_DEGRADE_WAIT_S", "1"))
+ADMISSION_SHED_WAIT_S: float     = float(os.environ.get("ADMISSION_SHED_WAIT_S", "8"))
+ADMISSION_WINDOW_S: float        = 10.0   # queue-wait samples older than this are forgotten
+ADMISSION_RETRY_AFTER_S: int     = 5      # minimum Retry-After on a 503
+
+# Fair share of the LLM_MAX_INFLIGHT slots. Calls queue per client (signed-in
+# user, else IP) and are granted in weighted-fair order, so one client in a
+# loop waits behind its own backlog instead of everyone else's. Interactive
+# calls go before batch and background ones (speculative PDF analyses), which
+# get no more than LLM_BACKGROUND_SLOTS while interactive calls are about.
+# LLM_FAIR_SHARE=0 is plain FIFO.
+LLM_FAIR_SHARE: bool         = os.environ.get("LLM_FAIR_SHARE", "1") == "1"
+LLM_TENANT_MAX_INFLIGHT: int = int(os.environ.get("LLM_TENANT_MAX_INFLIGHT", "4"))   # one client's calls at once
+LLM_TENANT_MAX_WAITING: int  = int(os.environ.get("LLM_TENANT_MAX_WAITING", "2"))    # one client's calls queued
+LLM_BACKGROUND_SLOTS: int    = int(os.environ.get("LLM_BACKGROUND_SLOTS", "2"))      # batch + background at once
+LLM_SHARE_WEIGHTS: dict[str, float] = {   # by client kind; a call's cost is its route's max_tokens
+    "user": 1.0,
+    "ip":   0.5,   # anonymous — signing in is free, looping scripts mostly don't
+}
+
+# ── Background jobs (services/job_service.py) ──────────────────────────────
+JOB_WORKERS: int      = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_MAX_PENDING: int  = int(os.environ.get("JOB_MAX_PENDING", "32"))
+JOB_TTL_SECONDS: int  = int(os.environ.get("JOB_TTL_SECONDS", "900"))
+
+# ── Batched DB writes (services/db_service.py) ─────────────────────────────
+DB_WRITE_FLUSH_SECONDS: float = float(os.environ.get("DB_WRITE_FLUSH_SECONDS", "2"))
+DB_WRITE_BATCH: int           = int(os.environ.get("DB_WRITE_BATCH", "50"))
+
+# ── Supabase outages (services/circuit_service.py) ─────────────────────────
+# One breaker per operation class (read / write / auth). After
+# SUPABASE_BREAKER_FAILURES consecutive timeouts, connection errors or 5xx it
+# opens and calls fail fast for the cooldown; then a single probe call goes
+# through (half-open). A failed probe doubles the cooldown, up to the max.
+SUPABASE_BREAKER_FAILURES: int        = int(os.environ.get("SUPABASE_BREAKER_FAILURES", "5"))
+SUPABASE_BREAKER_COOLDOWN_S: float    = float(os.environ.get("SUPABASE_BREAKER_COOLDOWN_S", "5"))
+SUPABASE_BREAKER_MAX_COOLDOWN_S: float = float(os.environ.get("SUPABASE_BREAKER_MAX_COOLDOWN_S", "60"))
+SUPABASE_STALE_ENTRIES: int           = 2048   # last good results kept for reads that may serve them
+# Writes made while Supabase is unreachable (tool-use XP, roast history,
+# sign-in upserts) go to a local SQLite outbox and are replayed in order once
+# it's back. On Render, point DB_OUTBOX_PATH at a persistent disk.
+DB_OUTBOX_PATH: str     = os.environ.get("DB_OUTBOX_PATH", "db_outbox.db")
+DB_OUTBOX_POLL_S: float = float(os.environ.get("DB_OUTBOX_POLL_S", "5"))
+DB_OUTBOX_MAX_ROWS: int = int(os.environ.get("DB_OUTBOX_MAX_ROWS", "100000"))
+
+# ── Response compression (middleware/compression.py) ───────────────────────
+COMPRESS_MIN_BYTES: int     = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_CACHE_ENTRIES: int = int(os.environ.get("COMPRESS_CACHE_ENTRIES", "64"))
+
+# ── Server-side sessions (middleware/sessions.py) ──────────────────────────
+# The cookie carries only an opaque session id; the user dict and Supabase
+# tokens live in the backend. "sqlite" (default) survives restarts, "redis"
+# shares across workers/hosts, "memory" is lost on every restart / deploy /
+# cold start — which signs everyone out, so it's for local runs and benches.
+# On Render, point SESSION_SQLITE_PATH at a persistent disk (the instance
+# disk is wiped on deploy), or use redis.
+SESSION_BACKEND: str      = os.environ.get("SESSION_BACKEND", "sqlite")
+SESSION_TTL_SECONDS: int  = int(os.environ.get("SESSION_TTL_SECONDS", str(14 * 24 * 3600)))
+SESSION_MAX_ENTRIES: int  = int(os.environ.get("SESSION_MAX_ENTRIES", "10000"))
+SESSION_SQLITE_PATH: str  = os.environ.get("SESSION_SQLITE_PATH", "sessions.db")
+REDIS_URL: str            = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/0")
+TOKEN_REFRESH_MARGIN_S: int = 60   # refresh the Supabase access token this close to expiry
+
+# ── Batch CLI (services/batch_service.py) ──────────────────────────────────
+BATCH_WORKERS: int        = int(os.environ.get("BATCH_WORKERS", "4"))
+BATCH_RATE_PER_MIN: float = float(os.environ.get("BATCH_RATE_PER_MIN", "30"))   # Groq free tier RPM
+BATCH_RETRIES: int        = int(os.environ.get("BATCH_RETRIES", "2"))
+
+# ── Weekly leaderboard snapshots (services/leaderboard_service.py) ─────────
+# Completed weeks are frozen into weekly_leaderboard_snapshots by
+# `python cli.py snapshot` (cron) and/or an in-process scheduler thread.
+SNAPSHOT_SCHEDULER: bool      = os.environ.get("SNAPSHOT_SCHEDULER", "0") == "1"
+SNAPSHOT_INTERVAL_S: int      = int(os.environ.get("SNAPSHOT_INTERVAL_S", "3600"))
+SNAPSHOT_LOOKBACK_WEEKS: int  = int(os.environ.get("SNAPSHOT_LOOKBACK_WEEKS", "4"))   # catch up after downtime
+LEADERBOARD_SNAPSHOT_TOP: int = 50
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+# ── Live leaderboard push (services/leaderboard_service.py) ────────────────
+# One in-process hub rebuilds the boards at most once per interval after XP
+# changes and fans the result out to every /api/leaderboard/stream client.
+# Each open stream holds a gunicorn thread, so keep the cap well under
+# --threads; clients over it (503) keep the plain fetches.
+LEADERBOARD_PUSH_INTERVAL_S: float    = float(os.environ.get("LEADERBOARD_PUSH_INTERVAL_S", "1"))
+LEADERBOARD_LIVE_TOP: int             = 50
+LEADERBOARD_CACHE_TTL_S: int          = int(os.environ.get("LEADERBOARD_CACHE_TTL_S", "30"))
+LEADERBOARD_SSE_MAX_SUBSCRIBERS: int  = int(os.environ.get("LEADERBOARD_SSE_MAX_SUBSCRIBERS", "4"))
+LEADERBOARD_SSE_MAX_S: int            = int(os.environ.get("LEADERBOARD_SSE_MAX_S", "300"))   # client reconnects
 
 # ── Tool XP values ─────────────────────────────────────────────────────────
 TOOL_XP: dict = {
@@ -0,0 +1 @@
+# middleware package
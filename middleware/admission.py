@@ -0,0 +1,48 @@
+"""
+middleware/admission.py
+───────────────────────
+Counts tool requests in flight for AdmissionService, wrapped around
+app.wsgi_app in app.py. A request counts from the moment it reaches the
+app until its response body is closed, so streamed roast battles and PDF
+analyses count for as long as they hold their thread.
+"""
+
+from services.admission_service import AdmissionService
+
+TOOL_PATHS = ("/api/linkedin", "/api/linkedin-pdf", "/api/idea", "/api/stack", "/api/resume")
+
+
+class _Body:
+    """Response iterable that calls AdmissionService.leave() exactly once when closed."""
+
+    def __init__(self, app_iter):
+        self._iter = app_iter
+        self._closed = False
+
+    def __iter__(self):
+        return iter(self._iter)
+
+    def close(self) -> None:
+        try:
+            if hasattr(self._iter, "close"):
+                self._iter.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                AdmissionService.leave()
+
+
+class AdmissionMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "POST" or environ.get("PATH_INFO") not in TOOL_PATHS:
+            return self.app(environ, start_response)
+        AdmissionService.enter()
+        try:
+            return _Body(self.app(environ, start_response))
+        except BaseException:
+            AdmissionService.leave()
+            raise
@@ -0,0 +1,231 @@
+"""
+middleware/compression.py
+─────────────────────────
+WSGI response compression, wrapped around app.wsgi_app in app.py.
+
+  - Only text-like content types (HTML, JSON/NDJSON, JS, CSS, SVG, SSE) are touched
+  - Buffered responses under COMPRESS_MIN_BYTES are passed through as-is
+  - brotli when the client accepts it and the `brotli` package is installed,
+    gzip otherwise
+  - Streamed responses (SSE, NDJSON, no Content-Length) are compressed
+    chunk by chunk with a sync flush after each, so events still arrive live
+  - Buffered GET responses for HTML and /static are kept in a small LRU of
+    precompressed bodies keyed by (content hash, encoding) — the index
+    shell is compressed once per distinct render, not once per visit
+"""
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from config import COMPRESS_MIN_BYTES, COMPRESS_CACHE_ENTRIES
+
+try:
+    import brotli
+except ImportError:   # optional — gzip still works without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/html", "text/css", "text/plain", "text/event-stream", "image/svg+xml",
+    "application/json", "application/x-ndjson", "application/javascript", "text/javascript",
+)
+
+GZIP_LEVEL      = 6
+BROTLI_QUALITY  = 5    # per-request work — keep it cheap
+CACHED_GZIP     = 9    # precompressed cache entries are paid for once
+CACHED_BROTLI   = 9    # 10+ is ~7x the CPU for ~7% fewer bytes, and index.html
+                       # varies per signed-in user so misses are not rare
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Pick br / gzip from an Accept-Encoding header, honouring q=0."""
+    offered: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    wildcard = offered.get("*", 0.0)
+    if brotli is not None and offered.get("br", wildcard) > 0:
+        return "br"
+    if offered.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress_body(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI if cached else BROTLI_QUALITY)
+    z = zlib.compressobj(CACHED_GZIP if cached else GZIP_LEVEL, zlib.DEFLATED, 31)
+    return z.compress(body) + z.flush()
+
+
+class _StreamCompressor:
+    """Incremental compressor that can be flushed after every chunk."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._c.finish()
+        return self._c.flush(zlib.Z_FINISH)
+
+
+class _CompressedStream:
+    """
+    A streamed response body, compressed as it is iterated. close() closes the
+    wrapped iterable directly: a generator's finally never runs when the
+    server closes it before the first next() (client gone before the body
+    started), which would skip e.g. AdmissionMiddleware's in-flight count.
+    """
+
+    def __init__(self, app_iter, encoding: str):
+        self._iter = app_iter
+        self._encoding = encoding
+
+    def __iter__(self):
+        compressor = _StreamCompressor(self._encoding)
+        for chunk in self._iter:
+            if chunk:
+                out = compressor.chunk(chunk)
+                if out:
+                    yield out
+        tail = compressor.finish()
+        if tail:
+            yield tail
+
+    def close(self) -> None:
+        if hasattr(self._iter, "close"):
+            self._iter.close()
+
+
+class _PrecompressedCache:
+    """Thread-safe LRU of compressed bodies."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_or_compress(self, body: bytes, encoding: str) -> bytes:
+        key = (hashlib.blake2b(body, digest_size=16).hexdigest(), encoding)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        compressed = compress_body(body, encoding, cached=True)
+        with self._lock:
+            self._data[key] = compressed
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return compressed
+
+
+class CompressionMiddleware:
+
+    def __init__(self, app, min_bytes: int = COMPRESS_MIN_BYTES, cache_entries: int = COMPRESS_CACHE_ENTRIES):
+        self.app = app
+        self.min_bytes = min_bytes
+        self.cache = _PrecompressedCache(cache_entries)
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+
+        captured: dict = {}
+
+        def capture(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            return lambda data: None   # write() is unused by Flask
+
+        app_iter = self.app(environ, capture)
+        status, headers = captured["status"], captured["headers"]
+        header_map = {k.lower(): v for k, v in headers}
+
+        if not self._should_compress(status, header_map):
+            start_response(status, headers, captured["exc_info"])
+            return app_iter
+
+        length = header_map.get("content-length")
+        content_type = header_map.get("content-type", "")
+        streaming = length is None or content_type.startswith("text/event-stream")
+
+        if streaming:
+            start_response(status, self._headers(headers, encoding, None), captured["exc_info"])
+            return _CompressedStream(app_iter, encoding)
+
+        if int(length) < self.min_bytes:
+            start_response(status, headers, captured["exc_info"])
+            return app_iter
+
+        try:
+            body = b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+        path = environ.get("PATH_INFO", "")
+        cacheable = environ.get("REQUEST_METHOD") == "GET" and (
+            content_type.startswith("text/html") or path.startswith("/static/")
+        )
+        if cacheable:
+            compressed = self.cache.get_or_compress(body, encoding)
+        else:
+            compressed = compress_body(body, encoding)
+
+        start_response(status, self._headers(headers, encoding, len(compressed)), captured["exc_info"])
+        return [compressed]
+
+    @staticmethod
+    def _should_compress(status: str, header_map: dict) -> bool:
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if "content-encoding" in header_map:
+            return False
+        if "no-transform" in header_map.get("cache-control", ""):
+            return False
+        content_type = header_map.get("content-type", "").split(";")[0].strip()
+        return content_type in COMPRESSIBLE_TYPES
+
+    @staticmethod
+    def _headers(headers: list, encoding: str, length: int | None) -> list:
+        """
+        A strong ETag names the identity bytes, so the encoded body gets it
+        weakened — If-None-Match still matches (weak comparison) but caches
+        no longer treat the br and gzip bodies as byte-identical.
+        """
+        out = []
+        for k, v in headers:
+            if k.lower() in ("content-length", "content-encoding"):
+                continue
+            if k.lower() == "etag" and not v.startswith("W/"):
+                v = "W/" + v
+            out.append((k, v))
+        out.append(("Content-Encoding", encoding))
+        vary = [v for k, v in headers if k.lower() == "vary"]
+        if not any("accept-encoding" in v.lower() for v in vary):
+            out.append(("Vary", "Accept-Encoding"))
+        if length is not None:
+            out.append(("Content-Length", str(length)))
+        return out
+
@@ -0,0 +1,255 @@
+"""
+middleware/sessions.py
+──────────────────────
+Server-side Flask sessions. Installed in app.py as app.session_interface.
+
+The cookie holds only a random 32-char session id; the session dict (user
+profile + Supabase tokens) lives in a pluggable store picked by
+config.SESSION_BACKEND:
+
+  sqlite  — local file, survives restarts (default)
+  redis   — shared across workers/hosts (needs the `redis` package)
+  memory  — in-process LRU with TTL; every restart signs everyone out, so
+            only for local runs and benches
+
+Stores only see serialized strings, so swapping backends never changes what
+a route reads out of `session`. Legacy signed-cookie sessions are migrated
+into the store on first sight, so the move off signed cookies logs nobody
+out; staying signed in across restarts after that needs a persistent store.
+
+session.regenerate() issues a fresh id on the next save — auth.callback
+calls it on login so a pre-login id can't be fixed onto a signed-in user.
+"""
+
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SecureCookieSessionInterface, SessionInterface
+
+from config import (
+    SESSION_BACKEND, SESSION_TTL_SECONDS, SESSION_MAX_ENTRIES, SESSION_SQLITE_PATH, REDIS_URL,
+)
+
+
+# ── Stores ─────────────────────────────────────────────────────────────────
+
+class MemoryStore:
+    """LRU of sid → (expires_at, data). Evicts oldest past max_entries."""
+
+    def __init__(self, max_entries: int = SESSION_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid: str) -> str | None:
+        with self._lock:
+            item = self._data.get(sid)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return item[1]
+
+    def set(self, sid: str, data: str, ttl: int) -> None:
+        with self._lock:
+            self._data[sid] = (time.time() + ttl, data)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SQLiteStore:
+    """One table in a local SQLite file; a connection per thread, WAL mode."""
+
+    PURGE_EVERY = 500   # writes between sweeps of expired rows
+
+    def __init__(self, path: str = SESSION_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid: str) -> str | None:
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid: str, data: str, ttl: int) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(sid) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+            (sid, data, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, sid: str) -> None:
+        self._conn().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class RedisStore:
+    """SETEX / GET / DEL under a key prefix."""
+
+    PREFIX = "anvil:session:"
+
+    def __init__(self, url: str = REDIS_URL):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_BACKEND=redis needs the `redis` package (pip install redis)")
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, sid: str) -> str | None:
+        return self._redis.get(self.PREFIX + sid)
+
+    def set(self, sid: str, data: str, ttl: int) -> None:
+        self._redis.setex(self.PREFIX + sid, ttl, data)
+
+    def delete(self, sid: str) -> None:
+        self._redis.delete(self.PREFIX + sid)
+
+
+STORES = {"memory": MemoryStore, "sqlite": SQLiteStore, "redis": RedisStore}
+
+
+def make_store(backend: str = SESSION_BACKEND):
+    if backend not in STORES:
+        raise RuntimeError(f"Unknown SESSION_BACKEND {backend!r} — expected one of {', '.join(STORES)}")
+    print(f"[SESSION] backend: {backend}")
+    return STORES[backend]()
+
+
+# ── Flask session interface ────────────────────────────────────────────────
+
+class ServerSession(SecureCookieSession):
+    """Same change tracking as Flask's cookie session, plus the id it's stored under."""
+
+    def __init__(self, initial=None, sid: str | None = None):
+        super().__init__(initial)
+        self.sid = sid or secrets.token_urlsafe(24)
+        self.new = sid is None
+        self.rotate_from: str | None = None
+
+    def regenerate(self) -> None:
+        """Move this session to a fresh id when it's next saved."""
+        if not self.new:
+            self.rotate_from = self.sid
+        self.sid = secrets.token_urlsafe(24)
+        self.new = True
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store=None, ttl: int = SESSION_TTL_SECONDS):
+        self.store = store or make_store()
+        self.ttl = ttl
+        self._legacy = SecureCookieSessionInterface()
+
+    def open_session(self, app, request) -> ServerSession:
+        value = request.cookies.get(self.get_cookie_name(app))
+        if not value:
+            return ServerSession()
+        data = self.store.get(value)
+        if data is not None:
+            try:
+                return ServerSession(self.serializer.loads(data), sid=value)
+            except ValueError:
+                self.store.delete(value)
+                return ServerSession()
+        return self._migrate(app, value)
+
+    def load(self, sid: str) -> dict | None:
+        """The stored copy of a session — whatever other requests on it last saved."""
+        data = self.store.get(sid)
+        if data is None:
+            return None
+        try:
+            return self.serializer.loads(data)
+        except ValueError:
+            return None
+
+    def save_now(self, session: ServerSession) -> None:
+        """Store the session mid-request, so concurrent requests on its id see it at once."""
+        if session:
+            self.store.set(session.sid, self.serializer.dumps(dict(session)), self.ttl)
+        else:
+            self.store.delete(session.sid)
+
+    def _migrate(self, app, value: str) -> ServerSession:
+        """Carry a pre-switch signed-cookie session over into the store."""
+        legacy = self._legacy.get_signing_serializer(app)
+        if legacy is None or "." not in value:
+            return ServerSession()
+        try:
+            data = legacy.loads(value, max_age=int(app.permanent_session_lifetime.total_seconds()))
+        except Exception:
+            return ServerSession()
+        session = ServerSession(data)
+        user = session.get("user")
+        if isinstance(user, dict) and "access_token" in user:
+            # Old shape kept the token on the user dict; no refresh token, so it
+            # simply expires and the user signs in again when it does.
+            session["user"] = {k: v for k, v in user.items() if k != "access_token"}
+        session.modified = True
+        return session
+
+    def save_session(self, app, session: ServerSession, response) -> None:
+        name     = self.get_cookie_name(app)
+        domain   = self.get_cookie_domain(app)
+        path     = self.get_cookie_path(app)
+        secure   = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if session.rotate_from:
+            self.store.delete(session.rotate_from)
+            session.rotate_from = None
+
+        if not session:
+            if session.modified:
+                if not session.new:
+                    self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add("Cookie")
+            return
+
+        if session.modified:
+            self.store.set(session.sid, self.serializer.dumps(dict(session)), self.ttl)
+
+        if session.new or self.should_set_cookie(app, session):
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path,
+                                secure=secure, samesite=samesite)
+            response.vary.add("Cookie")
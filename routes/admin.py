@@ -0,0 +1,122 @@
+"""
+routes/admin.py
+───────────────
+Admin-only analytics.
+  /stats     reads ONLY the precomputed usage_rollups table —
+             run `python cli.py rollup` (or the backfill) to refresh it
+  /ai-stats  this process's per-route LLM counters (latency, cost,
+             fallbacks, hedges fired / won, output-length percentiles,
+             replies capped by max_tokens / cut early)
+  /pipeline-stats  this process's per tool:mode pipeline counters
+             (calls, latency, responses by status — 429s included)
+  /leaderboard-stats  live leaderboard hub: open streams, broadcasts sent
+  /admission-stats    load level, LLM slots in use / queued (by priority),
+             clients holding / waiting for slots, queue wait, requests
+             admitted / templated / shed / over their fair share
+  /db-stats  Supabase circuit breakers (state, trips, calls rejected),
+             outbox writes pending / replayed, stale reads served
+Blueprint: admin_bp  prefix: /api/admin
+"""
+
+from datetime import datetime, timezone, timedelta
+from flask import Blueprint, jsonify, request, session
+from config import ADMIN_EMAILS
+from services.admission_service import AdmissionService
+from services.ai_service import AIService
+from services.db_service import DatabaseService
+from services.leaderboard_service import LeaderboardService
+from services.pipeline_service import PipelineService
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
+
+
+def _is_admin() -> bool:
+    user = session.get("user")
+    return bool(user) and (user.get("email") or "").lower() in ADMIN_EMAILS
+
+
+def _totals(rows: list[dict]) -> list[dict]:
+    """Collapse rollup rows into per-key totals, highest XP first."""
+    totals: dict[str, dict] = {}
+    for row in rows:
+        t = totals.setdefault(row["key"], {"key": row["key"], "uses": 0, "xp": 0})
+        t["uses"] += row.get("uses", 0)
+        t["xp"]   += row.get("xp", 0)
+    return sorted(totals.values(), key=lambda t: t["xp"], reverse=True)
+
+
+@admin_bp.route("/stats", methods=["GET"])
+def stats():
+    """
+    Query params:
+      period = day | week   (default day)
+      days   = look-back window in days (default 30, max 365)
+      limit  = number of top users to return (default 20)
+    """
+    if not _is_admin():
+        return jsonify({"error": "forbidden"}), 403
+
+    period = request.args.get("period", "day")
+    if period not in ("day", "week"):
+        return jsonify({"error": "period must be day or week"}), 400
+    try:
+        days  = min(max(int(request.args.get("days", 30)), 1), 365)
+        limit = min(max(int(request.args.get("limit", 20)), 1), 200)
+    except ValueError:
+        return jsonify({"error": "days and limit must be integers"}), 400
+
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+    if period == "week":
+        since -= timedelta(days=since.weekday())
+
+    tool_rows = DatabaseService.get_usage_rollups(period, since.isoformat(), "tool")
+    user_rows = DatabaseService.get_usage_rollups(period, since.isoformat(), "user")
+
+    series: dict[str, list[dict]] = {}
+    for row in tool_rows:
+        series.setdefault(row["key"], []).append(
+            {"bucket": row["bucket"], "uses": row.get("uses", 0), "xp": row.get("xp", 0)}
+        )
+
+    return jsonify({
+        "period":    period,
+        "since":     since.isoformat(),
+        "by_tool":   _totals(tool_rows),
+        "series":    series,
+        "top_users": _totals(user_rows)[:limit],
+    })
+
+
+@admin_bp.route("/ai-stats", methods=["GET"])
+def ai_stats():
+    if not _is_admin():
+        return jsonify({"error": "forbidden"}), 403
+    return jsonify(AIService.stats())
+
+
+@admin_bp.route("/pipeline-stats", methods=["GET"])
+def pipeline_stats():
+    if not _is_admin():
+        return jsonify({"error": "forbidden"}), 403
+    return jsonify(PipelineService.stats())
+
+
+@admin_bp.route("/leaderboard-stats", methods=["GET"])
+def leaderboard_stats():
+    if not _is_admin():
+        return jsonify({"error": "forbidden"}), 403
+    return jsonify(LeaderboardService.live_stats())
+
+
+@admin_bp.route("/admission-stats", methods=["GET"])
+def admission_stats():
+    if not _is_admin():
+        return jsonify({"error": "forbidden"}), 403
+    return jsonify(AdmissionService.stats())
+
+
+@admin_bp.route("/db-stats", methods=["GET"])
+def db_stats():
+    if not _is_admin():
+        return jsonify({"error": "forbidden"}), 403
+    return jsonify(DatabaseService.outage_stats())
@@ -3,22 +3,48 @@ routes/auth.py
 ──────────────
 Google OAuth flow via Supabase.
 Blueprint: auth_bp  prefix: /auth
+
+Sessions are server-side (middleware/sessions.py), so the Supabase tokens
+sit in session["tokens"] rather than in the cookie, and refresh_tokens()
+renews the access token shortly before it expires. A page fires many
+requests at once, so the refresh runs once per session: the others wait,
+then pick up the stored result instead of reusing the spent refresh token.
+Static files and the service worker never trigger it.
+
+Supabase auth calls run through the "auth" circuit breaker
+(services/circuit_service.py). While it's open, sign-in answers 503 at
+once, and a refresh that can't reach Supabase keeps the session and tries
+again on a later request — an outage shouldn't sign everyone out.
 """
 
-from flask import Blueprint, redirect, request, session
-from config import supabase
+import threading
+import time
+
+from flask import Blueprint, current_app, redirect, request, session
+from config import get_supabase, TOKEN_REFRESH_MARGIN_S
+from services.circuit_service import CircuitService, CircuitOpenError
 from services.db_service import DatabaseService
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
+# Endpoints that never use the access token — no refresh on their account
+NO_REFRESH_ENDPOINTS = {"static", "service_worker", "module_partial", "ping"}
+_refresh_locks = [threading.Lock() for _ in range(64)]   # striped by session id
+
 
 @auth_bp.route("/login")
 def login():
     redirect_url = request.url_root.rstrip("/") + "/auth/callback"
-    result = supabase.auth.sign_in_with_oauth({
-        "provider": "google",
-        "options":  {"redirect_to": redirect_url}
-    })
+    try:
+        with CircuitService.guard("auth"):
+            result = get_supabase().auth.sign_in_with_oauth({
+                "provider": "google",
+                "options":  {"redirect_to": redirect_url}
+            })
+    except CircuitOpenError as e:
+        print(f"[AUTH] Login refused: {e}")
+        return "Sign-in is unavailable right now — try again in a minute.", 503, {
+            "Retry-After": str(max(int(e.retry_in) + 1, 5))}
     return redirect(result.url)
 
 
@@ -33,18 +59,19 @@ def callback():
         return redirect("/")
 
     try:
-        result      = supabase.auth.exchange_code_for_session({"auth_code": code})
-        user        = result.user
-        access_token = result.session.access_token
+        with CircuitService.guard("auth"):
+            result = get_supabase().auth.exchange_code_for_session({"auth_code": code})
+        user   = result.user
         print(f"[AUTH] User: {user.email}")
 
+        session.regenerate()
         session["user"] = {
-            "id":           user.id,
-            "email":        user.email,
-            "name":         user.user_metadata.get("full_name", user.email),
-            "avatar":       user.user_metadata.get("avatar_url", ""),
-            "access_token": access_token,
+            "id":     user.id,
+            "email":  user.email,
+            "name":   user.user_metadata.get("full_name", user.email),
+            "avatar": user.user_metadata.get("avatar_url", ""),
         }
+        session["tokens"] = _token_dict(result.session)
 
         DatabaseService.upsert_user(
             user_id      = user.id,
@@ -61,6 +88,47 @@ def callback():
     return redirect("/")
 
 
+@auth_bp.before_app_request
+def refresh_tokens():
+    if request.endpoint in NO_REFRESH_ENDPOINTS or not _expiring(session.get("tokens")):
+        return
+    interface = current_app.session_interface
+    with _refresh_locks[hash(session.sid) % len(_refresh_locks)]:
+        # Another request on this session may have refreshed (or signed out)
+        # while we waited — its result is already in the store
+        stored = interface.load(session.sid)
+        if stored is None or not stored.get("tokens"):
+            session.clear()
+            return
+        if not _expiring(stored["tokens"]):
+            session["tokens"] = stored["tokens"]
+            return
+        try:
+            with CircuitService.guard("auth"):
+                result = get_supabase().auth.refresh_session(stored["tokens"]["refresh_token"])
+            session["tokens"] = _token_dict(result.session)
+            print(f"[AUTH] Refreshed access token for {session.get('user', {}).get('email')}")
+        except Exception as e:
+            if CircuitService.is_outage(e):
+                print(f"[AUTH] Token refresh deferred ({type(e).__name__}: {e})")
+                return
+            print(f"[AUTH] Token refresh failed ({type(e).__name__}: {e}) — signing out")
+            session.clear()
+        interface.save_now(session)
+
+
+def _expiring(tokens: dict | None) -> bool:
+    return bool(tokens) and tokens["expires_at"] - time.time() <= TOKEN_REFRESH_MARGIN_S
+
+
+def _token_dict(auth_session) -> dict:
+    return {
+        "access_token":  auth_session.access_token,
+        "refresh_token": auth_session.refresh_token,
+        "expires_at":    auth_session.expires_at or int(time.time()) + (auth_session.expires_in or 3600),
+    }
+
+
 @auth_bp.route("/logout")
 def logout():
     session.clear()
@@ -0,0 +1,58 @@
+"""
+routes/jobs.py
+──────────────
+Status of background jobs submitted via JobService (e.g. async PDF analyse).
+Blueprint: jobs_bp  prefix: /api/jobs
+
+  GET /api/jobs/<id>         → {id, kind, status, result, error}
+  GET /api/jobs/<id>/stream  → SSE: one `status` event per state change,
+                               closes once the job is done, errored or cancelled
+"""
+
+import json
+from flask import Blueprint, Response, jsonify, session, stream_with_context
+from services.job_service import JobService
+
+jobs_bp = Blueprint("jobs", __name__, url_prefix="/api/jobs")
+
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def _owner() -> str | None:
+    user = session.get("user")
+    return user["id"] if user else None
+
+
+@jobs_bp.route("/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = JobService.get(job_id, owner=_owner())
+    if job is None:
+        return jsonify({"error": "job not found or expired"}), 404
+    return jsonify(job)
+
+
+@jobs_bp.route("/<job_id>/stream", methods=["GET"])
+def stream_job(job_id):
+    job = JobService.get(job_id, owner=_owner())
+    if job is None:
+        return jsonify({"error": "job not found or expired"}), 404
+
+    def events():
+        current = job
+        yield f"event: status\ndata: {json.dumps(current)}\n\n"
+        while current["status"] not in ("done", "error", "cancelled"):
+            latest = JobService.wait(job_id, current["status"], timeout=SSE_HEARTBEAT_SECONDS)
+            if latest is None:
+                yield "event: status\ndata: {\"status\": \"expired\"}\n\n"
+                return
+            if latest["status"] == current["status"]:
+                yield ": keep-alive\n\n"
+                continue
+            current = latest
+            yield f"event: status\ndata: {json.dumps(current)}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
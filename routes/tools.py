@@ -1,43 +1,140 @@
 """
 routes/tools.py
 ───────────────
-All AI tool endpoints. Each route:
-  1. Parses the request
-  2. Validates / garbage-checks input
-  3. Calls the right comics.py prompt function
-  4. Asks Groq via AIService
-  5. Logs tool use via DatabaseService
-  6. Returns JSON
+All AI tool endpoints.
+
+linkedin, idea, stack and resume are declared to PipelineService
+(services/pipeline_service.py): each mode registers a parse step, the
+fields to garbage-check and its comics.py prompt builder, and the engine
+runs the shared flow — metrics, rate limit, validation, history replay,
+Groq via AIService (single comic or a "comics": [...] battle), XP and
+history logging. Responses are {"message": ..., "stats": new XP totals or
+null} (+ "from_history": true on a replay, and "near_duplicate": true +
+"similarity" when a resume / LinkedIn text only nearly matched an earlier
+one; send "fresh": true to force a new roast). Only the roast / check
+modes replay — the create modes always generate.
+
+linkedin-pdf keeps its own flow (multipart upload, scan → analyse, the
+speculative background job) but shares input_hash for history dedupe and
+SimilarityService for near-duplicate PDFs.
+
+Under load (services/admission_service.py) quips and scan questions come
+from comics.py templates (+ "degraded": true), speculation is skipped, and
+analyse answers 503 + Retry-After unless it's a history replay or an
+already-finished speculative job. Anything shed deeper down (an LLM slot
+that never freed up) is turned into the same 503 by the error handler.
 
 Blueprint: tools_bp  prefix: /api
 """
 
-from flask import Blueprint, jsonify, request
+import hashlib
+from flask import Blueprint, jsonify, request, session
+from services.admission_service import AdmissionService, OverloadedError
 from services.ai_service import AIService
 from services.db_service import DatabaseService
+from services.job_service import JobService, QueueFullError
 from services.linkedin_service import LinkedInService
+from services.pipeline_service import PipelineService, ToolInputError, input_hash
+from services.similarity_service import SimilarityService
+from services.format_service import (
+    format_pdf_block,
+    parse_pdf_analysis,
+    parse_quips,
+    pdf_analysis_with_repair,
+    scan_questions_with_repair,
+)
 from comics import (
+    LINKEDIN_PDF_QUIPS_TEMPLATE,
+    LINKEDIN_PDF_SCAN_TEMPLATE,
     get_linkedin_prompt,
     get_linkedin_create_prompt,
     get_linkedin_pdf_quips_prompt,
     get_linkedin_pdf_scan_prompt,
     get_linkedin_pdf_prompt,
+    get_idea_analyst_prompt,
     get_idea_create_prompt,
+    get_stack_advisor_prompt,
     get_stack_create_prompt,
     get_resume_prompt,
     get_resume_create_prompt,
-    get_garbage_prompt,
-    is_garbage_input,
 )
 
 tools_bp = Blueprint("tools", __name__, url_prefix="/api")
 
+# How long an analyse request will wait on a speculative job it claimed —
+# stays under gunicorn's 120s worker timeout.
+SPECULATIVE_WAIT_SECONDS = 110
+
+
+def _run(tool: str, default_mode: str):
+    user = session.get("user")
+    return PipelineService.run(tool, request.json, user["id"] if user else None, default_mode)
+
+
+@tools_bp.errorhandler(OverloadedError)
+def overloaded(e: OverloadedError):
+    return AdmissionService.response(e)
+
+
+# ── PDF helpers ────────────────────────────────────────────────────────────
+
+def _speculative_key(comic: str, text: str, user_id: str | None) -> str:
+    """Identifies an answer-less analysis of this exact PDF for this user + comic."""
+    return hashlib.sha256(f"{user_id or ''}\x00{comic}\x00{text}".encode()).hexdigest()
+
+
+def _pdf_analysis_text(comic: str, text: str, answers: dict | None) -> dict:
+    """
+    The Groq call plus format validation/repair — what a speculative job runs.
+    Awards no XP. Returns {"message": raw text, "issues": [...], ...}.
+    """
+    prompt = get_linkedin_pdf_prompt(comic, text, mode="analyse", answers=answers)
+    raw = AIService.ask(prompt, tool="linkedin_pdf", mode="analyse")
+    return {"message": raw, **pdf_analysis_with_repair(raw, comic, text)}
+
+
+def _pdf_history_hash(comic: str, text: str, answers: dict | None) -> str:
+    return input_hash("linkedin_pdf", {"comic": comic, "text": text, "answers": answers or {}})
+
 
-# ── Helpers ────────────────────────────────────────────────────────────────
+def _pdf_near(comic: str, text: str, answers: dict | None) -> tuple[str, int] | None:
+    """(near_scope, simhash) for near-duplicate matching of the PDF text, or None."""
+    fp = SimilarityService.fingerprint(text)
+    if fp is None:
+        return None
+    return input_hash("linkedin_pdf", {"comic": comic, "answers": answers or {}})[:16], fp
 
-def _garbage_response(comic: str, tool: str, value: str, reason: str):
-    """Return a garbage-detection JSON response."""
-    return jsonify({"message": AIService.ask(get_garbage_prompt(comic, tool, value, reason))})
+
+def _pdf_analysis_done(result: dict, user_id: str | None, comic: str, text: str,
+                       answers: dict | None) -> dict:
+    """Award XP for a finished analysis, record it in history, and shape the response."""
+    stats = None
+    if user_id:
+        stats = DatabaseService.log_tool_use("linkedin_pdf", user_id=user_id)
+        # Store the repaired blocks, not the raw text, so a replay needs no re-ask
+        output = "\n\n".join(format_pdf_block(i) for i in result.get("issues") or []) or result["message"]
+        h, near = _pdf_history_hash(comic, text, answers), _pdf_near(comic, text, answers)
+        DatabaseService.record_history(user_id, "linkedin_pdf", "analyse", comic, h, output, near=near)
+        if near:
+            SimilarityService.remember(user_id, "linkedin_pdf", *near, h)
+    return {"mode": "analyse", **result, "stats": stats}
+
+
+def _pdf_analysis(comic: str, text: str, answers: dict | None, user_id: str | None) -> dict:
+    """Full PDF analyse pass. Runs inline or as a background job — no request context needed."""
+    return _pdf_analysis_done(_pdf_analysis_text(comic, text, answers), user_id, comic, text, answers)
+
+
+def _claim_speculative(spec_id: str, comic: str, text: str, user_id: str | None) -> dict:
+    """
+    Wait for a claimed speculative analysis; fall back to a fresh run if it failed.
+    As a job it is submitted with after=spec_id, so by then the wait is over.
+    """
+    job = JobService.result(spec_id, timeout=SPECULATIVE_WAIT_SECONDS)
+    if job is not None and job["status"] == "done":
+        print(f"[TOOLS] speculative analysis hit {spec_id}")
+        return _pdf_analysis_done(job["result"], user_id, comic, text, None)
+    return _pdf_analysis(comic, text, None, user_id)
 
 
 # ── Debug ──────────────────────────────────────────────────────────────────
@@ -53,48 +150,49 @@ def test_linkedin_fetch():
 
 # ── LinkedIn ───────────────────────────────────────────────────────────────
 
-@tools_bp.route("/linkedin", methods=["POST"])
-def linkedin():
-    data         = request.json
-    mode         = data.get("mode", "check")
+def _linkedin_check_inputs(data: dict) -> dict:
+    """Fetch the profile when a URL is given; content_type becomes "profile"."""
     content_type = data.get("content_type", "post")
-    comic        = data.get("comic", "abhishek_upmanyu")
+    content      = data.get("content", "").strip()
+    url_input    = data.get("profile_url", "").strip()
 
-    if mode == "create":
-        intent = data.get("intent", "").strip()
-        garbage, reason = is_garbage_input(intent)
-        if garbage:
-            return _garbage_response(comic, "linkedin", intent, reason)
-        prompt = get_linkedin_create_prompt(comic, content_type, intent)
-
-    else:
-        url_input = data.get("profile_url", "").strip()
-        content   = data.get("content", "").strip()
-
-        if url_input:
-            fetched, fetch_error = LinkedInService.fetch_profile(url_input)
-            if fetch_error:
-                return jsonify({
-                    "message":     None,
-                    "fetch_error": LinkedInService.get_fetch_error_message(fetch_error)
-                })
-            content      = fetched
-            content_type = "profile"
-
-        if not content:
-            return jsonify({
+    if url_input:
+        fetched, fetch_error = LinkedInService.fetch_profile(url_input)
+        if fetch_error:
+            raise ToolInputError({
                 "message":     None,
-                "fetch_error": "No content provided. Paste your LinkedIn content or enter a profile URL."
-            })
+                "fetch_error": LinkedInService.get_fetch_error_message(fetch_error)
+            }, status=200)
+        content      = fetched
+        content_type = "profile"
+
+    if not content:
+        raise ToolInputError({
+            "message":     None,
+            "fetch_error": "No content provided. Paste your LinkedIn content or enter a profile URL."
+        }, status=200)
+    return {"content_type": content_type, "content": content}
+
+
+PipelineService.register(
+    "linkedin", "create",
+    parse  = lambda d: {"content_type": d.get("content_type", "post"), "intent": d.get("intent", "").strip()},
+    checks = ("intent",),
+    prompt = lambda c, i: get_linkedin_create_prompt(c, i["content_type"], i["intent"]),
+)
+PipelineService.register(
+    "linkedin", None,
+    parse   = _linkedin_check_inputs,
+    checks  = ("content",),
+    similar = "content",
+    replay  = True,
+    prompt  = lambda c, i: get_linkedin_prompt(c, i["content_type"], i["content"]),
+)
 
-        garbage, reason = is_garbage_input(content)
-        if garbage:
-            return _garbage_response(comic, "linkedin", content, reason)
-        prompt = get_linkedin_prompt(comic, content_type, content)
 
-    result = AIService.ask(prompt)
-    DatabaseService.log_tool_use("linkedin")
-    return jsonify({"message": result})
+@tools_bp.route("/linkedin", methods=["POST"])
+def linkedin():
+    return _run("linkedin", "check")
 
 
 # ── LinkedIn PDF ───────────────────────────────────────────────────────────
@@ -103,8 +201,16 @@ def linkedin():
 def linkedin_pdf():
     """
     Two-pass PDF analysis.
-    Pass 1 (mode=scan):    Upload PDF → returns targeted questions
+    Pass 1 (mode=scan):    Upload PDF → returns targeted questions (`questions`)
     Pass 2 (mode=analyse): Upload PDF + answers → returns full diff output
+                           as validated `issues` (raw text stays in `message`)
+                           With async=1 the analysis runs as a background job:
+                           returns 202 {job_id} → poll /api/jobs/<id>
+
+    Speculative prefetch: as soon as scan finishes, an answer-less analysis
+    starts in the background. If the user skips every question, analyse
+    claims that job (often already finished). If they answer anything, the
+    speculative job is cancelled and a fresh analysis runs with the answers.
     """
     comic = request.form.get("comic", "abhishek_upmanyu")
     mode  = request.form.get("mode", "scan")   # scan | analyse
@@ -120,15 +226,42 @@ def linkedin_pdf():
 
     if mode == "quips":
         # Parallel call 1 — profile-specific quips for the reading animation
+        if AdmissionService.admit("cheap") == "template":
+            quips = [q.to_dict() for q in parse_quips(LINKEDIN_PDF_QUIPS_TEMPLATE)]
+            return jsonify({"mode": "quips", "message": LINKEDIN_PDF_QUIPS_TEMPLATE, "quips": quips,
+                            "degraded": True})
         prompt = get_linkedin_pdf_quips_prompt(text, comic)
-        result = AIService.ask(prompt)
-        return jsonify({"mode": "quips", "message": result})
+        result = AIService.ask(prompt, tool="linkedin_pdf", mode="quips")
+        quips  = [q.to_dict() for q in parse_quips(result)]
+        return jsonify({"mode": "quips", "message": result, "quips": quips})
+
+    user    = session.get("user")
+    user_id = user["id"] if user else None
 
     if mode == "scan":
         # Parallel call 2 — targeted questions based on profile gaps — just generate questions, no comic persona, fast
+        if AdmissionService.admit("cheap") == "template":
+            # Generic questions, and no speculative analysis to compete for slots
+            return jsonify({
+                "mode":      "scan",
+                "message":   LINKEDIN_PDF_SCAN_TEMPLATE,
+                "questions": scan_questions_with_repair(LINKEDIN_PDF_SCAN_TEMPLATE),
+                "degraded":  True,
+            })
         prompt = get_linkedin_pdf_scan_prompt(text)
-        result = AIService.ask(prompt)
-        return jsonify({"mode": "scan", "message": result})
+        result = AIService.ask(prompt, tool="linkedin_pdf", mode="scan")
+        try:
+            JobService.submit(
+                "linkedin_pdf_speculative", _pdf_analysis_text, comic, text, None,
+                owner=user_id, key=_speculative_key(comic, text, user_id), priority="background",
+            )
+        except QueueFullError:
+            pass   # speculation is best-effort — analyse will just run normally
+        return jsonify({
+            "mode":      "scan",
+            "message":   result,
+            "questions": scan_questions_with_repair(result),
+        })
 
     else:
         # Pass 2 — full analysis with optional answers
@@ -141,132 +274,144 @@ def linkedin_pdf():
                 if val:
                     answers[qid] = val
 
-        prompt = get_linkedin_pdf_prompt(comic, text, mode="analyse", answers=answers or None)
-        result = AIService.ask(prompt)
-        DatabaseService.log_tool_use("linkedin_pdf")
-        return jsonify({"mode": "analyse", "message": result})
+        if user_id and request.form.get("fresh") != "1":
+            hit = DatabaseService.find_history(user_id, "linkedin_pdf",
+                                               _pdf_history_hash(comic, text, answers or None))
+            near = None if hit else _pdf_near(comic, text, answers or None)
+            if near:
+                hit = SimilarityService.find(user_id, "linkedin_pdf", *near)
+            if hit:
+                print("[TOOLS] history hit for linkedin_pdf — skipping Groq")
+                issues = [i.to_dict() for i in parse_pdf_analysis(hit["output"]).issues]
+                resp = {"mode": "analyse", "message": hit["output"], "issues": issues,
+                        "stats": None, "from_history": True, "history_id": hit["id"]}
+                if "similarity" in hit:
+                    resp.update(near_duplicate=True, similarity=hit["similarity"])
+                return jsonify(resp)
+
+        spec_key = _speculative_key(comic, text, user_id)
+        if answers:
+            JobService.cancel_key(spec_key)
+            spec_id = None
+        else:
+            spec_id = JobService.claim(spec_key)
+
+        if spec_id:
+            spec = JobService.get(spec_id, owner=user_id)
+            if spec and spec["status"] == "done":
+                print(f"[TOOLS] speculative analysis hit {spec_id}")
+                return jsonify(_pdf_analysis_done(spec["result"], user_id, comic, text, None))
+
+        if not spec_id:
+            AdmissionService.admit("expensive")   # a claimed job is already running — let it finish
+
+        if request.form.get("async") == "1":
+            try:
+                if spec_id:
+                    job_id = JobService.submit(
+                        "linkedin_pdf", _claim_speculative, spec_id, comic, text, user_id,
+                        owner=user_id, after=spec_id,
+                    )
+                else:
+                    job_id = JobService.submit(
+                        "linkedin_pdf", _pdf_analysis, comic, text, answers or None, user_id,
+                        owner=user_id,
+                    )
+            except QueueFullError:
+                return jsonify({"error": "ANVIL is busy right now — try again in a minute."}), 503
+            return jsonify({"mode": "analyse", "job_id": job_id}), 202
+
+        if spec_id:
+            return jsonify(_claim_speculative(spec_id, comic, text, user_id))
+        return jsonify(_pdf_analysis(comic, text, answers or None, user_id))
 
 
 # ── Idea Checker ───────────────────────────────────────────────────────────
 
+PipelineService.register(
+    "idea", "create",
+    parse  = lambda d: {
+        "skills":    d.get("skills", "").strip(),
+        "interests": d.get("interests", "").strip(),
+        **{k: d.get(k, "") for k in ("edge", "role", "market", "idea_type", "time", "budget", "team")},
+    },
+    checks = ("skills", "interests"),
+    prompt = lambda c, i: get_idea_create_prompt(
+        c, i["skills"], i["interests"],
+        edge        = i["edge"],
+        role        = i["role"],
+        market      = i["market"],
+        idea_type   = i["idea_type"],
+        time_commit = i["time"],
+        budget      = i["budget"],
+        team        = i["team"],
+    ),
+)
+PipelineService.register(
+    "idea", None,
+    parse  = lambda d: {"idea": d.get("idea", ""), "market": d.get("market", "")},
+    checks = ("idea", "market"),
+    replay = True,
+    prompt = lambda c, i: get_idea_analyst_prompt(i["idea"], i["market"]),
+)
+
+
 @tools_bp.route("/idea", methods=["POST"])
 def idea():
-    data  = request.json
-    mode  = data.get("mode", "check")
-    comic = data.get("comic", "abhishek_upmanyu")
-
-    if mode == "create":
-        skills    = data.get("skills", "").strip()
-        interests = data.get("interests", "").strip()
-        for val in [skills, interests]:
-            garbage, reason = is_garbage_input(val)
-            if garbage:
-                return _garbage_response(comic, "idea", val, reason)
-        prompt = get_idea_create_prompt(
-            comic, skills, interests,
-            edge        = data.get("edge", ""),
-            role        = data.get("role", ""),
-            market      = data.get("market", ""),
-            idea_type   = data.get("idea_type", ""),
-            time_commit = data.get("time", ""),
-            budget      = data.get("budget", ""),
-            team        = data.get("team", ""),
-        )
-    else:
-        idea_text   = data.get("idea", "")
-        market_text = data.get("market", "")
-        for val in [idea_text, market_text]:
-            garbage, reason = is_garbage_input(str(val))
-            if garbage:
-                return _garbage_response(comic, "idea", val, reason)
-        # Inline prompt kept exactly as original — move to comics.py separately later
-        prompt = f"""You are a sharp startup analyst with a dark sense of humor.
-    Analyze this startup idea and tell the person:
-    1. If it already exists (and name competitors)
-    2. How original it actually is (score out of 10)
-    3. Whether it has potential or is dead on arrival
-    4. One savage but constructive piece of advice
-    Idea: {idea_text}
-    Target Market: {market_text}
-    Keep it punchy, honest, and slightly brutal. 4-5 sentences max."""
-
-    result = AIService.ask(prompt)
-    DatabaseService.log_tool_use("idea")
-    return jsonify({"message": result})
+    return _run("idea", "check")
 
 
 # ── Stack Picker ───────────────────────────────────────────────────────────
 
+PipelineService.register(
+    "stack", "create",
+    parse  = lambda d: {
+        "interests": d.get("interests", "").strip(),
+        **{k: d.get(k, "") for k in ("shipped", "known", "learn", "exp", "pref", "goal", "time", "deadline")},
+    },
+    checks = ("interests",),
+    prompt = lambda c, i: get_stack_create_prompt(
+        c, i["interests"],
+        shipped     = i["shipped"],
+        known       = i["known"],
+        learn       = i["learn"],
+        exp         = i["exp"],
+        pref        = i["pref"],
+        goal        = i["goal"],
+        time_commit = i["time"],
+        deadline    = i["deadline"],
+    ),
+)
+PipelineService.register(
+    "stack", None,
+    parse  = lambda d: {"project": d.get("project", ""), "level": d.get("level"), "priority": d.get("priority")},
+    checks = ("project",),
+    replay = True,
+    prompt = lambda c, i: get_stack_advisor_prompt(i["project"], i["level"], i["priority"]),
+)
+
+
 @tools_bp.route("/stack", methods=["POST"])
 def stack():
-    data  = request.json
-    mode  = data.get("mode", "check")
-    comic = data.get("comic", "abhishek_upmanyu")
-
-    if mode == "create":
-        interests = data.get("interests", "").strip()
-        garbage, reason = is_garbage_input(str(interests))
-        if garbage:
-            return _garbage_response(comic, "stack", interests, reason)
-        prompt = get_stack_create_prompt(
-            comic, interests,
-            shipped     = data.get("shipped", ""),
-            known       = data.get("known", ""),
-            learn       = data.get("learn", ""),
-            exp         = data.get("exp", ""),
-            pref        = data.get("pref", ""),
-            goal        = data.get("goal", ""),
-            time_commit = data.get("time", ""),
-            deadline    = data.get("deadline", ""),
-        )
-    else:
-        project_text = data.get("project", "")
-        garbage, reason = is_garbage_input(str(project_text))
-        if garbage:
-            return _garbage_response(comic, "stack", project_text, reason)
-        # Inline prompt kept exactly as original
-        prompt = f"""You are an opinionated senior developer who gives direct tech stack recommendations.
-    Recommend a tech stack for this project. Be specific and decisive - no wishy-washy answers.
-    Project: {project_text}
-    Developer Experience Level: {data.get("level")}
-    Priority: {data.get("priority")}
-    Format your answer as:
-    FRONTEND: ...
-    BACKEND: ...
-    DATABASE: ...
-    HOSTING: ...
-    WHY: one punchy sentence explaining the choice."""
-
-    result = AIService.ask(prompt)
-    DatabaseService.log_tool_use("stack")
-    return jsonify({"message": result})
+    return _run("stack", "check")
 
 
 # ── Resume Roaster ─────────────────────────────────────────────────────────
 
-@tools_bp.route("/resume", methods=["POST"])
-def resume():
-    data  = request.json
-    mode  = data.get("mode", "paste")
-    comic = data.get("comic", "abhishek_upmanyu")
-
-    if mode == "create":
-        name = data.get("name", "").strip()
-        if not name:
-            return jsonify({"error": "Name is required"}), 400
-        result = AIService.ask(get_resume_create_prompt(
-            comic,
-            name,
-            data.get("role", ""),
-            data.get("experience", ""),
-            data.get("projects", ""),
-            data.get("skills", ""),
-            data.get("education", ""),
-        ))
-        DatabaseService.log_tool_use("resume")
-        return jsonify({"message": result})
-
-    if mode == "paste":
+RESUME_FIELDS = ("name", "role", "experience", "projects", "skills", "education")
+
+
+def _resume_create_inputs(data: dict) -> dict:
+    inputs = {k: data.get(k, "") for k in RESUME_FIELDS}
+    inputs["name"] = inputs["name"].strip()
+    if not inputs["name"]:
+        raise ToolInputError({"error": "Name is required"})
+    return inputs
+
+
+def _resume_inputs(data: dict) -> dict:
+    """paste → resume_text as-is; any other mode assembles it from the form fields."""
+    if data.get("mode", "paste") == "paste":
         resume_content = data.get("resume_text", "").strip()
     else:
         resume_content = (
@@ -276,14 +421,26 @@ def resume():
             f"Skills: {data.get('skills', '')}\n"
             f"Education: {data.get('education', '')}"
         ).strip()
-
     if not resume_content:
-        return jsonify({"error": "No resume content provided"}), 400
+        raise ToolInputError({"error": "No resume content provided"})
+    return {"resume_content": resume_content, "mode": data.get("mode", "paste")}
+
 
-    garbage, reason = is_garbage_input(resume_content)
-    if garbage:
-        return _garbage_response(comic, "resume", resume_content, reason)
+PipelineService.register(
+    "resume", "create",
+    parse  = _resume_create_inputs,
+    prompt = lambda c, i: get_resume_create_prompt(c, *(i[k] for k in RESUME_FIELDS)),
+)
+PipelineService.register(
+    "resume", None,
+    parse   = _resume_inputs,
+    checks  = ("resume_content",),
+    similar = "resume_content",
+    replay  = True,
+    prompt  = lambda c, i: get_resume_prompt(c, i["resume_content"], mode=i["mode"]),
+)
 
-    result = AIService.ask(get_resume_prompt(comic, resume_content, mode=mode))
-    DatabaseService.log_tool_use("resume")
-    return jsonify({"message": result})
+
+@tools_bp.route("/resume", methods=["POST"])
+def resume():
+    return _run("resume", "paste")
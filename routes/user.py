@@ -1,52 +1,142 @@
 """
 routes/user.py
 ──────────────
-User stats, XP saving, and leaderboard endpoints.
+User stats, roast history and leaderboard endpoints. The global and weekly
+boards come from LeaderboardService's live hub, which also pushes them:
+  GET /api/leaderboard/stream           SSE: `board` {global, weekly, moved}
+                                        on connect and after XP changes (at
+                                        most one per second), `rank` {xp,
+                                        rank, delta} when the caller's XP moves
+Past weeks are served from frozen snapshots:
+  GET /api/leaderboard/weeks            snapshotted weeks, newest first
+  GET /api/leaderboard/weekly/<week>    top N of a past week ("last" or any
+                                        YYYY-MM-DD in it) + the caller's row
+XP is awarded server-side by DatabaseService.log_tool_use — the client
+never writes its own totals.
 Blueprint: user_bp  prefix: /api
 """
 
-from flask import Blueprint, jsonify, request, session
+import json
+import time
+from datetime import date
+
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
+
+from config import LEADERBOARD_SNAPSHOT_TOP, LEADERBOARD_SSE_MAX_S
+from services.circuit_service import CircuitService
 from services.db_service import DatabaseService
+from services.leaderboard_service import LeaderboardService
 
 user_bp = Blueprint("user", __name__, url_prefix="/api")
 
+SSE_HEARTBEAT_SECONDS = 15
+
 
 @user_bp.route("/user/stats", methods=["GET"])
 def get_user_stats():
     user = session.get("user")
     if not user:
         return jsonify({"error": "not logged in"}), 401
-    stats = DatabaseService.get_user_stats(user["id"])
+    try:
+        stats = DatabaseService.get_user_stats(user["id"])
+    except Exception as e:
+        if not CircuitService.is_outage(e):
+            raise
+        resp = jsonify({"error": "stats are unavailable right now"})
+        resp.headers["Retry-After"] = "10"
+        return resp, 503
     return jsonify(stats)
 
 
-@user_bp.route("/user/xp", methods=["POST"])
-def save_xp():
+@user_bp.route("/history", methods=["GET"])
+def history():
+    """
+    Keyset-paginated roast history, newest first.
+    Query params: limit (1-50, default 20), before (id cursor), tool (optional filter).
+    Pass the returned next_before as `before` to get the next page.
+    """
     user = session.get("user")
     if not user:
         return jsonify({"error": "not logged in"}), 401
-    data = request.json
-    DatabaseService.save_user_stats(
-        user_id    = user["id"],
-        xp         = data.get("xp", 0),
-        streak     = data.get("streak", 0),
-        tools_used = data.get("tools_used", 0),
-    )
-    return jsonify({"success": True})
+    try:
+        limit  = min(max(int(request.args.get("limit", 20)), 1), 50)
+        before = request.args.get("before")
+        before = int(before) if before else None
+    except ValueError:
+        return jsonify({"error": "limit and before must be integers"}), 400
+
+    rows = DatabaseService.get_history(user["id"], limit, before=before, tool=request.args.get("tool"))
+    return jsonify({
+        "items":       rows,
+        "next_before": rows[-1]["id"] if len(rows) == limit else None,
+    })
 
 
 @user_bp.route("/leaderboard", methods=["GET"])
 def leaderboard():
-    rows = DatabaseService.get_global_leaderboard()
+    rows = LeaderboardService.live_board("global")
     return jsonify(rows)
 
 
 @user_bp.route("/leaderboard/weekly", methods=["GET"])
 def leaderboard_weekly():
-    rows = DatabaseService.get_weekly_leaderboard()
+    rows = LeaderboardService.live_board("weekly")
     return jsonify(rows)
 
 
+@user_bp.route("/leaderboard/stream", methods=["GET"])
+def leaderboard_stream():
+    user = session.get("user")
+    user_id = user["id"] if user else None
+    if not LeaderboardService.subscribe(user_id):
+        resp = jsonify({"error": "too many live viewers, poll instead"})
+        resp.headers["Retry-After"] = "30"
+        return resp, 503
+
+    def events():
+        version, board, _ = LeaderboardService.live_update(user_id)
+        yield f"retry: 5000\nevent: board\ndata: {json.dumps(board)}\n\n"
+        # Bounded so a forgotten tab can't hold a worker thread forever; EventSource reconnects
+        deadline = time.monotonic() + LEADERBOARD_SSE_MAX_S
+        while time.monotonic() < deadline:
+            latest, board, me = LeaderboardService.live_update(user_id, version, SSE_HEARTBEAT_SECONDS)
+            if latest == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = latest
+            yield f"event: board\ndata: {json.dumps(board)}\n\n"
+            if me:
+                yield f"event: rank\ndata: {json.dumps(me)}\n\n"
+
+    resp = Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    resp.call_on_close(lambda: LeaderboardService.unsubscribe(user_id))
+    return resp
+
+
+@user_bp.route("/leaderboard/weeks", methods=["GET"])
+def leaderboard_weeks():
+    return jsonify(DatabaseService.get_snapshot_weeks())
+
+
+@user_bp.route("/leaderboard/weekly/<week>", methods=["GET"])
+def leaderboard_weekly_archive(week: str):
+    try:
+        day = LeaderboardService.last_completed_week() if week == "last" else date.fromisoformat(week)
+        limit = min(max(int(request.args.get("limit", LEADERBOARD_SNAPSHOT_TOP)), 1), LEADERBOARD_SNAPSHOT_TOP)
+    except ValueError:
+        return jsonify({"error": "week must be 'last' or YYYY-MM-DD, limit an integer"}), 400
+
+    user = session.get("user")
+    board = LeaderboardService.get_week(day, limit, user["id"] if user else None)
+    if board is None:
+        return jsonify({"error": "no snapshot for that week"}), 404
+    return jsonify(board)
+
+
 @user_bp.route("/leaderboard/personal", methods=["GET"])
 def leaderboard_personal():
     user = session.get("user")
@@ -0,0 +1,382 @@
+"""
+services/admission_service.py
+─────────────────────────────
+Admission control, so a Groq slowdown degrades the app instead of piling
+requests up until gunicorn's 120s timeout kills the worker.
+
+Two per-process signals:
+  - LLM slots: at most LLM_MAX_INFLIGHT Groq calls run at once (AIService
+    holds a slot per call); up to LLM_MAX_WAITING more queue for one, for
+    at most LLM_MAX_QUEUE_WAIT_S. Queue wait is the p90 of the last
+    ADMISSION_WINDOW_S of waits, or the oldest waiter's age if that's longer.
+  - Tool requests in flight, counted by middleware/admission.py.
+
+Slots are shared fairly. Every call is scheduled as a (client, priority)
+pair — the signed-in user or the IP, see current() — and queued calls are
+granted in start-time fair queuing order: each client has a virtual clock
+that advances by a call's cost (its route's max_tokens) over the client's
+weight, and the waiter with the earliest start tag goes next. A client
+with a backlog therefore waits behind itself, and someone arriving fresh
+goes to the front. On top of that:
+
+  - priorities are strict: interactive, then batch (cli.py batch), then
+    background (speculative PDF analyses), and while any interactive call
+    is running or queued, batch + background get no more slots once they
+    hold LLM_BACKGROUND_SLOTS between them
+  - one client holds at most LLM_TENANT_MAX_INFLIGHT slots and queues at
+    most LLM_TENANT_MAX_WAITING more; past that its calls are shed at once
+  - the queue wait that drives level() only counts callers that had
+    nothing else queued, so a single client's backlog degrades that client
+    (admit() sheds it as over its share), not the app
+
+level() turns them into ok / degraded / shedding, and admit(cost) into a
+decision for the kind of path asking:
+
+  cost        degraded              shedding
+  cheap       cached / template     cached / template    garbage roasts, PDF quips + scan
+  standard    runs                  503 + Retry-After    single roasts
+  expensive   503 + Retry-After     503 + Retry-After    PDF analyse, roast battles
+
+History replays are looked up before admission, so a roast that's already
+in roast_history is still served while shedding. Routes that never call
+Groq (/ping, leaderboards, auth, the shell) are never gated; the thread
+budget in config.py keeps threads free for them.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import has_request_context, jsonify, request, session
+
+from config import (
+    WEB_THREADS, ADMISSION_MAX_TOOL_REQUESTS, LEADERBOARD_SSE_MAX_SUBSCRIBERS,
+    LLM_MAX_INFLIGHT, LLM_MAX_WAITING, LLM_MAX_QUEUE_WAIT_S,
+    ADMISSION_DEGRADE_WAIT_S, ADMISSION_SHED_WAIT_S, ADMISSION_WINDOW_S, ADMISSION_RETRY_AFTER_S,
+    LLM_FAIR_SHARE, LLM_TENANT_MAX_INFLIGHT, LLM_TENANT_MAX_WAITING, LLM_BACKGROUND_SLOTS, LLM_SHARE_WEIGHTS,
+)
+
+PRIORITIES = ("interactive", "batch", "background")   # highest first
+
+if ADMISSION_MAX_TOOL_REQUESTS + LEADERBOARD_SSE_MAX_SUBSCRIBERS >= WEB_THREADS:
+    print(f"[ADMISSION] tool requests ({ADMISSION_MAX_TOOL_REQUESTS}) + leaderboard streams "
+          f"({LEADERBOARD_SSE_MAX_SUBSCRIBERS}) leave no threads free of {WEB_THREADS} — /ping can starve")
+
+
+class OverloadedError(Exception):
+    """Raised when a call is shed; answered with 503 + Retry-After."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("tenant", "priority", "tag", "arrived", "fresh", "granted")
+
+    def __init__(self, tenant: str, priority: str, tag: float, arrived: float, fresh: bool):
+        self.tenant, self.priority, self.tag = tenant, priority, tag
+        self.arrived, self.fresh, self.granted = arrived, fresh, False
+
+
+class _FairGate:
+    """
+    Counting semaphore that hands slots out in fair-queuing order and
+    remembers how long callers waited for one. With tenant caps equal to
+    the global ones and a single tenant it is the plain FIFO it replaced.
+    """
+
+    def __init__(self, slots: int, max_waiting: int, max_wait_s: float, window_s: float,
+                 tenant_slots: int, tenant_waiting: int, background_slots: int):
+        self.slots = slots
+        self.max_waiting = max_waiting
+        self.max_wait_s = max_wait_s
+        self.window_s = window_s
+        self.tenant_slots = tenant_slots
+        self.tenant_waiting = tenant_waiting
+        self.background_slots = background_slots
+        self.inflight = 0
+        self._queues: dict[str, list[_Waiter]] = {p: [] for p in PRIORITIES}
+        self._running: dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._tenant_running: dict[str, int] = {}
+        self._tenant_queued: dict[str, int] = {}
+        self._vtime: dict[str, float] = {p: 0.0 for p in PRIORITIES}   # start tag of the last grant
+        self._finish: dict[tuple[str, str], float] = {}   # (priority, tenant) → finish tag of its last call
+        self._waits: deque[tuple[float, float]] = deque(maxlen=512)   # (finished, waited), fresh callers only
+        self._cond = threading.Condition()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def over_share(self, tenant: str) -> bool:
+        """True when tenant is at its slot cap and has a full queue behind it."""
+        with self._cond:
+            return (self._tenant_running.get(tenant, 0) >= self.tenant_slots
+                    and self._tenant_queued.get(tenant, 0) >= self.tenant_waiting)
+
+    def acquire(self, tenant: str, priority: str = "interactive", cost: float = 1.0, weight: float = 1.0) -> float:
+        """Take a slot; returns seconds waited. Raises OverloadedError when the queue is full or too slow."""
+        with self._cond:
+            now = time.monotonic()
+            if self.inflight >= self.slots and self.waiting >= self.max_waiting:
+                raise OverloadedError("llm queue full")
+            queued = self._tenant_queued.get(tenant, 0)
+            if queued >= self.tenant_waiting:
+                raise OverloadedError("llm queue full for this client")
+            tag = max(self._vtime[priority], self._finish.get((priority, tenant), 0.0))
+            self._finish[(priority, tenant)] = tag + cost / weight
+            fresh = priority == "interactive" and not queued \
+                and self._tenant_running.get(tenant, 0) < self.tenant_slots
+            waiter = _Waiter(tenant, priority, tag, now, fresh)
+            self._queues[priority].append(waiter)
+            self._tenant_queued[tenant] = queued + 1
+            self._dispatch()
+            try:
+                self._cond.wait_for(lambda: waiter.granted, timeout=self.max_wait_s)
+            finally:
+                if not waiter.granted:
+                    self._queues[priority].remove(waiter)
+                    self._dequeued(tenant)
+            waited = time.monotonic() - now
+            if fresh:
+                self._waits.append((time.monotonic(), waited))
+            if not waiter.granted:
+                raise OverloadedError("llm queue wait timed out")
+            return waited
+
+    def release(self, tenant: str, priority: str = "interactive") -> None:
+        with self._cond:
+            self.inflight -= 1
+            self._running[priority] -= 1
+            self._tenant_running[tenant] -= 1
+            if not self._tenant_running[tenant]:
+                del self._tenant_running[tenant]
+            if len(self._finish) > 4096:   # clocks at or behind their class's are the same as no clock
+                self._finish = {k: f for k, f in self._finish.items() if f > self._vtime[k[0]]}
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the best eligible waiters. Caller holds the lock."""
+        granted = False
+        while self.inflight < self.slots:
+            waiter = self._next()
+            if waiter is None:
+                break
+            self._queues[waiter.priority].remove(waiter)
+            self._dequeued(waiter.tenant)
+            self._vtime[waiter.priority] = max(self._vtime[waiter.priority], waiter.tag)
+            self.inflight += 1
+            self._running[waiter.priority] += 1
+            self._tenant_running[waiter.tenant] = self._tenant_running.get(waiter.tenant, 0) + 1
+            waiter.granted = granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _next(self) -> _Waiter | None:
+        low = self._running["batch"] + self._running["background"]
+        busy = self._running["interactive"] or self._queues["interactive"]
+        for priority in PRIORITIES:
+            if priority != "interactive" and busy and low >= self.background_slots:
+                break
+            eligible = [w for w in self._queues[priority]
+                        if self._tenant_running.get(w.tenant, 0) < self.tenant_slots]
+            if eligible:
+                return min(eligible, key=lambda w: (w.tag, w.arrived))
+        return None
+
+    def _dequeued(self, tenant: str) -> None:
+        self._tenant_queued[tenant] -= 1
+        if not self._tenant_queued[tenant]:
+            del self._tenant_queued[tenant]
+
+    def queue_wait(self) -> float:
+        """p90 wait of recent fresh callers, or the oldest fresh waiter's age if longer."""
+        now = time.monotonic()
+        with self._cond:
+            recent = sorted(w for t, w in self._waits if now - t <= self.window_s)
+            oldest = max((now - w.arrived for w in self._queues["interactive"] if w.fresh), default=0.0)
+        p90 = recent[int(len(recent) * 0.9)] if recent else 0.0
+        return max(p90, oldest)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "by_priority": {p: {"inflight": self._running[p], "waiting": len(self._queues[p])}
+                                for p in PRIORITIES},
+                "clients_inflight": len(self._tenant_running),
+                "clients_waiting":  len(self._tenant_queued),
+            }
+
+
+class AdmissionService:
+
+    _gate = _FairGate(LLM_MAX_INFLIGHT, LLM_MAX_WAITING, LLM_MAX_QUEUE_WAIT_S, ADMISSION_WINDOW_S,
+                      tenant_slots=LLM_TENANT_MAX_INFLIGHT if LLM_FAIR_SHARE else LLM_MAX_INFLIGHT,
+                      tenant_waiting=LLM_TENANT_MAX_WAITING if LLM_FAIR_SHARE else LLM_MAX_WAITING,
+                      background_slots=LLM_BACKGROUND_SLOTS if LLM_FAIR_SHARE else LLM_MAX_INFLIGHT)
+    _tool_requests = 0
+    _lock = threading.Lock()
+    _share = threading.local()   # .value = (tenant, priority) set by acting_as()
+    _cheap: dict[tuple, deque] = {}   # key → recent LLM answers for a cheap path
+    _counters = {"admitted": 0, "templated": 0, "shed": 0, "over_share": 0}
+
+    # ── LLM slots ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    @contextmanager
+    def llm_slot(cost: float = 1.0):
+        """Hold one of the LLM_MAX_INFLIGHT Groq slots for the duration of a call, as current()."""
+        tenant, priority = AdmissionService.current()
+        weight = LLM_SHARE_WEIGHTS.get(tenant.split(":", 1)[0], 1.0)
+        AdmissionService._gate.acquire(tenant, priority, cost, weight)
+        try:
+            yield
+        finally:
+            AdmissionService._gate.release(tenant, priority)
+
+    # ── Fair share ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def client_ip() -> str:
+        # ProxyFix (app.py) has already taken the client from Render's own
+        # X-Forwarded-For hop; the header's first entry is client-supplied
+        return request.remote_addr or ""
+
+    @staticmethod
+    def current() -> tuple[str, str]:
+        """
+        (tenant, priority) this thread's LLM calls are scheduled as: what
+        acting_as() set, else the request's user or IP as interactive,
+        else an anonymous background caller.
+        """
+        if not LLM_FAIR_SHARE:
+            return "all", "interactive"
+        share = getattr(AdmissionService._share, "value", None)
+        if share:
+            return share
+        if has_request_context():
+            user = session.get("user")
+            return (f"user:{user['id']}" if user else f"ip:{AdmissionService.client_ip()}"), "interactive"
+        return "background", "background"
+
+    @staticmethod
+    @contextmanager
+    def acting_as(tenant: str, priority: str):
+        previous = getattr(AdmissionService._share, "value", None)
+        AdmissionService._share.value = (tenant, priority)
+        try:
+            yield
+        finally:
+            AdmissionService._share.value = previous
+
+    @staticmethod
+    def bind(fn, tenant: str | None = None, priority: str | None = None):
+        """fn wrapped to run as the calling thread's current() — for work handed to a pool."""
+        current_tenant, current_priority = AdmissionService.current()
+        share = (tenant or current_tenant, priority or current_priority)
+
+        @wraps(fn)
+        def bound(*args, **kwargs):
+            with AdmissionService.acting_as(*share):
+                return fn(*args, **kwargs)
+        return bound
+
+    # ── Tool requests (middleware/admission.py) ────────────────────────────
+
+    @staticmethod
+    def enter() -> None:
+        with AdmissionService._lock:
+            AdmissionService._tool_requests += 1
+
+    @staticmethod
+    def leave() -> None:
+        with AdmissionService._lock:
+            AdmissionService._tool_requests -= 1
+
+    # ── Decisions ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def level() -> str:
+        gate = AdmissionService._gate
+        wait = gate.queue_wait()
+        if (AdmissionService._tool_requests > ADMISSION_MAX_TOOL_REQUESTS
+                or gate.waiting >= gate.max_waiting or wait >= ADMISSION_SHED_WAIT_S):
+            return "shedding"
+        if gate.inflight >= gate.slots or wait >= ADMISSION_DEGRADE_WAIT_S:
+            return "degraded"
+        return "ok"
+
+    @staticmethod
+    def admit(cost: str) -> str:
+        """
+        cost: "cheap" | "standard" | "expensive". Returns "ok" (call Groq) or
+        "template" (cheap paths under pressure: serve cached()/a template).
+        Raises OverloadedError when the path should get a 503.
+        """
+        if LLM_FAIR_SHARE and AdmissionService._gate.over_share(AdmissionService.current()[0]):
+            AdmissionService._bump("over_share")
+            if cost == "cheap":
+                return "template"
+            raise OverloadedError(f"over fair share: {cost} path")
+        level = AdmissionService.level()
+        if level == "ok" or (level == "degraded" and cost == "standard"):
+            AdmissionService._bump("admitted")
+            return "ok"
+        if cost == "cheap":
+            AdmissionService._bump("templated")
+            return "template"
+        AdmissionService._bump("shed")
+        raise OverloadedError(f"{level}: {cost} path")
+
+    @staticmethod
+    def retry_after() -> int:
+        return min(60, max(ADMISSION_RETRY_AFTER_S, int(AdmissionService._gate.queue_wait() * 2)))
+
+    @staticmethod
+    def response(error: OverloadedError):
+        print(f"[ADMISSION] shed ({error.reason})")
+        resp = jsonify({"error": "ANVIL is swamped right now — give it a few seconds and try again."})
+        resp.headers["Retry-After"] = str(AdmissionService.retry_after())
+        return resp, 503
+
+    # ── Cheap-path answers ─────────────────────────────────────────────────
+
+    @staticmethod
+    def remember(key: tuple, text: str) -> None:
+        """Keep a cheap path's LLM answer to hand out again while degraded."""
+        with AdmissionService._lock:
+            if key not in AdmissionService._cheap and len(AdmissionService._cheap) >= 1000:
+                AdmissionService._cheap.pop(next(iter(AdmissionService._cheap)))
+            AdmissionService._cheap.setdefault(key, deque(maxlen=4)).append(text)
+
+    @staticmethod
+    def cached(key: tuple) -> str | None:
+        with AdmissionService._lock:
+            answers = AdmissionService._cheap.get(key)
+            return random.choice(answers) if answers else None
+
+    # ── Metrics ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _bump(counter: str) -> None:
+        with AdmissionService._lock:
+            AdmissionService._counters[counter] += 1
+
+    @staticmethod
+    def stats() -> dict:
+        gate = AdmissionService._gate
+        with AdmissionService._lock:
+            counters = dict(AdmissionService._counters)
+        return {
+            "level":         AdmissionService.level(),
+            "tool_requests": AdmissionService._tool_requests,
+            "llm_inflight":  gate.inflight,
+            "llm_waiting":   gate.waiting,
+            "queue_wait_s":  round(gate.queue_wait(), 3),
+            **gate.snapshot(),
+            **counters,
+        }
@@ -2,32 +2,411 @@
 services/ai_service.py
 ──────────────────────
 All communication with the Groq LLM lives here.
-Routes never import groq_client directly — they always go through AIService.
+Routes never touch the Groq client directly — they always go through AIService.
+
+Model routing: callers pass the (tool, mode) they're serving and AIService
+picks a tier from config.MODEL_ROUTES — cheap passes (garbage roasts, PDF
+quips, scan questions) run on the fast model, real analysis on the big one.
+On an error or timeout the call is retried once on the other tier.
+
+Hedging (opt-in, config.HEDGING_ENABLED + HEDGE_ROUTES): the call is
+streamed, and if no token has arrived by the route's observed TTFT
+percentile a duplicate is fired; first to finish wins, the other stream is
+closed. Counters: hedges_fired / hedges_won in AIService.stats().
+
+Admission: every call holds an AdmissionService LLM slot from its first
+attempt to its last (services/admission_service.py), queued fairly per
+client with its route's max_tokens as the cost, and hedging is skipped
+unless the service is at level "ok" — a duplicate call is the last thing
+an overloaded Groq needs.
+
+Output budgets (config.OUTPUT_BUDGETS): every call carries its route's
+max_tokens and stop sequences. Routes whose prompt asks for a fixed number
+of blocks (scan: 5 [QUESTION:]s, quips: 6 [QUIP:]s) are streamed and the
+stream is closed once the last block completes, instead of paying for
+whatever the model adds after it. Output lengths per route — percentiles,
+replies that hit the cap, replies cut early — are in AIService.stats().
+
+Fan-out: ask_many() runs several prompts (roast battle personas) on one
+shared, bounded pool and yields each result as it finishes. Identical
+prompts are sent once.
 """
 
-from config import groq_client, GROQ_MODEL
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+from config import (
+    get_groq_client, MODEL_TIERS, MODEL_TIMEOUTS, MODEL_ROUTES, MODEL_PRICING,
+    HEDGING_ENABLED, HEDGE_ROUTES, HEDGE_DEFAULT_DEADLINE_S, HEDGE_MIN_SAMPLES, LLM_FANOUT_WORKERS,
+    OUTPUT_BUDGETS, OUTPUT_DEFAULT_MAX_TOKENS, OUTPUT_LENGTH_SAMPLES,
+)
+from services.admission_service import AdmissionService
+
+
+class _Cutoff:
+    """Watches a streamed reply; done once `count` complete blocks matching `pattern` are in."""
+
+    def __init__(self, pattern: str, count: int):
+        self.block = re.compile(pattern, re.IGNORECASE)
+        self.count = count
+        self.found = 0
+        self.text  = ""
+        self._pos  = 0   # end of the last complete block
+
+    def feed(self, delta: str) -> bool:
+        self.text += delta
+        for m in self.block.finditer(self.text, self._pos):
+            self.found, self._pos = self.found + 1, m.end()
+            if self.found >= self.count:
+                self.text = self.text[:m.end()]
+                return True
+        return False
+
+
+class _Attempt:
+    """One streamed completion racing inside a hedged call."""
+
+    def __init__(self, tier: str, hedge: bool):
+        self.tier      = tier
+        self.hedge     = hedge
+        self.progress  = threading.Event()   # first token arrived, or attempt ended
+        self.cancelled = threading.Event()
+        self.ttft: float | None = None
+        self.text: str | None   = None
+        self.finish: str | None = None   # "stop" | "length" | "cut"
+        self.error: Exception | None = None
+        self.elapsed = 0.0
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def attach(self, stream) -> None:
+        """Keep the open stream so cancel() can drop it; closes it at once if already cancelled."""
+        with self._lock:
+            self._stream = stream
+            cancelled = self.cancelled.is_set()
+        if cancelled:
+            stream.close()
+
+    def cancel(self) -> None:
+        """Stop the attempt now — closing the stream ends generation even while no chunk arrives."""
+        with self._lock:
+            self.cancelled.set()
+            stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
 
 
 class AIService:
     """Thin wrapper around the Groq client."""
 
+    _stats: dict[str, dict] = {}
+    _stats_lock = threading.Lock()
+    _ttft: dict[str, deque] = {}   # route → recent time-to-first-token samples
+    _lengths: dict[str, deque] = {}   # route → recent output lengths (tokens)
+    _fanout = ThreadPoolExecutor(max_workers=LLM_FANOUT_WORKERS, thread_name_prefix="anvil-fanout")
+
     @staticmethod
-    def ask(prompt: str) -> str:
+    def ask(prompt: str, tool: str | None = None, mode: str | None = None) -> str:
         """Send a single-turn prompt and return the text response."""
-        response = groq_client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content
+        return AIService._complete([{"role": "user", "content": prompt}], tool, mode)
 
     @staticmethod
-    def ask_with_system(system: str, prompt: str) -> str:
+    def ask_with_system(system: str, prompt: str, tool: str | None = None, mode: str | None = None) -> str:
         """Send a prompt with an explicit system message."""
-        response = groq_client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user",   "content": prompt},
-            ]
-        )
-        return response.choices[0].message.content
+        return AIService._complete([
+            {"role": "system", "content": system},
+            {"role": "user",   "content": prompt},
+        ], tool, mode)
+
+    @staticmethod
+    def ask_many(prompts: dict[str, str], tool: str | None = None,
+                 mode: str | None = None) -> Iterator[tuple[str, str | None, Exception | None]]:
+        """
+        Run prompts concurrently; yield (key, text, None) or (key, None, error)
+        in completion order. Closing the iterator early cancels calls not yet started.
+        """
+        keys_by_prompt: dict[str, list[str]] = {}
+        for key, prompt in prompts.items():
+            keys_by_prompt.setdefault(prompt, []).append(key)
+        ask = AdmissionService.bind(AIService.ask)   # fan-out calls count against the caller's fair share
+        futures = {
+            AIService._fanout.submit(ask, prompt, tool, mode): keys
+            for prompt, keys in keys_by_prompt.items()
+        }
+        try:
+            for fut in as_completed(futures):
+                try:
+                    text, error = fut.result(), None
+                except Exception as e:
+                    text, error = None, e
+                for key in futures[fut]:
+                    yield key, text, error
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+    # ── Routing ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def route_tier(tool: str | None, mode: str | None) -> str:
+        """Tier for a (tool, mode) route — exact match, then tool-wide, then big."""
+        return MODEL_ROUTES.get((tool, mode)) or MODEL_ROUTES.get((tool, None)) or "big"
+
+    @staticmethod
+    def output_budget(tool: str | None, mode: str | None) -> dict:
+        """max_tokens / stop / done for a (tool, mode) route — exact match, then tool-wide, then the default."""
+        return (OUTPUT_BUDGETS.get((tool, mode)) or OUTPUT_BUDGETS.get((tool, None))
+                or {"max_tokens": OUTPUT_DEFAULT_MAX_TOKENS})
+
+    @staticmethod
+    def hedge_policy(tool: str | None, mode: str | None) -> dict | None:
+        if not HEDGING_ENABLED:
+            return None
+        return HEDGE_ROUTES.get((tool, mode)) or HEDGE_ROUTES.get((tool, None))
+
+    @staticmethod
+    def _complete(messages: list[dict], tool: str | None, mode: str | None) -> str:
+        with AdmissionService.llm_slot(cost=AIService.output_budget(tool, mode)["max_tokens"]):
+            return AIService._attempts(messages, tool, mode)
+
+    @staticmethod
+    def _attempts(messages: list[dict], tool: str | None, mode: str | None) -> str:
+        primary  = AIService.route_tier(tool, mode)
+        fallback = "big" if primary == "fast" else "fast"
+        route    = f"{tool or 'adhoc'}:{mode or '-'}"
+        policy   = AIService.hedge_policy(tool, mode) if AdmissionService.level() == "ok" else None
+        budget   = AIService.output_budget(tool, mode)
+
+        for attempt, tier in enumerate((primary, fallback)):
+            if attempt == 0 and policy:
+                try:
+                    return AIService._hedged(messages, route, tier, policy, budget)
+                except Exception as e:
+                    print(f"[AI] {route} hedged call failed ({type(e).__name__}: {e}) — falling back to {fallback}")
+                    continue
+            start = time.perf_counter()
+            try:
+                if budget.get("done"):
+                    # Structured reply: stream it so it can be closed once complete
+                    att = _Attempt(tier, False)
+                    AIService._stream(att, messages, None, budget)
+                    if att.error is not None:
+                        raise att.error
+                    AIService._record(route, tier, None, att.elapsed, fell_back=attempt == 1,
+                                      tokens=AIService._estimate(messages, att.text), finish=att.finish)
+                    return att.text
+                response = get_groq_client().chat.completions.create(
+                    model=MODEL_TIERS[tier],
+                    messages=messages,
+                    timeout=MODEL_TIMEOUTS[tier],
+                    **AIService._limits(budget),
+                )
+            except Exception as e:
+                AIService._record(route, tier, None, time.perf_counter() - start, failed=True)
+                if attempt == 1:
+                    raise
+                print(f"[AI] {route} on {tier} failed ({type(e).__name__}: {e}) — falling back to {fallback}")
+                continue
+            choice = response.choices[0]
+            AIService._record(route, tier, response, time.perf_counter() - start,
+                              fell_back=attempt == 1, finish=choice.finish_reason)
+            return choice.message.content
+
+    @staticmethod
+    def _limits(budget: dict) -> dict:
+        """Keyword arguments for chat.completions.create() that enforce a budget."""
+        limits = {"max_tokens": budget["max_tokens"]}
+        if budget.get("stop"):
+            limits["stop"] = budget["stop"]
+        return limits
+
+    @staticmethod
+    def _estimate(messages: list[dict], text: str) -> tuple[int, int]:
+        """(tokens in, tokens out) for a streamed call, which reports no usage."""
+        return sum(len(m["content"]) for m in messages) // 4, len(text) // 4
+
+    # ── Hedging ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _hedged(messages: list[dict], route: str, tier: str, policy: dict, budget: dict) -> str:
+        done: queue.Queue = queue.Queue()
+        primary = AIService._launch(messages, tier, False, done, budget)
+        attempts = [primary]
+
+        deadline = AIService._hedge_deadline(route, policy)
+        if not primary.progress.wait(deadline) and AIService._hedge_allowed(route, policy):
+            hedge_tier = policy.get("tier") or tier
+            print(f"[AI] {route} no token after {deadline:.2f}s — hedging on {hedge_tier}")
+            attempts.append(AIService._launch(messages, hedge_tier, True, done, budget))
+            AIService._bump(route, "hedges_fired")
+
+        winner, error = None, None
+        wait_limit = max(MODEL_TIMEOUTS[a.tier] for a in attempts) + 5
+        for _ in attempts:
+            try:
+                att = done.get(timeout=wait_limit)
+            except queue.Empty:
+                break
+            if att.error is None:
+                winner = att
+                break
+            error = att.error
+            AIService._record(route, att.tier, None, att.elapsed, failed=True)
+
+        for att in attempts:
+            if att is not winner:
+                att.cancel()
+        if primary.ttft is not None:
+            with AIService._stats_lock:
+                AIService._ttft.setdefault(route, deque(maxlen=200)).append(primary.ttft)
+
+        if winner is None:
+            raise error or TimeoutError(f"{route}: no hedged attempt finished")
+        if winner.hedge:
+            AIService._bump(route, "hedges_won")
+        AIService._record(route, winner.tier, None, winner.elapsed,
+                          tokens=AIService._estimate(messages, winner.text), finish=winner.finish)
+        return winner.text
+
+    @staticmethod
+    def _launch(messages: list[dict], tier: str, hedge: bool, done: queue.Queue, budget: dict) -> _Attempt:
+        att = _Attempt(tier, hedge)
+        threading.Thread(target=AIService._stream, args=(att, messages, done, budget),
+                         name=f"anvil-hedge-{tier}", daemon=True).start()
+        return att
+
+    @staticmethod
+    def _stream(att: _Attempt, messages: list[dict], done: queue.Queue | None, budget: dict) -> None:
+        """Stream one completion into att; with done=None it runs on the caller's thread."""
+        start = time.perf_counter()
+        cutoff = _Cutoff(*budget["done"]) if budget.get("done") else None
+        try:
+            stream = get_groq_client().chat.completions.create(
+                model=MODEL_TIERS[att.tier],
+                messages=messages,
+                timeout=MODEL_TIMEOUTS[att.tier],
+                stream=True,
+                **AIService._limits(budget),
+            )
+            att.attach(stream)
+            parts = []
+            try:
+                for chunk in stream:
+                    if att.cancelled.is_set():
+                        return
+                    choice = chunk.choices[0] if chunk.choices else None
+                    delta = choice.delta.content if choice else None
+                    if choice and choice.finish_reason:
+                        att.finish = choice.finish_reason
+                    if delta:
+                        if att.ttft is None:
+                            att.ttft = time.perf_counter() - start
+                            att.progress.set()
+                        parts.append(delta)
+                        if cutoff and cutoff.feed(delta):
+                            att.finish = "cut"
+                            break
+            finally:
+                stream.close()   # drops the connection so a cancelled loser / a cut reply stops generating
+            att.text = cutoff.text if att.finish == "cut" else "".join(parts)
+        except Exception as e:
+            att.error = e
+        finally:
+            att.elapsed = time.perf_counter() - start
+            att.progress.set()
+            if done is not None and not att.cancelled.is_set():
+                done.put(att)
+
+    @staticmethod
+    def _hedge_deadline(route: str, policy: dict) -> float:
+        with AIService._stats_lock:
+            samples = list(AIService._ttft.get(route, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DEADLINE_S
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, int(len(ordered) * policy.get("percentile", 95) / 100))
+        return ordered[idx]
+
+    @staticmethod
+    def _hedge_allowed(route: str, policy: dict) -> bool:
+        """Budget: hedges may add at most policy['budget'] × calls extra requests."""
+        with AIService._stats_lock:
+            s = AIService._stats.get(route, {})
+            fired = s.get("hedges_fired", 0)
+            calls = s.get("calls", 0) + s.get("errors", 0)
+        return fired < max(1.0, policy.get("budget", 0.1) * calls)
+
+    # ── Metrics ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _record(route: str, tier: str, response, elapsed: float,
+                failed: bool = False, fell_back: bool = False,
+                tokens: tuple[int, int] | None = None, finish: str | None = None) -> None:
+        """
+        tokens=(in, out) overrides response.usage — streamed calls only estimate it.
+        finish: the reply's finish_reason, or "cut" when it was closed early.
+        """
+        model = MODEL_TIERS[tier]
+        usage = getattr(response, "usage", None)
+        tokens_in  = getattr(usage, "prompt_tokens", 0) or 0
+        tokens_out = getattr(usage, "completion_tokens", 0) or 0
+        if tokens is not None:
+            tokens_in, tokens_out = tokens
+        price_in, price_out = MODEL_PRICING.get(model, (0.0, 0.0))
+        cost = (tokens_in * price_in + tokens_out * price_out) / 1_000_000
+
+        with AIService._stats_lock:
+            s = AIService._route_stats(route)
+            if failed:
+                s["errors"] += 1
+                return
+            s["calls"]      += 1
+            s["fallbacks"]  += int(fell_back)
+            s["latency_s"]  += elapsed
+            s["tokens_in"]  += tokens_in
+            s["tokens_out"] += tokens_out
+            s["cost_usd"]   += cost
+            s["capped"]     += int(finish == "length")
+            s["cut_early"]  += int(finish == "cut")
+            s["by_model"][model] = s["by_model"].get(model, 0) + 1
+            AIService._lengths.setdefault(route, deque(maxlen=OUTPUT_LENGTH_SAMPLES)).append(tokens_out)
+
+    @staticmethod
+    def _bump(route: str, counter: str) -> None:
+        with AIService._stats_lock:
+            AIService._route_stats(route)[counter] += 1
+
+    @staticmethod
+    def _route_stats(route: str) -> dict:
+        """Counters for a route, created on first use. Caller holds _stats_lock."""
+        return AIService._stats.setdefault(route, {
+            "calls": 0, "errors": 0, "fallbacks": 0, "latency_s": 0.0,
+            "tokens_in": 0, "tokens_out": 0, "cost_usd": 0.0,
+            "hedges_fired": 0, "hedges_won": 0, "capped": 0, "cut_early": 0, "by_model": {},
+        })
+
+    @staticmethod
+    def stats() -> dict[str, dict]:
+        """Snapshot of per-route counters since process start, with recent output-length percentiles."""
+        with AIService._stats_lock:
+            return {
+                route: {**s, "by_model": dict(s["by_model"]),
+                        "output_tokens": AIService._distribution(AIService._lengths.get(route, ()))}
+                for route, s in AIService._stats.items()
+            }
+
+    @staticmethod
+    def _distribution(samples) -> dict:
+        ordered = sorted(samples)
+        if not ordered:
+            return {"n": 0}
+        pick = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+        return {"n": len(ordered), "p50": pick(50), "p90": pick(90), "p99": pick(99), "max": ordered[-1]}
@@ -0,0 +1,252 @@
+"""
+services/batch_service.py
+─────────────────────────
+Offline bulk roasting behind `python cli.py batch` — for campus events where
+hundreds of resumes / LinkedIn PDFs arrive at once.
+
+Input is either
+  - a directory: *.pdf → linkedin_pdf analyse, *.txt / *.md → --tool (resume)
+  - a JSONL file, one item per line. Recognised keys:
+      id | request_id                      stable id (else a content hash)
+      tool, comic                          override the CLI defaults
+      text | resume_text | content         the input text
+      title + body                         joined as the text (requests.jsonl shape)
+      path | pdf                           a PDF, relative to the JSONL file
+
+Every item goes through the same garbage check and comics.py prompt
+builders as the /api routes, then AIService (so model routing and fallback
+apply). Calls run on a thread pool behind a token-bucket rate limiter, at
+"batch" LLM priority — behind interactive calls if it ever shares a process.
+
+The output JSONL doubles as the checkpoint: each result is appended and
+fsynced as it finishes, and a rerun skips ids already in the file — so a
+crash or Ctrl-C loses at most the in-flight items. Batch runs award no XP
+and write nothing to Supabase.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator
+
+from comics import (
+    get_garbage_prompt,
+    get_linkedin_pdf_prompt,
+    get_linkedin_prompt,
+    get_resume_prompt,
+    is_garbage_input,
+)
+from services.admission_service import AdmissionService
+from services.ai_service import AIService
+from services.format_service import pdf_analysis_with_repair
+from services.linkedin_service import LinkedInService
+
+SUPPORTED_TOOLS = ("resume", "linkedin_pdf", "linkedin")
+TEXT_SUFFIXES   = (".txt", ".md")
+
+
+class RateLimiter:
+    """Token bucket: `rate_per_min` sustained, bursts of up to `burst`."""
+
+    def __init__(self, rate_per_min: float, burst: int = 1):
+        self.rate  = rate_per_min / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last   = time.monotonic()
+        self._lock   = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class BatchService:
+
+    # ── Input ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def read_items(source: str, tool: str, comic: str) -> Iterator[dict]:
+        if os.path.isdir(source):
+            yield from BatchService._read_dir(source, tool, comic)
+        else:
+            yield from BatchService._read_jsonl(source, tool, comic)
+
+    @staticmethod
+    def _read_dir(source: str, tool: str, comic: str) -> Iterator[dict]:
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            suffix = os.path.splitext(name)[1].lower()
+            if suffix == ".pdf":
+                yield {"id": name, "tool": "linkedin_pdf", "comic": comic, "pdf_path": path}
+            elif suffix in TEXT_SUFFIXES:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    yield {"id": name, "tool": tool, "comic": comic, "text": f.read()}
+
+    @staticmethod
+    def _read_jsonl(source: str, tool: str, comic: str) -> Iterator[dict]:
+        base = os.path.dirname(os.path.abspath(source))
+        with open(source, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"[BATCH] {source}:{lineno} skipped — bad JSON ({e})")
+                    continue
+                item = {"tool": obj.get("tool", tool), "comic": obj.get("comic", comic)}
+                pdf = obj.get("path") or obj.get("pdf")
+                if pdf:
+                    item["tool"] = "linkedin_pdf"
+                    item["pdf_path"] = os.path.join(base, pdf)
+                else:
+                    text = obj.get("text") or obj.get("resume_text") or obj.get("content")
+                    if text is None and ("title" in obj or "body" in obj):
+                        text = f"{obj.get('title', '')}\n\n{obj.get('body', '')}".strip()
+                    item["text"] = text or ""
+                item["id"] = str(obj.get("id") or obj.get("request_id") or BatchService._content_id(item))
+                yield item
+
+    @staticmethod
+    def _content_id(item: dict) -> str:
+        key = f"{item['tool']}\x00{item['comic']}\x00{item.get('pdf_path') or item.get('text')}"
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    # ── Checkpoint ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def completed_ids(out_path: str, retry_errors: bool = False) -> set[str]:
+        """Ids already in the output file. Also trims a torn final line left by a crash."""
+        if not os.path.exists(out_path):
+            return set()
+        with open(out_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                data = data[:data.rfind(b"\n") + 1]
+        done = set()
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if retry_errors and row.get("status") == "error":
+                done.discard(row["id"])
+            else:
+                done.add(row["id"])
+        return done
+
+    # ── Processing ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def process(item: dict) -> dict:
+        """Garbage check → prompt → AIService for one item. Raises on AI errors."""
+        tool, comic = item["tool"], item["comic"]
+        result = {"id": item["id"], "tool": tool, "comic": comic}
+        if tool not in SUPPORTED_TOOLS:
+            return {**result, "status": "error", "error": f"unsupported tool {tool!r}"}
+
+        text = item.get("text")
+        if item.get("pdf_path"):
+            with open(item["pdf_path"], "rb") as f:
+                text, error = LinkedInService.extract_pdf_text(f.read())
+            if error:
+                return {**result, "status": "error", "error": error}
+
+        garbage, reason = is_garbage_input(text)
+        if garbage:
+            message = AIService.ask(get_garbage_prompt(comic, tool, text, reason), tool="garbage")
+            return {**result, "status": "garbage", "reason": reason, "message": message}
+
+        if tool == "resume":
+            message = AIService.ask(get_resume_prompt(comic, text), tool="resume", mode="paste")
+        elif tool == "linkedin":
+            message = AIService.ask(get_linkedin_prompt(comic, "profile", text), tool="linkedin", mode="check")
+        else:
+            message = AIService.ask(get_linkedin_pdf_prompt(comic, text, mode="analyse"),
+                                    tool="linkedin_pdf", mode="analyse")
+            return {**result, "status": "ok", "message": message,
+                    **pdf_analysis_with_repair(message, comic, text)}
+        return {**result, "status": "ok", "message": message}
+
+    @staticmethod
+    def _attempt(item: dict, limiter: RateLimiter, retries: int) -> dict:
+        start = time.perf_counter()
+        for attempt in range(retries + 1):
+            limiter.acquire()
+            try:
+                row = BatchService.process(item)
+                break
+            except Exception as e:
+                row = {"id": item["id"], "tool": item["tool"], "comic": item["comic"],
+                       "status": "error", "error": f"{type(e).__name__}: {e}"}
+                if attempt < retries:
+                    print(f"[BATCH] {item['id']} failed ({row['error']}) — retry {attempt + 1}/{retries}")
+                    time.sleep(2 ** attempt)
+        row["elapsed_s"] = round(time.perf_counter() - start, 3)
+        return row
+
+    # ── Runner ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def run(source: str, out_path: str, tool: str, comic: str, workers: int,
+            rate_per_min: float, retries: int, retry_errors: bool = False,
+            limit: int | None = None) -> dict:
+        """Process every not-yet-done item in `source`, appending results to `out_path`."""
+        done = BatchService.completed_ids(out_path, retry_errors)
+        items = [i for i in BatchService.read_items(source, tool, comic) if i["id"] not in done]
+        if limit is not None:
+            items = items[:limit]
+        print(f"[BATCH] {len(items)} to process, {len(done)} already in {out_path}")
+
+        counts = {"ok": 0, "garbage": 0, "error": 0}
+        attempt = AdmissionService.bind(BatchService._attempt, tenant="batch", priority="batch")
+        limiter = RateLimiter(rate_per_min, burst=workers)
+        write_lock = threading.Lock()
+        start = time.perf_counter()
+
+        with open(out_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(workers) as pool:
+            def write(row: dict) -> None:
+                with write_lock:
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+
+            pending = set()
+            queue = iter(items)
+            try:
+                while True:
+                    # Keep at most 2 × workers in flight so a huge input isn't materialised as futures
+                    for item in queue:
+                        pending.add(pool.submit(attempt, item, limiter, retries))
+                        if len(pending) >= workers * 2:
+                            break
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        row = fut.result()
+                        write(row)
+                        counts[row["status"]] += 1
+                        n = sum(counts.values())
+                        rate = n / max(time.perf_counter() - start, 1e-9)
+                        print(f"[BATCH] {n}/{len(items)} {row['id']} → {row['status']} "
+                              f"(ok={counts['ok']} garbage={counts['garbage']} error={counts['error']}, {rate:.2f}/s)")
+            except KeyboardInterrupt:
+                for fut in pending:
+                    fut.cancel()
+                print("[BATCH] interrupted — finished results are saved; rerun the same command to resume")
+                raise
+
+        return {**counts, "skipped": len(done), "elapsed_s": round(time.perf_counter() - start, 2)}
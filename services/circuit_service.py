@@ -0,0 +1,166 @@
+"""
+services/circuit_service.py
+───────────────────────────
+Circuit breakers around Supabase, so an outage costs one fast failure per
+call instead of a full SUPABASE_TIMEOUTS wait on every request.
+
+One breaker per operation class — "read", "write" (bulk and rollup calls
+included) and "auth" (routes/auth.py) — since a sick auth service or a
+read-only replica can fail on its own:
+
+  closed     calls go through; SUPABASE_BREAKER_FAILURES consecutive
+             outage errors (timeouts, connection errors, 5xx) open it
+  open       calls raise CircuitOpenError at once, for the cooldown
+  half_open  the cooldown is over: exactly one call goes through as a
+             probe, the rest still fail fast. Success closes the breaker;
+             failure reopens it with the cooldown doubled (up to
+             SUPABASE_BREAKER_MAX_COOLDOWN_S)
+
+Other errors (a 4xx, a constraint violation) mean Supabase answered, so
+they count as successes. What callers do while a breaker is open lives
+with them: DatabaseService serves last good reads and buffers writes in
+its outbox, routes/auth.py keeps sessions instead of signing users out.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from config import SUPABASE_BREAKER_FAILURES, SUPABASE_BREAKER_COOLDOWN_S, SUPABASE_BREAKER_MAX_COOLDOWN_S
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Supabase while an operation class's breaker is open."""
+
+    def __init__(self, op: str, retry_in: float):
+        super().__init__(f"supabase {op} circuit open (retry in {retry_in:.1f}s)")
+        self.op = op
+        self.retry_in = retry_in
+
+
+class _Breaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    def __init__(self, op: str, failures: int, cooldown_s: float, max_cooldown_s: float):
+        self.op = op
+        self.threshold = failures
+        self.base_cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "failures": 0, "rejected": 0, "trips": 0}
+
+    def before(self) -> bool:
+        """Let a call through or raise CircuitOpenError; True when the call is the half-open probe."""
+        with self._lock:
+            if self.state == "open":
+                retry_in = self.opened_at + self.cooldown_s - time.monotonic()
+                if retry_in > 0:
+                    self.counters["rejected"] += 1
+                    raise CircuitOpenError(self.op, retry_in)
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._probing:
+                    self.counters["rejected"] += 1
+                    raise CircuitOpenError(self.op, 0.0)
+                self._probing = True
+                self.counters["calls"] += 1
+                print(f"[CIRCUIT] {self.op}: half-open, probing")
+                return True
+            self.counters["calls"] += 1
+            return False
+
+    def after(self, outage: bool, probe: bool) -> None:
+        """
+        Only the probe moves an open / half-open breaker; a call admitted
+        while it was still closed and finishing late just gets counted.
+        """
+        with self._lock:
+            if outage:
+                self.counters["failures"] += 1
+            if probe:
+                self._probing = False
+            elif self.state != "closed":
+                return
+            if not outage:
+                if probe:
+                    print(f"[CIRCUIT] {self.op}: probe succeeded, closed")
+                self.state, self.failures, self.cooldown_s = "closed", 0, self.base_cooldown_s
+                return
+            self.failures += 1
+            if probe:
+                self.cooldown_s = min(self.cooldown_s * 2, self.max_cooldown_s)
+            elif self.failures < self.threshold:
+                return
+            self.state, self.opened_at = "open", time.monotonic()
+            self.counters["trips"] += 1
+            print(f"[CIRCUIT] {self.op}: open for {self.cooldown_s:.0f}s after {self.failures} failure(s)")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = self.opened_at + self.cooldown_s - time.monotonic() if self.state == "open" else 0.0
+            return {"state": self.state, "consecutive_failures": self.failures,
+                    "cooldown_s": self.cooldown_s, "retry_in_s": round(max(retry_in, 0.0), 2), **self.counters}
+
+
+class CircuitService:
+
+    _breakers = {op: _Breaker(op, SUPABASE_BREAKER_FAILURES, SUPABASE_BREAKER_COOLDOWN_S,
+                              SUPABASE_BREAKER_MAX_COOLDOWN_S)
+                 for op in ("read", "write", "auth")}
+    _local = threading.local()
+
+    @staticmethod
+    @contextmanager
+    def guard(op: str):
+        """
+        Run the block as one call of operation class `op`. Raises
+        CircuitOpenError without running it while the breaker is open.
+        Nested guards on the same thread count once, as the outermost call.
+        """
+        if getattr(CircuitService._local, "depth", 0):
+            CircuitService._local.depth += 1
+            try:
+                yield
+            finally:
+                CircuitService._local.depth -= 1
+            return
+        breaker = CircuitService._breakers[op]
+        probe = breaker.before()
+        CircuitService._local.depth = 1
+        try:
+            yield
+        except BaseException as e:
+            breaker.after(CircuitService.is_outage(e), probe)
+            raise
+        else:
+            breaker.after(False, probe)
+        finally:
+            CircuitService._local.depth = 0
+
+    @staticmethod
+    def is_outage(error: BaseException) -> bool:
+        """True for errors that mean Supabase is unreachable or unwell, not that it said no."""
+        import httpx
+
+        if isinstance(error, (CircuitOpenError, httpx.TransportError, TimeoutError, ConnectionError)):
+            return True
+        code = getattr(error, "code", None)   # postgrest APIError: HTTP status or PostgREST / Postgres code
+        if isinstance(code, int):
+            return code >= 500
+        if isinstance(code, str) and (code.startswith("PGRST00") or code == "57014"):
+            return True   # PostgREST lost its database connection / statement timeout
+        status = getattr(error, "status", None)   # supabase_auth errors; AuthRetryableError uses 0 for network errors
+        return isinstance(status, int) and (status == 0 or status >= 500)
+
+    @staticmethod
+    def is_open(op: str) -> bool:
+        return CircuitService._breakers[op].state != "closed"
+
+    @staticmethod
+    def stats() -> dict[str, dict]:
+        return {op: b.snapshot() for op, b in CircuitService._breakers.items()}
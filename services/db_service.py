@@ -3,58 +3,424 @@ services/db_service.py
 ──────────────────────
 Every Supabase read/write lives here.
 Routes call DatabaseService methods — they never touch supabase directly.
+
+Writes nobody waits on (roast history) go through a background writer that
+batches rows per table into one insert every DB_WRITE_FLUSH_SECONDS.
+
+Every call goes through config.get_postgrest() — one shared keep-alive pool
+— under the timeout for its kind and the circuit breaker for its operation
+class (@_guarded → SUPABASE_TIMEOUTS, services/circuit_service.py). Bulk
+writes use insert_many / upsert_many: one request per SUPABASE_BULK_CHUNK
+rows, no rows echoed back.
+
+Outages: reads marked keep_last serve their last good result while the
+read breaker is open or the call fails. Writes made through write() — tool
+uses, roast history, sign-in upserts — go to a local SQLite outbox
+(DB_OUTBOX_PATH) when Supabase is unreachable and are replayed in order by
+a daemon thread once it answers again. record_tool_use takes a use id, so
+a replayed use whose first attempt did land is not counted twice.
 """
 
-from datetime import datetime, timezone, timedelta
+import atexit
+import copy
+import functools
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timezone, timedelta
 from flask import session
-from config import supabase, TOOL_XP
+from config import (
+    get_postgrest, supabase_timeout, SUPABASE_TIMEOUTS, SUPABASE_BULK_CHUNK, SUPABASE_STALE_ENTRIES,
+    TOOL_XP, DB_WRITE_FLUSH_SECONDS, DB_WRITE_BATCH, DB_OUTBOX_PATH, DB_OUTBOX_POLL_S, DB_OUTBOX_MAX_ROWS,
+)
+from services.circuit_service import CircuitService
+
+
+class _BatchWriter:
+    """Queues rows and inserts them in per-table batches from one daemon thread."""
+
+    def __init__(self, flush_seconds: float, max_batch: int):
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def put(self, table: str, row: dict) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="anvil-db-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+        self._queue.put((table, row))
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self._queue.get(timeout=self.flush_seconds))
+            except queue.Empty:
+                pass
+            self._write(batch)
+
+    def flush(self) -> None:
+        """Write whatever is queued right now (used at exit)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    @staticmethod
+    def _write(batch: list[tuple[str, dict]]) -> None:
+        by_table: dict[str, list[dict]] = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        for table, rows in by_table.items():
+            try:
+                if DatabaseService.write("insert", table, rows) is not None:
+                    print(f"[DB] batch insert: {len(rows)} row(s) into {table}")
+            except Exception as e:
+                print(f"[DB] batch insert into {table} failed ({len(rows)} rows dropped): {type(e).__name__}: {e}")
+
+
+class _Outbox:
+    """
+    Writes Supabase couldn't take, in a SQLite file so they survive a
+    restart. Rows are claimed before they're replayed, so two processes
+    sharing the file never replay the same write; a claim left by a crashed
+    process expires after CLAIM_TTL_S.
+    """
+
+    CLAIM_TTL_S = 300
+
+    def __init__(self, path: str, poll_s: float, max_rows: int):
+        self.path = path
+        self.poll_s = poll_s
+        self.max_rows = max_rows
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.counters = {"buffered": 0, "replayed": 0, "dropped": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            conn.execute("""create table if not exists outbox (
+                id integer primary key autoincrement, op text not null, target text not null,
+                payload text not null, created_at real not null, claimed_at real)""")
+        return conn
+
+    def put(self, op: str, target: str, payload) -> bool:
+        """Buffer one write. False (and the write is lost) if the outbox is full."""
+        db = self._db()
+        if db.execute("select count(*) from outbox").fetchone()[0] >= self.max_rows:
+            self._bump("dropped")
+            return False
+        db.execute("insert into outbox (op, target, payload, created_at) values (?, ?, ?, ?)",
+                   (op, target, json.dumps(payload), time.time()))
+        self._bump("buffered")
+        self.start()
+        return True
+
+    def pending(self) -> int:
+        return self._db().execute("select count(*) from outbox").fetchone()[0]
+
+    def start(self) -> None:
+        """Start the replay thread (at boot, for writes a previous process left behind)."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="anvil-db-outbox", daemon=True)
+                    self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.replay()
+            except Exception as e:
+                print(f"[DB] outbox replay error: {type(e).__name__}: {e}")
+            time.sleep(self.poll_s)
+
+    def replay(self, batch: int = 50) -> int:
+        """Replay buffered writes oldest first until the outbox is empty or Supabase fails again."""
+        done = 0
+        while True:
+            rows = self._claim(batch)
+            if not rows:
+                return done
+            for i, (row_id, op, target, payload) in enumerate(rows):
+                try:
+                    DatabaseService.apply(op, target, json.loads(payload))
+                except Exception as e:
+                    if CircuitService.is_outage(e):
+                        self._release([r[0] for r in rows[i:]])
+                        if done:
+                            print(f"[DB] outbox: replayed {done}, stopped ({type(e).__name__}), {self.pending()} left")
+                        return done
+                    print(f"[DB] outbox: {op} {target} rejected, dropping it: {type(e).__name__}: {e}")
+                    self._bump("dropped")
+                else:
+                    done += 1
+                    self._bump("replayed")
+                self._db().execute("delete from outbox where id = ?", (row_id,))
+            print(f"[DB] outbox: replayed {done} buffered write(s)")
+
+    def _claim(self, batch: int) -> list[tuple]:
+        now = time.time()
+        rows = self._db().execute(
+            """update outbox set claimed_at = ? where id in (
+                   select id from outbox where claimed_at is null or claimed_at < ? order by id limit ?)
+               returning id, op, target, payload""",
+            (now, now - self.CLAIM_TTL_S, batch)).fetchall()
+        return sorted(rows)
+
+    def _release(self, ids: list[int]) -> None:
+        self._db().executemany("update outbox set claimed_at = null where id = ?", [(i,) for i in ids])
+
+    def _bump(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+
+class _LastGood:
+    """
+    Bounded LRU of the last good result per (method, arguments). Holds and
+    hands out deep copies, so a caller annotating its result (a rank, a
+    display name) can't rewrite what the next caller or an outage gets.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._rows: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.served = 0
+
+    def put(self, key: tuple, value) -> None:
+        with self._lock:
+            self._rows[key] = copy.deepcopy(value)
+            self._rows.move_to_end(key)
+            if len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+
+    def get(self, key: tuple, default):
+        with self._lock:
+            if key not in self._rows:
+                return default
+            self.served += 1
+            return copy.deepcopy(self._rows[key])
+
+
+_writer = _BatchWriter(DB_WRITE_FLUSH_SECONDS, DB_WRITE_BATCH)
+_outbox = _Outbox(DB_OUTBOX_PATH, DB_OUTBOX_POLL_S, DB_OUTBOX_MAX_ROWS)
+_last_good = _LastGood(SUPABASE_STALE_ENTRIES)
+_MISSING = object()
+_OP_CLASS = {"read": "read", "write": "write", "bulk": "write", "rollup": "write"}
+
+
+def _guarded(kind: str, op: str | None = None, keep_last: bool = False, fallback=None):
+    """
+    Bound the decorated method's Supabase requests by SUPABASE_TIMEOUTS[kind]
+    and run it through the breaker for its operation class (op, or the one
+    its kind implies). With keep_last, a failure — the breaker being open
+    included — serves the last good result for the same arguments; failing
+    that, fallback() if given, else the error is raised.
+    """
+    op = op or _OP_CLASS[kind]
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            try:
+                with CircuitService.guard(op), supabase_timeout(SUPABASE_TIMEOUTS[kind]):
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                if not keep_last and fallback is None:
+                    raise
+                key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+                stale = _last_good.get(key, _MISSING) if keep_last else _MISSING
+                print(f"[DB] {fn.__name__} failed: {type(e).__name__}: {e}"
+                      + (" — serving last good result" if stale is not _MISSING else ""))
+                if stale is not _MISSING:
+                    return stale
+                if fallback is None:
+                    raise
+                return fallback()
+            if keep_last:
+                _last_good.put((fn.__name__, args, tuple(sorted(kwargs.items()))), result)
+            return result
+        return inner
+    return wrap
 
 
 class DatabaseService:
 
+    # ── Bulk writes ────────────────────────────────────────────────────────
+
+    @staticmethod
+    @_guarded("bulk")
+    def insert_many(table: str, rows: list[dict], chunk_size: int = SUPABASE_BULK_CHUNK) -> int:
+        """
+        Insert rows with one request per chunk_size rows. Returns the number
+        written; raises on the first failed chunk (earlier chunks stay written).
+        """
+        from postgrest.types import ReturnMethod
+        for start in range(0, len(rows), chunk_size):
+            (get_postgrest().table(table)
+             .insert(rows[start:start + chunk_size], returning=ReturnMethod.minimal)
+             .execute())
+        return len(rows)
+
+    @staticmethod
+    @_guarded("bulk")
+    def upsert_many(table: str, rows: list[dict], on_conflict: str = "",
+                    ignore_duplicates: bool = False, chunk_size: int = SUPABASE_BULK_CHUNK) -> int:
+        """insert_many, but rows clashing on `on_conflict` (default: primary key) are merged or skipped."""
+        from postgrest.types import ReturnMethod
+        for start in range(0, len(rows), chunk_size):
+            (get_postgrest().table(table)
+             .upsert(rows[start:start + chunk_size], on_conflict=on_conflict,
+                     ignore_duplicates=ignore_duplicates, returning=ReturnMethod.minimal)
+             .execute())
+        return len(rows)
+
+    @staticmethod
+    @_guarded("write")
+    def rpc(fn: str, params: dict) -> list[dict]:
+        """Call a Postgres function; returns its rows."""
+        return get_postgrest().rpc(fn, params).execute().data or []
+
+    # ── Buffered writes (outbox) ───────────────────────────────────────────
+
+    @staticmethod
+    def write(op: str, target: str, payload):
+        """
+        Run a write that must not be lost to a Supabase outage:
+          ("rpc", fn, params)  ("insert", table, rows)
+          ("upsert", table, {"rows": [...], "on_conflict": "", "ignore_duplicates": False})
+        Returns apply()'s result, or None when Supabase is unreachable (or its
+        write breaker is open) and the write went to the outbox for replay.
+        Other errors are raised.
+        """
+        try:
+            return DatabaseService.apply(op, target, payload)
+        except Exception as e:
+            if not CircuitService.is_outage(e):
+                raise
+            if _outbox.put(op, target, payload):
+                print(f"[DB] {op} {target} buffered in the outbox ({type(e).__name__})")
+            else:
+                print(f"[DB] outbox full — {op} {target} dropped")
+            return None
+
+    @staticmethod
+    def apply(op: str, target: str, payload):
+        """Perform one write() now, no buffering. The outbox replays through here too."""
+        if op == "insert":
+            return DatabaseService.insert_many(target, payload)
+        if op == "upsert":
+            return DatabaseService.upsert_many(target, payload["rows"], payload.get("on_conflict", ""),
+                                               payload.get("ignore_duplicates", False))
+        if op != "rpc":
+            raise ValueError(f"unknown outbox op {op!r}")
+        rows = DatabaseService.rpc(target, payload)
+        if target == "record_tool_use" and rows:
+            from services.leaderboard_service import LeaderboardService   # imports this module
+            LeaderboardService.xp_changed(payload["p_user_id"], rows[0].get("xp", 0))
+        return rows
+
+    @staticmethod
+    def start_outbox() -> None:
+        """Replay anything a previous process buffered (app start)."""
+        try:
+            if _outbox.pending():
+                print(f"[DB] outbox: {_outbox.pending()} buffered write(s) from an earlier run")
+                _outbox.start()
+        except sqlite3.Error as e:
+            print(f"[DB] outbox unavailable ({DB_OUTBOX_PATH}): {e}")
+
+    @staticmethod
+    def outage_stats() -> dict:
+        """Breakers, outbox and last-good cache for /api/admin/db-stats."""
+        with _outbox._lock:
+            outbox = dict(_outbox.counters)
+        return {
+            "breakers":     CircuitService.stats(),
+            "outbox":       {"pending": _outbox.pending(), **outbox},
+            "stale_served": _last_good.served,
+        }
+
     # ── Tool use logging ───────────────────────────────────────────────────
 
     @staticmethod
-    def log_tool_use(tool_name: str) -> None:
-        """Insert a tool_uses row if the user is logged in. Silent on failure."""
+    def log_tool_use(tool_name: str, user_id: str | None = None) -> dict | None:
+        """
+        Log a tool use and atomically award XP if the user is logged in.
+        Returns the user's new {xp, streak, tools_used} totals, or None for
+        guests / on failure. The increment happens inside the record_tool_use
+        Postgres function (sql/record_tool_use.sql), so concurrent calls from
+        several tabs can never overwrite each other. The new total is also
+        handed to LeaderboardService so live leaderboards pick it up.
+        While Supabase is down the use is buffered (see write()) and its XP
+        lands on replay, dated when it happened; None is returned meanwhile.
+        Pass user_id explicitly when calling from outside a request (background jobs).
+        """
         try:
-            user = session.get("user")
-            if not user:
-                return
-            supabase.table("tool_uses").insert({
-                "user_id":   user["id"],
-                "tool_name": tool_name,
-                "xp_earned": TOOL_XP.get(tool_name, 0),
-                "used_at":   datetime.now(timezone.utc).isoformat()
-            }).execute()
-            print(f"[DB] tool_use logged: {tool_name} for {user['id']}")
+            if user_id is None:
+                user = session.get("user")
+                if not user:
+                    return None
+                user_id = user["id"]
+            rows = DatabaseService.write("rpc", "record_tool_use", {
+                "p_user_id":   user_id,
+                "p_tool_name": tool_name,
+                "p_xp":        TOOL_XP.get(tool_name, 0),
+                "p_use_id":    str(uuid.uuid4()),
+                "p_used_at":   datetime.now(timezone.utc).isoformat(),
+            })
+            if not rows:
+                return None
+            print(f"[DB] tool_use logged: {tool_name} for {user_id}")
+            row = rows[0]
+            return {
+                "xp":         row.get("xp", 0),
+                "streak":     row.get("streak", 0),
+                "tools_used": row.get("tools_used", 0),
+            }
         except Exception as e:
             print(f"[DB] log_tool_use failed for {tool_name}: {type(e).__name__}: {e}")
+            return None
 
     # ── User stats ─────────────────────────────────────────────────────────
 
     @staticmethod
+    @_guarded("read", keep_last=True)
     def get_user_stats(user_id: str) -> dict:
         """Return xp/streak/tools_used for a user, or zeroed defaults."""
-        result = supabase.table("user_stats").select("*").eq("user_id", user_id).execute()
+        result = get_postgrest().table("user_stats").select("*").eq("user_id", user_id).execute()
         if result.data:
             return result.data[0]
         return {"xp": 0, "streak": 0, "tools_used": 0}
 
     @staticmethod
-    def save_user_stats(user_id: str, xp: int, streak: int, tools_used: int) -> None:
-        supabase.table("user_stats").upsert({
-            "user_id":    user_id,
-            "xp":         xp,
-            "streak":     streak,
-            "tools_used": tools_used,
-        }).execute()
-
-    @staticmethod
+    @_guarded("read", keep_last=True)
     def get_user_rank(user_id: str, current_xp: int) -> int:
         """Return 1-based rank (number of users with more XP + 1)."""
         result = (
-            supabase.table("user_stats")
+            get_postgrest().table("user_stats")
             .select("user_id", count="exact")
             .gt("xp", current_xp)
             .execute()
@@ -65,93 +431,253 @@ class DatabaseService:
 
     @staticmethod
     def upsert_user(user_id: str, email: str, display_name: str, avatar_url: str) -> None:
-        supabase.table("users").upsert({
+        DatabaseService.write("upsert", "users", {"rows": [{
             "id":           user_id,
             "email":        email,
             "display_name": display_name,
             "avatar_url":   avatar_url,
-        }).execute()
+        }]})
 
     @staticmethod
     def ensure_user_stats_row(user_id: str) -> None:
         """Create a zeroed user_stats row if one doesn't exist yet."""
-        existing = supabase.table("user_stats").select("*").eq("user_id", user_id).execute()
-        if not existing.data:
-            supabase.table("user_stats").insert({
-                "user_id":    user_id,
-                "xp":         0,
-                "streak":     0,
-                "tools_used": 0,
-            }).execute()
+        DatabaseService.write("upsert", "user_stats", {"rows": [{
+            "user_id":    user_id,
+            "xp":         0,
+            "streak":     0,
+            "tools_used": 0,
+        }], "ignore_duplicates": True})
 
     # ── Leaderboard ────────────────────────────────────────────────────────
 
     @staticmethod
+    @_guarded("read", keep_last=True, fallback=list)
     def get_global_leaderboard(limit: int = 50) -> list[dict]:
-        try:
-            result = (
-                supabase.table("user_stats")
-                .select("xp, user_id, users(display_name, avatar_url)")
-                .order("xp", desc=True)
-                .limit(limit)
-                .execute()
-            )
-            rows = []
-            for row in result.data:
-                info = row.get("users") or {}
-                rows.append({
-                    "xp":           row.get("xp", 0),
-                    "user_id":      row.get("user_id"),
-                    "display_name": info.get("display_name") or "Anonymous",
-                    "avatar_url":   info.get("avatar_url") or "",
-                })
-            return rows
-        except Exception as e:
-            print(f"[DB] global leaderboard error: {e}")
-            return []
+        result = (
+            get_postgrest().table("user_stats")
+            .select("xp, user_id, users(display_name, avatar_url)")
+            .order("xp", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        rows = []
+        for row in result.data:
+            info = row.get("users") or {}
+            rows.append({
+                "xp":           row.get("xp", 0),
+                "user_id":      row.get("user_id"),
+                "display_name": info.get("display_name") or "Anonymous",
+                "avatar_url":   info.get("avatar_url") or "",
+            })
+        return rows
 
     @staticmethod
+    @_guarded("bulk", op="read", keep_last=True, fallback=list)
     def get_weekly_leaderboard(limit: int = 50) -> list[dict]:
-        try:
-            now = datetime.now(timezone.utc)
-            week_start = (now - timedelta(days=now.weekday())).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-
-            result = (
-                supabase.table("tool_uses")
-                .select("user_id, xp_earned")
-                .gte("used_at", week_start.isoformat())
-                .execute()
-            )
-
-            totals: dict[str, int] = {}
-            for row in result.data:
-                uid = row["user_id"]
-                totals[uid] = totals.get(uid, 0) + row.get("xp_earned", 0)
-
-            if not totals:
-                return []
-
-            user_ids = list(totals.keys())
-            users_result = (
-                supabase.table("users")
-                .select("id, display_name, avatar_url")
-                .in_("id", user_ids)
-                .execute()
-            )
-            user_map = {u["id"]: u for u in (users_result.data or [])}
-
-            rows = []
-            for uid, xp in sorted(totals.items(), key=lambda x: x[1], reverse=True)[:limit]:
-                u = user_map.get(uid, {})
-                rows.append({
-                    "user_id":      uid,
-                    "xp":           xp,
-                    "display_name": u.get("display_name") or "Anonymous",
-                    "avatar_url":   u.get("avatar_url") or "",
-                })
-            return rows
-        except Exception as e:
-            print(f"[DB] weekly leaderboard error: {e}")
+        now = datetime.now(timezone.utc)
+        week_start = (now - timedelta(days=now.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+
+        result = (
+            get_postgrest().table("tool_uses")
+            .select("user_id, xp_earned")
+            .gte("used_at", week_start.isoformat())
+            .execute()
+        )
+
+        totals: dict[str, int] = {}
+        for row in result.data:
+            uid = row["user_id"]
+            totals[uid] = totals.get(uid, 0) + row.get("xp_earned", 0)
+
+        if not totals:
             return []
+
+        user_ids = list(totals.keys())
+        users_result = (
+            get_postgrest().table("users")
+            .select("id, display_name, avatar_url")
+            .in_("id", user_ids)
+            .execute()
+        )
+        user_map = {u["id"]: u for u in (users_result.data or [])}
+
+        rows = []
+        for uid, xp in sorted(totals.items(), key=lambda x: x[1], reverse=True)[:limit]:
+            u = user_map.get(uid, {})
+            rows.append({
+                "user_id":      uid,
+                "xp":           xp,
+                "display_name": u.get("display_name") or "Anonymous",
+                "avatar_url":   u.get("avatar_url") or "",
+            })
+        return rows
+
+    # ── Usage rollups (sql/usage_rollups.sql) ──────────────────────────────
+
+    @staticmethod
+    @_guarded("rollup")
+    def refresh_usage_rollups(batch_size: int = 50000) -> int:
+        """
+        Fold every tool_uses row past the high-water mark into usage_rollups.
+        Runs in batches so each transaction stays short. Returns rows processed.
+        """
+        total = 0
+        while True:
+            result = get_postgrest().rpc("refresh_usage_rollups", {"p_batch": batch_size}).execute()
+            processed = (result.data or [{}])[0].get("processed", 0)
+            total += processed
+            if processed < batch_size:
+                return total
+
+    @staticmethod
+    @_guarded("rollup")
+    def rebuild_usage_rollups(batch_size: int = 50000) -> int:
+        """Wipe the rollups and rebuild them from the full tool_uses history."""
+        get_postgrest().rpc("reset_usage_rollups", {}).execute()
+        return DatabaseService.refresh_usage_rollups(batch_size)
+
+    @staticmethod
+    @_guarded("read")
+    def get_usage_rollups(period: str, since: str, dim: str) -> list[dict]:
+        """Rollup rows for one period/dimension with bucket >= since (YYYY-MM-DD)."""
+        result = (
+            get_postgrest().table("usage_rollups")
+            .select("bucket, key, uses, xp")
+            .eq("period", period)
+            .eq("dim", dim)
+            .gte("bucket", since)
+            .order("bucket")
+            .execute()
+        )
+        return result.data or []
+
+    # ── Weekly leaderboard snapshots (sql/weekly_leaderboard_snapshots.sql) ───
+
+    @staticmethod
+    @_guarded("rollup")
+    def snapshot_weekly_leaderboard(week: date) -> int:
+        """(Re)freeze one week from usage_rollups. Idempotent. Returns the number of users ranked."""
+        result = get_postgrest().rpc("snapshot_weekly_leaderboard", {"p_week": week.isoformat()}).execute()
+        return (result.data or [{}])[0].get("users", 0)
+
+    @staticmethod
+    @_guarded("read", keep_last=True)
+    def get_snapshot_weeks(limit: int = 52) -> list[dict]:
+        """Snapshotted weeks, newest first: [{week, users, taken_at}]."""
+        result = (
+            get_postgrest().table("weekly_snapshot_runs")
+            .select("week, users, taken_at")
+            .order("week", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return result.data or []
+
+    @staticmethod
+    @_guarded("read", keep_last=True)
+    def get_weekly_snapshot(week: date, limit: int) -> list[dict]:
+        """The top `limit` rows of a snapshotted week, by position."""
+        result = (
+            get_postgrest().table("weekly_leaderboard_snapshots")
+            .select("position, user_id, xp, uses, display_name, avatar_url")
+            .eq("week", week.isoformat())
+            .lte("position", limit)
+            .order("position")
+            .execute()
+        )
+        return result.data or []
+
+    @staticmethod
+    @_guarded("read", keep_last=True)
+    def get_weekly_snapshot_row(week: date, user_id: str) -> dict | None:
+        """One user's frozen totals for a week, or None if they didn't play."""
+        result = (
+            get_postgrest().table("weekly_leaderboard_snapshots")
+            .select("position, user_id, xp, uses, display_name, avatar_url")
+            .eq("week", week.isoformat())
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    # ── Roast history (sql/roast_history.sql) ──────────────────────────────
+
+    @staticmethod
+    def record_history(user_id: str, tool: str, mode: str, comic: str, input_hash: str, output: str,
+                       near: tuple[str, int] | None = None) -> None:
+        """
+        Queue a history row on the batched background writer. Never blocks.
+        near = (near_scope, simhash) when the input has a near-duplicate fingerprint.
+        """
+        near_scope, simhash = near or (None, None)
+        _writer.put("roast_history", {
+            "user_id":    user_id,
+            "tool":       tool,
+            "mode":       mode or "",
+            "comic":      comic or "",
+            "input_hash": input_hash,
+            "output":     output,
+            # bigint is signed — store the 64-bit fingerprint two's-complement
+            "simhash":    simhash - (1 << 64) if simhash is not None and simhash >= 1 << 63 else simhash,
+            "near_scope": near_scope,
+        })
+
+    @staticmethod
+    @_guarded("read", fallback=lambda: None)
+    def find_history(user_id: str, tool: str, input_hash: str) -> dict | None:
+        """Most recent history row for an identical input, or None. Silent on failure."""
+        result = (
+            get_postgrest().table("roast_history")
+            .select("id, output, created_at")
+            .eq("user_id", user_id)
+            .eq("tool", tool)
+            .eq("input_hash", input_hash)
+            .order("id", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    @staticmethod
+    @_guarded("read")
+    def get_fingerprints(user_id: str, tool: str, limit: int) -> list[dict]:
+        """A user's most recent fingerprinted history rows for one tool. Raises on failure."""
+        result = (
+            get_postgrest().table("roast_history")
+            .select("input_hash, simhash, near_scope")
+            .eq("user_id", user_id)
+            .eq("tool", tool)
+            .order("id", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return [r for r in result.data or [] if r.get("simhash") is not None]
+
+    @staticmethod
+    @_guarded("read")
+    def get_history(user_id: str, limit: int, before: int | None = None, tool: str | None = None) -> list[dict]:
+        """Keyset page of a user's history, newest first: rows with id < before."""
+        query = (
+            get_postgrest().table("roast_history")
+            .select("id, tool, mode, comic, output, created_at")
+            .eq("user_id", user_id)
+        )
+        if tool:
+            query = query.eq("tool", tool)
+        if before is not None:
+            query = query.lt("id", before)
+        result = query.order("id", desc=True).limit(limit).execute()
+        return result.data or []
+
+    @staticmethod
+    @_guarded("read")
+    def get_recent_outputs(limit: int, tool: str | None = None) -> list[dict]:
+        """The newest history rows across all users — tool, mode and output only (cli.py lengths)."""
+        query = get_postgrest().table("roast_history").select("tool, mode, output")
+        if tool:
+            query = query.eq("tool", tool)
+        result = query.order("id", desc=True).limit(limit).execute()
+        return result.data or []
@@ -0,0 +1,259 @@
+"""
+services/format_service.py
+──────────────────────────
+Validates the structured block formats the comics.py prompts demand and
+turns them into typed objects the routes can return as JSON:
+
+  [SECTION][PRIORITY][ISSUE][WAS][NOW]   → PdfIssue       (linkedin_pdf analyse)
+  [QUESTION: id | label | placeholder]   → ScanQuestion   (linkedin_pdf scan)
+  [QUIP: section=X | quip=Y]             → Quip           (linkedin_pdf quips)
+
+Parsers are incremental — feed() chunks as they stream in, completed items
+come back as soon as their block closes — and repair the usual breakages
+deterministically (blocks run together on one line, markdown bold around
+tags, lower-case tags, stray priorities, missing ids). Blocks that can't be
+repaired are reported as `broken`; the *_with_repair helpers re-ask the
+model for just those blocks instead of rerunning the whole analysis.
+"""
+
+import re
+from dataclasses import dataclass, asdict
+
+from comics import get_linkedin_pdf_repair_prompt, get_linkedin_pdf_scan_repair_prompt
+from services.ai_service import AIService
+
+PDF_TAGS = ("SECTION", "PRIORITY", "ISSUE", "WAS", "NOW")
+MAX_REPAIR_BLOCKS = 4   # cap on blocks sent back in one re-ask
+PRIORITIES = {
+    "high": "High", "critical": "High", "urgent": "High",
+    "medium": "Medium", "med": "Medium", "moderate": "Medium",
+    "low": "Low", "minor": "Low", "polish": "Low",
+}
+
+# Any tag opener, tolerant of case, markdown bold and a missing colon
+_PDF_TAG_RE  = re.compile(r"\**\[\s*(SECTION|PRIORITY|ISSUE|WAS|NOW)\s*:?\s*", re.IGNORECASE)
+_QUESTION_RE = re.compile(r"\[\s*QUESTION\s*:?\s*([^\]]*)\]", re.IGNORECASE)
+_QUIP_RE     = re.compile(r"\[\s*QUIP\s*:?\s*section\s*=\s*([^|\]]+)\|\s*quip\s*=\s*([^\]]+)\]", re.IGNORECASE)
+
+
+@dataclass
+class PdfIssue:
+    section:  str
+    priority: str
+    issue:    str
+    was:      str
+    now:      str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class ScanQuestion:
+    id:          str
+    label:       str
+    placeholder: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class Quip:
+    section: str
+    quip:    str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _clean(value: str) -> str:
+    """Cut a tag body at its closing bracket (dropping any chatter after it) and trim."""
+    end = value.rfind("]")
+    if end != -1:
+        value = value[:end]
+    return value.strip().strip("*").strip()
+
+
+# ── PDF analysis ───────────────────────────────────────────────────────────
+
+class PdfAnalysisParser:
+    """
+    Incremental parser for [SECTION][PRIORITY][ISSUE][WAS][NOW] blocks.
+
+        parser = PdfAnalysisParser()
+        for chunk in stream: done_issues = parser.feed(chunk)
+        parser.close()
+        parser.issues / parser.broken
+    """
+
+    def __init__(self):
+        self._buf    = ""
+        self._fields: dict[str, str] = {}
+        self._last_section = ""
+        self.issues: list[PdfIssue] = []
+        self.broken: list[dict]     = []
+
+    def feed(self, chunk: str) -> list[PdfIssue]:
+        """Add text; return any issues completed by it."""
+        self._buf += chunk
+        before = len(self.issues)
+        tags = list(_PDF_TAG_RE.finditer(self._buf))
+        # The last tag may still be streaming — only consume up to its start
+        for tag, nxt in zip(tags, tags[1:]):
+            self._take(tag.group(1).upper(), self._buf[tag.end():nxt.start()])
+        if tags:
+            self._buf = self._buf[tags[-1].start():]
+        return self.issues[before:]
+
+    def close(self) -> list[PdfIssue]:
+        """Flush the final tag and block; return issues completed by it."""
+        before = len(self.issues)
+        tag = _PDF_TAG_RE.search(self._buf)
+        if tag:
+            self._take(tag.group(1).upper(), self._buf[tag.end():])
+        self._buf = ""
+        self._finish_block()
+        return self.issues[before:]
+
+    def _take(self, tag: str, body: str) -> None:
+        # A SECTION, or any tag we've already seen, starts a new block
+        if tag == "SECTION" or tag in self._fields:
+            self._finish_block()
+        self._fields[tag] = _clean(body)
+
+    def _finish_block(self) -> None:
+        f, self._fields = self._fields, {}
+        if not f:
+            return
+        section = f.get("SECTION") or self._last_section
+        if section:
+            self._last_section = section
+        words = (f.get("PRIORITY") or "").split()
+        priority = PRIORITIES.get(words[0].strip("*:,.").lower() if words else "", "Medium")
+        if section and f.get("ISSUE") and f.get("WAS") and f.get("NOW"):
+            self.issues.append(PdfIssue(section, priority, f["ISSUE"], f["WAS"], f["NOW"]))
+        else:
+            self.broken.append({"section": section, "priority": priority,
+                                **{t.lower(): f.get(t, "") for t in ("ISSUE", "WAS", "NOW")}})
+
+
+def format_pdf_block(block: dict) -> str:
+    """Render a (possibly partial) issue back into the tag format for a re-ask."""
+    return "\n".join(
+        f"[{tag}: {block.get(tag.lower(), '')}]" for tag in PDF_TAGS
+    )
+
+
+# ── Scan questions ─────────────────────────────────────────────────────────
+
+class ScanQuestionParser:
+    """Incremental parser for [QUESTION: id | label | placeholder] blocks (max 5)."""
+
+    MAX_QUESTIONS = 5
+
+    def __init__(self):
+        self._buf = ""
+        self._seen: set[str] = set()
+        self.questions: list[ScanQuestion] = []
+
+    @property
+    def complete(self) -> bool:
+        return len(self.questions) >= self.MAX_QUESTIONS
+
+    def feed(self, chunk: str) -> list[ScanQuestion]:
+        self._buf += chunk
+        before = len(self.questions)
+        consumed = 0
+        for m in _QUESTION_RE.finditer(self._buf):
+            consumed = m.end()
+            self._add(m.group(1))
+        self._buf = self._buf[consumed:]
+        return self.questions[before:]
+
+    def close(self) -> list[ScanQuestion]:
+        # Repair an unterminated final block
+        before = len(self.questions)
+        tail = re.search(r"\[\s*QUESTION\s*:?\s*(.+)$", self._buf, re.IGNORECASE | re.DOTALL)
+        if tail:
+            self._add(tail.group(1))
+        self._buf = ""
+        return self.questions[before:]
+
+    def _add(self, body: str) -> None:
+        if self.complete:
+            return
+        parts = [p.strip() for p in body.split("|")]
+        if parts and re.fullmatch(r"q?\d+", parts[0], re.IGNORECASE):
+            parts = parts[1:]                       # drop the model's id — we renumber
+        parts = [p for p in parts if p]
+        if not parts:
+            return
+        label = parts[0]
+        placeholder = " | ".join(parts[1:])
+        if label.lower() in self._seen:
+            return
+        self._seen.add(label.lower())
+        self.questions.append(ScanQuestion(f"q{len(self.questions) + 1}", label, placeholder))
+
+
+# ── Quips ──────────────────────────────────────────────────────────────────
+
+def parse_quips(raw: str, limit: int = 6) -> list[Quip]:
+    quips = [Quip(m.group(1).strip(), _clean(m.group(2))) for m in _QUIP_RE.finditer(raw)]
+    return quips[:limit]
+
+
+def parse_pdf_analysis(raw: str) -> PdfAnalysisParser:
+    parser = PdfAnalysisParser()
+    parser.feed(raw)
+    parser.close()
+    return parser
+
+
+def parse_scan_questions(raw: str) -> list[ScanQuestion]:
+    parser = ScanQuestionParser()
+    parser.feed(raw)
+    parser.close()
+    return parser.questions
+
+
+# ── Validate + repair ──────────────────────────────────────────────────────
+
+def pdf_analysis_with_repair(raw: str, comic: str, pdf_text: str) -> dict:
+    """
+    Parse an analysis; re-ask once for any broken blocks (up to MAX_REPAIR_BLOCKS).
+    Returns {"issues": [...], "repaired": n, "unrepaired": n}.
+    """
+    parser = parse_pdf_analysis(raw)
+    repaired = 0
+    broken = parser.broken[:MAX_REPAIR_BLOCKS]
+    if broken:
+        print(f"[FORMAT] {len(parser.broken)} broken analysis block(s) — re-asking for {len(broken)}")
+        blocks = "\n\n".join(format_pdf_block(b) for b in broken)
+        try:
+            reply = AIService.ask(get_linkedin_pdf_repair_prompt(comic, pdf_text, blocks),
+                                  tool="linkedin_pdf", mode="repair")
+            fixed = parse_pdf_analysis(reply).issues[:len(broken)]
+            parser.issues.extend(fixed)
+            repaired = len(fixed)
+        except Exception as e:
+            print(f"[FORMAT] analysis repair failed: {type(e).__name__}: {e}")
+    return {
+        "issues":     [i.to_dict() for i in parser.issues],
+        "repaired":   repaired,
+        "unrepaired": len(parser.broken) - repaired,
+    }
+
+
+def scan_questions_with_repair(raw: str) -> list[dict]:
+    """Parse scan questions; if none survive, ask the fast model to reformat once."""
+    questions = parse_scan_questions(raw)
+    if not questions and raw.strip():
+        print("[FORMAT] scan had no parseable questions — re-asking for format only")
+        try:
+            reply = AIService.ask(get_linkedin_pdf_scan_repair_prompt(raw), tool="linkedin_pdf", mode="scan")
+            questions = parse_scan_questions(reply)
+        except Exception as e:
+            print(f"[FORMAT] scan repair failed: {type(e).__name__}: {e}")
+    return [q.to_dict() for q in questions]
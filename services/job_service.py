@@ -0,0 +1,230 @@
+"""
+services/job_service.py
+───────────────────────
+In-process background jobs for long LLM calls (the PDF analyse pass).
+
+  submit()  → returns a job id immediately, work runs on a bounded pool
+  get()     → current status / result, used by GET /api/jobs/<id>
+  wait()    → blocks until the job changes state, used by the SSE stream
+  cancel()  → drops a job nobody needs any more (speculative prefetch)
+
+Jobs may carry a `key` (e.g. a hash of the inputs) so a later request can
+find and reuse work that was started speculatively — see claim(). A job
+submitted with after=<job id> is held off the pool until that job is over,
+so reusing one never parks a worker waiting on work queued behind it.
+A job's LLM calls count against the fair share of whoever submitted it
+(AdmissionService.bind), at priority="background" for speculative work.
+
+Results live in a TTL store for JOB_TTL_SECONDS after they finish.
+Everything is per-process: with gunicorn run one worker process and
+scale with --threads so polls land on the process that owns the job.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from config import JOB_WORKERS, JOB_MAX_PENDING, JOB_TTL_SECONDS
+from services.admission_service import AdmissionService
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when JOB_MAX_PENDING jobs are already waiting/running."""
+
+
+class JobService:
+
+    _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="anvil-job")
+    _jobs: dict[str, dict] = {}
+    _keys: dict[str, str] = {}
+    _cond = threading.Condition()
+
+    # ── Submit ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def submit(kind: str, fn: Callable[..., Any], *args, owner: str | None = None,
+               key: str | None = None, priority: str | None = None, after: str | None = None,
+               **kwargs) -> str:
+        """
+        Queue fn(*args, **kwargs) and return its job id.
+        fn's return value becomes the job's `result`; an exception becomes `error`.
+        A `key` makes the job findable later via claim() — a newer job with the
+        same key replaces (and cancels) the older one. priority overrides the
+        submitter's LLM priority for the job's calls ("background" for speculation).
+        `after` keeps the job off the pool until that job has finished or been
+        cancelled.
+        """
+        job_id = uuid.uuid4().hex
+        fn = AdmissionService.bind(fn, priority=priority)
+        start = lambda: JobService._start(job_id, fn, args, kwargs)
+        with JobService._cond:
+            JobService._sweep()
+            pending = sum(1 for j in JobService._jobs.values() if j["status"] in ("queued", "running"))
+            if pending >= JOB_MAX_PENDING:
+                raise QueueFullError(f"{pending} jobs already pending")
+
+            JobService._jobs[job_id] = {
+                "id":          job_id,
+                "kind":        kind,
+                "owner":       owner,
+                "key":         key,
+                "future":      None,
+                "status":      "queued",
+                "result":      None,
+                "error":       None,
+                "created_at":  time.time(),
+                "finished_at": None,
+                "followers":   [],
+                "released":    False,
+            }
+            if key is not None:
+                JobService._cancel_locked(JobService._keys.get(key))
+                JobService._keys[key] = job_id
+            parent = JobService._jobs.get(after) if after else None
+            held = parent is not None and not parent["released"]
+            if held:
+                parent["followers"].append(start)
+
+        if not held:
+            start()
+        print(f"[JOBS] queued {kind} {job_id}" + (f" after {after}" if held else ""))
+        return job_id
+
+    @staticmethod
+    def _start(job_id: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        future = JobService._executor.submit(JobService._run, job_id, fn, args, kwargs)
+        with JobService._cond:
+            if job_id in JobService._jobs:
+                JobService._jobs[job_id]["future"] = future
+        future.add_done_callback(lambda _: JobService._release(job_id))
+
+    @staticmethod
+    def _release(job_id: str) -> None:
+        """The job's future is over (ran or cancelled) — start jobs held behind it."""
+        with JobService._cond:
+            job = JobService._jobs.get(job_id)
+            if job is None:
+                return
+            job["released"] = True
+            followers, job["followers"] = job["followers"], []
+        for start in followers:
+            start()
+
+    @staticmethod
+    def _run(job_id: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        with JobService._cond:
+            job = JobService._jobs.get(job_id)
+            if job is None or job["status"] == "cancelled":
+                return
+            job["status"] = "running"
+            JobService._cond.notify_all()
+        try:
+            result = fn(*args, **kwargs)
+            JobService._update(job_id, status="done", result=result, finished_at=time.time())
+        except Exception as e:
+            print(f"[JOBS] {job_id} failed: {type(e).__name__}: {e}")
+            JobService._update(job_id, status="error", error=str(e), finished_at=time.time())
+
+    @staticmethod
+    def _update(job_id: str, **fields) -> None:
+        with JobService._cond:
+            job = JobService._jobs.get(job_id)
+            if job is not None and job["status"] != "cancelled":
+                job.update(fields)
+            JobService._cond.notify_all()
+
+    # ── Speculative work ───────────────────────────────────────────────────
+
+    @staticmethod
+    def claim(key: str) -> str | None:
+        """
+        Take ownership of the live job registered under key, if any.
+        The key is released, so each speculative result is claimed once.
+        """
+        with JobService._cond:
+            job_id = JobService._keys.pop(key, None)
+            job = JobService._jobs.get(job_id) if job_id else None
+            if job is None or job["status"] in ("error", "cancelled"):
+                return None
+            return job_id
+
+    @staticmethod
+    def cancel(job_id: str | None) -> None:
+        """Cancel a job. Queued jobs never start; running ones have their result discarded."""
+        with JobService._cond:
+            JobService._cancel_locked(job_id)
+
+    @staticmethod
+    def cancel_key(key: str) -> None:
+        with JobService._cond:
+            JobService._cancel_locked(JobService._keys.pop(key, None))
+
+    @staticmethod
+    def _cancel_locked(job_id: str | None) -> None:
+        job = JobService._jobs.get(job_id) if job_id else None
+        if job is None or job["status"] in ("done", "error", "cancelled"):
+            return
+        if job["future"] is not None:
+            job["future"].cancel()
+        job.update(status="cancelled", finished_at=time.time())
+        JobService._cond.notify_all()
+        print(f"[JOBS] cancelled {job['kind']} {job_id}")
+
+    # ── Read ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def get(job_id: str, owner: str | None = None) -> dict | None:
+        """Public view of a job, or None if unknown, expired, or owned by someone else."""
+        with JobService._cond:
+            JobService._sweep()
+            job = JobService._jobs.get(job_id)
+            if job is None or (job["owner"] and job["owner"] != owner):
+                return None
+            return JobService._view(job)
+
+    @staticmethod
+    def wait(job_id: str, seen_status: str, timeout: float) -> dict | None:
+        """Block until the job leaves seen_status (or timeout). Returns the latest view."""
+        deadline = time.monotonic() + timeout
+        with JobService._cond:
+            while True:
+                job = JobService._jobs.get(job_id)
+                if job is None or job["status"] != seen_status:
+                    return JobService._view(job) if job else None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return JobService._view(job)
+                JobService._cond.wait(remaining)
+
+    @staticmethod
+    def result(job_id: str, timeout: float) -> dict | None:
+        """Block until the job finishes (or timeout) and return its final view."""
+        deadline = time.monotonic() + timeout
+        with JobService._cond:
+            while True:
+                job = JobService._jobs.get(job_id)
+                if job is None:
+                    return None
+                remaining = deadline - time.monotonic()
+                if job["status"] in ("done", "error", "cancelled") or remaining <= 0:
+                    return JobService._view(job)
+                JobService._cond.wait(remaining)
+
+    @staticmethod
+    def _view(job: dict) -> dict:
+        return {k: job[k] for k in ("id", "kind", "status", "result", "error")}
+
+    @staticmethod
+    def _sweep() -> None:
+        """Drop finished jobs older than the TTL. Caller holds _cond."""
+        cutoff = time.time() - JOB_TTL_SECONDS
+        expired = [
+            jid for jid, j in JobService._jobs.items()
+            if j["finished_at"] is not None and j["finished_at"] < cutoff
+        ]
+        for jid in expired:
+            key = JobService._jobs.pop(jid)["key"]
+            if key is not None and JobService._keys.get(key) == jid:
+                del JobService._keys[key]
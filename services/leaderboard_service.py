@@ -0,0 +1,285 @@
+"""
+services/leaderboard_service.py
+───────────────────────────────
+Leaderboards beyond the raw queries in DatabaseService.
+
+Live boards: DatabaseService.log_tool_use reports every XP change to
+xp_changed(). One hub (_LiveBoard) rebuilds the global and weekly top-N at
+most once per LEADERBOARD_PUSH_INTERVAL_S after a change — however many
+tools were used in between — and every /api/leaderboard/stream subscriber
+is woken with that one result, plus its own new rank if its XP moved. The
+plain GET endpoints serve the same cached boards.
+
+Weekly snapshots: once a week (Monday 00:00 UTC) is over, its standings are
+frozen into weekly_leaderboard_snapshots (sql/weekly_leaderboard_snapshots.sql)
+so any past week is served from one indexed read. snapshot_due() snapshots
+every completed week of the last SNAPSHOT_LOOKBACK_WEEKS that has no
+snapshot yet. Snapshotting is idempotent, so it's safe from cron
+(`python cli.py snapshot`), from the in-process scheduler thread
+(SNAPSHOT_SCHEDULER=1) and from both at once.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from config import (
+    SNAPSHOT_INTERVAL_S, SNAPSHOT_LOOKBACK_WEEKS,
+    LEADERBOARD_PUSH_INTERVAL_S, LEADERBOARD_LIVE_TOP, LEADERBOARD_CACHE_TTL_S, LEADERBOARD_SSE_MAX_SUBSCRIBERS,
+)
+from services.db_service import DatabaseService
+
+
+class _LiveBoard:
+    """
+    Coalescing fan-out hub. Subscribers block in wait() on one Condition and
+    all read the same published board; nothing is queried per subscriber.
+    """
+
+    def __init__(self, interval_s: float, top_n: int, ttl_s: float, max_subscribers: int):
+        self.interval_s = interval_s
+        self.top_n = top_n
+        self.ttl_s = ttl_s
+        self.max_subscribers = max_subscribers
+        self._cond = threading.Condition()
+        self._build_lock = threading.Lock()
+        self._dirty: dict[str, int] = {}          # user_id → XP after their latest change
+        self._watchers: dict[str | None, int] = {}
+        self._ranks: dict[str, int] = {}          # last rank pushed to each watched user
+        self._thread: threading.Thread | None = None
+        self.version = 0
+        self.board: dict | None = None
+        self.me: dict[str, dict] = {}             # rank updates in the latest broadcast
+        self.built_at = 0.0
+        self.broadcasts = 0
+
+    def changed(self, user_id: str, xp: int) -> None:
+        with self._cond:
+            self._dirty[user_id] = xp
+            self._cond.notify_all()
+
+    def subscribe(self, user_id: str | None) -> bool:
+        with self._cond:
+            if sum(self._watchers.values()) >= self.max_subscribers:
+                return False
+            self._watchers[user_id] = self._watchers.get(user_id, 0) + 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="anvil-leaderboard", daemon=True)
+                self._thread.start()
+            return True
+
+    def unsubscribe(self, user_id: str | None) -> None:
+        with self._cond:
+            self._watchers[user_id] -= 1
+            if not self._watchers[user_id]:
+                del self._watchers[user_id]
+                self._ranks.pop(user_id, None)
+
+    def wait(self, version: int, timeout: float) -> int:
+        """Block until a broadcast newer than `version` (or timeout); returns the latest version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def current(self) -> dict:
+        """
+        The latest boards. With live subscribers the hub keeps them fresh;
+        otherwise rebuild here when XP changed or they're older than ttl_s.
+        """
+        with self._cond:
+            stale = self.board is None or (not self._watchers and (
+                self._dirty or time.monotonic() - self.built_at > self.ttl_s))
+            seen = self.version
+        if stale:
+            self._publish(seen)
+        return self.board
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"subscribers": sum(self._watchers.values()), "broadcasts": self.broadcasts,
+                    "version": self.version, "pending_changes": len(self._dirty)}
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty and self._watchers)
+                # Coalesce: everything that changes within the window goes out together
+                delay = self.built_at + self.interval_s - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self._publish()
+            except Exception as e:
+                print(f"[LEADERBOARD] live rebuild failed: {type(e).__name__}: {e}")
+                time.sleep(self.interval_s)
+
+    def _publish(self, seen: int | None = None) -> None:
+        """Rebuild and broadcast. With `seen`, skip if someone else published since that version."""
+        with self._build_lock:
+            with self._cond:
+                if seen is not None and self.version != seen:
+                    return
+                dirty, self._dirty = self._dirty, {}
+                watched = set(self._watchers)
+                previous = self.board
+            board = self._build(previous)
+            positions = {row["user_id"]: row["rank"] for row in board["global"]}
+            me = {}
+            for user_id, xp in dirty.items():
+                if user_id not in watched:
+                    continue
+                rank = positions.get(user_id) or DatabaseService.get_user_rank(user_id, xp)
+                before = self._ranks.get(user_id)
+                me[user_id] = {"xp": xp, "rank": rank, "delta": None if before is None else before - rank}
+            with self._cond:
+                for user_id, row in me.items():
+                    if user_id in self._watchers:
+                        self._ranks[user_id] = row["rank"]
+                self.board, self.me = board, me
+                self.built_at = time.monotonic()
+                self.version += 1
+                self.broadcasts += 1
+                self._cond.notify_all()
+
+    def _build(self, previous: dict | None) -> dict:
+        boards = {}
+        for name, rows in (("global", DatabaseService.get_global_leaderboard(self.top_n)),
+                           ("weekly", DatabaseService.get_weekly_leaderboard(self.top_n))):
+            boards[name] = [{**row, "rank": i} for i, row in enumerate(rows, 1)]
+        before = {row["user_id"]: row["rank"] for row in (previous or {}).get("global", [])}
+        boards["moved"] = [
+            {"user_id": row["user_id"], "from": before.get(row["user_id"]), "to": row["rank"]}
+            for row in boards["global"] if previous is not None and before.get(row["user_id"]) != row["rank"]
+        ]
+        return boards
+
+
+class LeaderboardService:
+
+    _live = _LiveBoard(LEADERBOARD_PUSH_INTERVAL_S, LEADERBOARD_LIVE_TOP, LEADERBOARD_CACHE_TTL_S,
+                       LEADERBOARD_SSE_MAX_SUBSCRIBERS)
+
+    _scheduler: threading.Thread | None = None
+
+    @staticmethod
+    def week_start(day: date) -> date:
+        """The Monday of the (UTC) week `day` falls in."""
+        return day - timedelta(days=day.weekday())
+
+    @staticmethod
+    def last_completed_week(now: datetime | None = None) -> date:
+        today = (now or datetime.now(timezone.utc)).date()
+        return LeaderboardService.week_start(today) - timedelta(weeks=1)
+
+    # ── Live boards ────────────────────────────────────────────────────────
+
+    @staticmethod
+    def xp_changed(user_id: str, xp: int) -> None:
+        """Called after every XP award; the hub picks it up on its next rebuild."""
+        LeaderboardService._live.changed(user_id, xp)
+
+    @staticmethod
+    def live_board(name: str) -> list[dict]:
+        """Cached "global" or "weekly" top-N, each row with its 1-based rank."""
+        return LeaderboardService._live.current()[name]
+
+    @staticmethod
+    def subscribe(user_id: str | None) -> bool:
+        """Register a stream; False when LEADERBOARD_SSE_MAX_SUBSCRIBERS are already open."""
+        return LeaderboardService._live.subscribe(user_id)
+
+    @staticmethod
+    def unsubscribe(user_id: str | None) -> None:
+        LeaderboardService._live.unsubscribe(user_id)
+
+    @staticmethod
+    def live_update(user_id: str | None, version: int | None = None,
+                    timeout: float = 0) -> tuple[int, dict, dict | None]:
+        """
+        (version, boards, the user's {xp, rank, delta} or None). Pass the
+        last version seen to wait up to `timeout` for a newer broadcast; on
+        timeout the same version comes back. Without one, returns the
+        current boards straight away.
+        """
+        live = LeaderboardService._live
+        if version is None:
+            board = live.current()
+            with live._cond:
+                return live.version, board, None
+        live.wait(version, timeout)
+        with live._cond:
+            if live.version == version:
+                return version, live.board, None
+            return live.version, live.board, live.me.get(user_id) if user_id else None
+
+    @staticmethod
+    def live_stats() -> dict:
+        return LeaderboardService._live.stats()
+
+    # ── Snapshot job ───────────────────────────────────────────────────────
+
+    @staticmethod
+    def snapshot_week(week: date, refresh: bool = True) -> int:
+        """
+        Freeze one completed week (any day in it). Folds new tool_uses into
+        usage_rollups first unless refresh=False. Returns users ranked.
+        """
+        week = LeaderboardService.week_start(week)
+        if week > LeaderboardService.last_completed_week():
+            raise ValueError(f"week of {week} hasn't finished yet")
+        if refresh:
+            DatabaseService.refresh_usage_rollups()
+        n = DatabaseService.snapshot_weekly_leaderboard(week)
+        print(f"[LEADERBOARD] snapshot of week {week}: {n} users")
+        return n
+
+    @staticmethod
+    def snapshot_due(lookback: int = SNAPSHOT_LOOKBACK_WEEKS) -> list[date]:
+        """Snapshot the completed weeks of the last `lookback` that have none yet, oldest first."""
+        last = LeaderboardService.last_completed_week()
+        weeks = [last - timedelta(weeks=i) for i in reversed(range(lookback))]
+        done = {r["week"] for r in DatabaseService.get_snapshot_weeks(limit=lookback)}
+        due = [w for w in weeks if w.isoformat() not in done]
+        if due:
+            DatabaseService.refresh_usage_rollups()
+            for week in due:
+                LeaderboardService.snapshot_week(week, refresh=False)
+        return due
+
+    @staticmethod
+    def start_scheduler(interval_s: int = SNAPSHOT_INTERVAL_S) -> None:
+        """Run snapshot_due() now and every interval_s on a daemon thread (once per process)."""
+        if LeaderboardService._scheduler is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    LeaderboardService.snapshot_due()
+                except Exception as e:
+                    print(f"[LEADERBOARD] scheduled snapshot failed: {type(e).__name__}: {e}")
+                time.sleep(interval_s)
+
+        LeaderboardService._scheduler = threading.Thread(target=loop, name="anvil-snapshots", daemon=True)
+        LeaderboardService._scheduler.start()
+
+    # ── Reads ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def get_week(week: date, limit: int, user_id: str | None = None) -> dict | None:
+        """
+        {"week", "top": [...], "me": the user's own row or None} for a
+        snapshotted week, or None if that week was never snapshotted.
+        """
+        week = LeaderboardService.week_start(week)
+        top = DatabaseService.get_weekly_snapshot(week, limit)
+        if not top and not any(r["week"] == week.isoformat() for r in DatabaseService.get_snapshot_weeks()):
+            return None
+        me = None
+        if user_id:
+            me = next((r for r in top if r["user_id"] == user_id), None) \
+                or DatabaseService.get_weekly_snapshot_row(week, user_id)
+        for row in top + ([me] if me else []):
+            row["display_name"] = row.get("display_name") or "Anonymous"
+            row["avatar_url"] = row.get("avatar_url") or ""
+        return {"week": week.isoformat(), "top": top, "me": me}
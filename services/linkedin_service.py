@@ -7,8 +7,9 @@ Everything LinkedIn-specific lives here:
 """
 
 import re
-import requests
-from bs4 import BeautifulSoup
+
+# requests / bs4 / fitz are imported inside the methods that need them —
+# they're only used by LinkedIn tools, so the app boots without them.
 
 # ── Browser-like headers to avoid bot detection ────────────────────────────
 LINKEDIN_HEADERS = {
@@ -57,6 +58,9 @@ class LinkedInService:
         if not re.match(r'https?://(www\.)?linkedin\.com/in/[\w\-]+/?', url):
             return None, "INVALID_URL"
 
+        import requests
+        from bs4 import BeautifulSoup
+
         try:
             resp = requests.get(url, headers=LINKEDIN_HEADERS, timeout=10, allow_redirects=True)
 
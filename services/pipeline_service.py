@@ -0,0 +1,342 @@
+"""
+services/pipeline_service.py
+────────────────────────────
+The request flow every JSON tool endpoint shares, as one declarative engine.
+
+Each tool registers, per mode (None = any other mode):
+  parse(data)            → inputs dict; raise ToolInputError to answer early
+  checks                 → input fields to garbage-check, in order
+  prompt(comic, inputs)  → the comics.py prompt for one persona
+  post                   → post-processors (call, message) → extra response fields
+  similar                → the long text input (resume, post…) that may match an
+                           earlier one approximately (services/similarity_service.py)
+  replay                 → whether a repeat of the same input is served from
+                           roast_history; only the roast / check modes opt in —
+                           a create mode is asked for something new every time
+
+PipelineService.run(tool, data) pushes the call through STAGES — middleware
+of the form stage(call, nxt) → response — and finally generate():
+
+  metrics     per tool:mode calls, status codes, latency (PipelineService.stats())
+  rate_limit  token bucket per user / client IP → 429 + Retry-After
+  validate    parse + garbage check, once however many comics; under load
+              the garbage roast is a cached or canned one (no Groq call)
+  history     replay identical — or, for `similar` tools, near-identical —
+              earlier requests from roast_history (replay modes only, and
+              never when the request says "fresh": true)
+  admission   AdmissionService: 503 + Retry-After for battles once degraded
+              and for everything once shedding (replays above still work)
+  generate    AIService — one comic, or a battle streamed as NDJSON — then
+              post-processors, XP via log_tool_use, history via the batched writer
+
+Roast battle: "comics": [...] runs every listed persona concurrently
+(AIService.ask_many) and streams one {"comic", "message"} line each as it
+finishes, then {"done": true, "stats": ...}; "stream": false returns a
+single {"results": [...], "stats": ...}. One battle is one tool use for XP.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+
+from flask import Response, jsonify, request
+
+from comics import COMIC_PERSONAS, get_garbage_prompt, get_garbage_template, is_garbage_input
+from config import BATTLE_MAX_COMICS, TOOL_RATE_PER_MIN, TOOL_RATE_BURST
+from services.admission_service import AdmissionService, OverloadedError
+from services.ai_service import AIService
+from services.db_service import DatabaseService
+from services.similarity_service import SimilarityService
+
+
+class ToolInputError(Exception):
+    """Raised by a parse step to answer the request without calling Groq."""
+
+    def __init__(self, body: dict, status: int = 400):
+        super().__init__(body)
+        self.body   = body
+        self.status = status
+
+
+@dataclass
+class ToolCall:
+    tool:    str
+    mode:    str
+    data:    dict
+    spec:    dict
+    comics:  list[str]
+    battle:  bool
+    user_id: str | None
+    inputs:  dict = field(default_factory=dict)
+    hashes:  dict = field(default_factory=dict)   # comic → input hash
+    replayed: list = field(default_factory=list)  # battle results served from history
+    near:    dict = field(default_factory=dict)   # comic → (near_scope, simhash)
+
+    @property
+    def route(self) -> str:
+        return f"{self.tool}:{self.mode or '-'}"
+
+
+def input_hash(tool: str, inputs: dict) -> str:
+    """Stable hash of a request's inputs — whitespace-normalised, key-order independent."""
+    def norm(v):
+        if isinstance(v, str):
+            return " ".join(v.split())
+        if isinstance(v, dict):
+            return {k: norm(x) for k, x in v.items() if k != "fresh"}
+        if isinstance(v, list):
+            return [norm(x) for x in v]
+        return v
+    payload = json.dumps({"tool": tool, "inputs": norm(inputs)}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def pick_comics(data: dict) -> tuple[list[str], bool]:
+    """
+    (personas, is_battle). A "comics" list is filtered to known ids, deduped and
+    capped at BATTLE_MAX_COMICS; otherwise it's just [data["comic"]].
+    """
+    requested = data.get("comics")
+    if isinstance(requested, list):
+        picked = []
+        for c in requested:
+            if c in COMIC_PERSONAS and c not in picked:
+                picked.append(c)
+        if picked:
+            return picked[:BATTLE_MAX_COMICS], True
+    return [data.get("comic", "abhishek_upmanyu")], False
+
+
+# ── Stages ─────────────────────────────────────────────────────────────────
+
+def metrics(call: ToolCall, nxt) -> Response:
+    start = time.perf_counter()
+    status = 500
+    try:
+        resp = nxt(call)
+        status = resp[1] if isinstance(resp, tuple) else resp.status_code
+        return resp
+    finally:
+        PipelineService._record(call.route, status, time.perf_counter() - start)
+
+
+class _Buckets:
+    """Token bucket per key; idle full buckets are dropped once the map gets big."""
+
+    MAX_KEYS = 10_000
+
+    def __init__(self, rate_per_min: float, burst: int):
+        self.rate  = rate_per_min / 60.0
+        self.burst = burst
+        self._state: dict[str, list[float]] = {}   # key → [tokens, last refill]
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: int) -> float:
+        """Spend `cost` tokens; return 0 if allowed, else seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._state.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            cost = min(cost, self.burst)
+            if tokens < cost:
+                self._state[key] = [tokens, now]
+                return (cost - tokens) / self.rate
+            self._state[key] = [tokens - cost, now]
+            if len(self._state) > self.MAX_KEYS:
+                self._state = {k: v for k, v in self._state.items()
+                               if v[0] + (now - v[1]) * self.rate < self.burst}
+            return 0.0
+
+
+_buckets = _Buckets(TOOL_RATE_PER_MIN, TOOL_RATE_BURST)
+
+
+def rate_limit(call: ToolCall, nxt) -> Response:
+    if TOOL_RATE_PER_MIN <= 0:
+        return nxt(call)
+    wait = _buckets.take(call.user_id or f"ip:{request.remote_addr}", len(call.comics))
+    if wait:
+        resp = jsonify({"error": "Slow down — the comics need a breather. Try again in a bit."})
+        resp.headers["Retry-After"] = str(int(wait) + 1)
+        return resp, 429
+    return nxt(call)
+
+
+def validate(call: ToolCall, nxt) -> Response:
+    parse = call.spec["parse"]
+    try:
+        call.inputs = parse(call.data) if parse else dict(call.data)
+    except ToolInputError as e:
+        return jsonify(e.body), e.status
+    for name in call.spec["checks"]:
+        value = call.inputs.get(name, "")
+        garbage, reason = is_garbage_input(str(value))
+        if garbage:
+            return _garbage(call, value, reason)
+    return nxt(call)
+
+
+def _garbage(call: ToolCall, value, reason: str) -> Response:
+    # Garbage roasts are cheap to fake: under load hand out one generated for
+    # the same junk earlier, or a template
+    comic = call.comics[0]
+    key = ("garbage", call.tool, comic, reason, str(value).strip().lower()[:64])
+    if AdmissionService.admit("cheap") == "template":
+        message = AdmissionService.cached(key) or get_garbage_template(call.tool, value, reason)
+        return jsonify({"message": message, "degraded": True})
+    message = AIService.ask(get_garbage_prompt(comic, call.tool, value, reason), tool="garbage")
+    AdmissionService.remember(key, message)
+    return jsonify({"message": message})
+
+
+def history(call: ToolCall, nxt) -> Response:
+    if call.battle:
+        # Per-persona hashes match what a single-comic request for that persona stores
+        base = {k: v for k, v in call.data.items() if k not in ("comics", "stream")}
+        call.hashes = {c: input_hash(call.tool, {**base, "comic": c}) for c in call.comics}
+    else:
+        call.hashes = {call.comics[0]: input_hash(call.tool, call.data)}
+    if not call.user_id:
+        return nxt(call)
+    if call.spec["similar"]:
+        fp = SimilarityService.fingerprint(str(call.inputs.get(call.spec["similar"], "")))
+        if fp is not None:
+            rest = {k: v for k, v in call.inputs.items() if k != call.spec["similar"]}
+            for c in call.comics:
+                scope = input_hash(call.tool, {**rest, "mode": call.mode, "comic": c})[:16]
+                call.near[c] = (scope, fp)
+    if call.data.get("fresh") or not call.spec["replay"]:
+        return nxt(call)
+
+    for c, h in call.hashes.items():
+        hit = DatabaseService.find_history(call.user_id, call.tool, h)
+        if not hit and c in call.near:
+            hit = SimilarityService.find(call.user_id, call.tool, *call.near[c])
+        if not hit:
+            continue
+        replay = {"message": hit["output"], "from_history": True, "history_id": hit["id"]}
+        if "similarity" in hit:
+            replay.update(near_duplicate=True, similarity=hit["similarity"])
+        if not call.battle:
+            print(f"[TOOLS] history hit for {call.tool} — skipping Groq")
+            return jsonify({**replay, "stats": None})
+        call.replayed.append({"comic": c, **replay})
+    return nxt(call)
+
+
+def admission(call: ToolCall, nxt) -> Response:
+    try:
+        AdmissionService.admit("expensive" if call.battle else "standard")
+        return nxt(call)
+    except OverloadedError as e:   # shed here, or queued too long for an LLM slot
+        return AdmissionService.response(e)
+
+
+def generate(call: ToolCall) -> Response:
+    if call.battle:
+        return _battle(call)
+    comic = call.comics[0]
+    message = AIService.ask(call.spec["prompt"](comic, call.inputs), tool=call.tool, mode=call.mode)
+    extra = _post(call, message)
+    stats = DatabaseService.log_tool_use(call.tool, user_id=call.user_id) if call.user_id else None
+    if call.user_id:
+        _record_history(call, comic, message)
+    return jsonify({"message": message, **extra, "stats": stats})
+
+
+def _record_history(call: ToolCall, comic: str, message: str) -> None:
+    near = call.near.get(comic)
+    DatabaseService.record_history(call.user_id, call.tool, call.mode, comic, call.hashes[comic], message, near=near)
+    if near:
+        SimilarityService.remember(call.user_id, call.tool, *near, call.hashes[comic])
+
+
+def _post(call: ToolCall, message: str) -> dict:
+    extra = {}
+    for fn in call.spec["post"]:
+        extra.update(fn(call, message))
+    return extra
+
+
+def _battle(call: ToolCall) -> Response:
+    done = {r["comic"] for r in call.replayed}
+    prompts = {c: call.spec["prompt"](c, call.inputs) for c in call.comics if c not in done}
+    print(f"[TOOLS] {call.tool} battle: {len(call.comics)} comics, {len(done)} from history")
+
+    def results():
+        yield from call.replayed
+        generated = 0
+        for c, text, error in AIService.ask_many(prompts, tool=call.tool, mode=call.mode):
+            if error is not None:
+                print(f"[TOOLS] {call.tool} battle: {c} failed: {type(error).__name__}: {error}")
+                yield {"comic": c, "error": "This comic froze on stage — try again."}
+                continue
+            generated += 1
+            if call.user_id:
+                _record_history(call, c, text)
+            yield {"comic": c, "message": text, **_post(call, text)}
+        stats = DatabaseService.log_tool_use(call.tool, user_id=call.user_id) if call.user_id and generated else None
+        yield {"done": True, "stats": stats}
+
+    if call.data.get("stream") is False:
+        lines = list(results())
+        return jsonify({"results": lines[:-1], "stats": lines[-1]["stats"]})
+    return Response((json.dumps(line) + "\n" for line in results()), mimetype="application/x-ndjson")
+
+
+STAGES = [metrics, rate_limit, validate, history, admission]
+
+
+# ── Engine ─────────────────────────────────────────────────────────────────
+
+class PipelineService:
+
+    _specs: dict[tuple[str, str | None], dict] = {}
+    _handler: Callable | None = None
+    _stats: dict[str, dict] = {}
+    _stats_lock = threading.Lock()
+
+    @staticmethod
+    def register(tool: str, mode: str | None, prompt: Callable[[str, dict], str],
+                 parse: Callable[[dict], dict] | None = None,
+                 checks: tuple[str, ...] = (), post: tuple[Callable, ...] = (),
+                 similar: str | None = None, replay: bool = False) -> None:
+        """Declare how (tool, mode) is served. mode=None matches any mode without its own spec."""
+        PipelineService._specs[(tool, mode)] = {
+            "prompt": prompt, "parse": parse, "checks": tuple(checks), "post": tuple(post),
+            "similar": similar, "replay": replay,
+        }
+
+    @staticmethod
+    def run(tool: str, data: dict, user_id: str | None, default_mode: str) -> Response:
+        mode = data.get("mode", default_mode)
+        spec = PipelineService._specs.get((tool, mode)) or PipelineService._specs[(tool, None)]
+        comics, battle = pick_comics(data)
+        call = ToolCall(tool, mode, data, spec, comics, battle, user_id)
+        if PipelineService._handler is None:
+            handler = generate
+            for stage in reversed(STAGES):
+                handler = partial(stage, nxt=handler)
+            PipelineService._handler = handler
+        return PipelineService._handler(call)
+
+    # ── Metrics ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _record(route: str, status: int, elapsed: float) -> None:
+        with PipelineService._stats_lock:
+            s = PipelineService._stats.setdefault(route, {"calls": 0, "latency_s": 0.0, "by_status": {}})
+            s["calls"] += 1
+            s["latency_s"] += elapsed
+            s["by_status"][str(status)] = s["by_status"].get(str(status), 0) + 1
+
+    @staticmethod
+    def stats() -> dict[str, dict]:
+        """Per tool:mode counters since process start (battle latency is time to first byte)."""
+        with PipelineService._stats_lock:
+            return {route: {**s, "by_status": dict(s["by_status"])}
+                    for route, s in PipelineService._stats.items()}
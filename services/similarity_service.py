@@ -0,0 +1,154 @@
+"""
+services/similarity_service.py
+──────────────────────────────
+Near-duplicate detection for long tool inputs (resume text, LinkedIn
+content, PDF text), so a re-submission with a changed date or an extra
+line is answered from roast_history — flagged near_duplicate + similarity,
+so the page says which earlier result it is and offers a fresh run.
+
+  fingerprint(text)  64-bit SimHash over word 3-shingles of the normalised
+                     text (lower-cased, digit runs → "0", punctuation dropped)
+  NearDupIndex       fingerprints bucketed by scope; a lookup XORs against
+                     the scope's entries and takes the closest within
+                     NEARDUP_MAX_DISTANCE bits
+
+Matches never cross users: an index scope is user + tool + a hash of every
+other input (mode, comic, content type, PDF answers…), so scopes stay small
+and an exact Hamming scan beats LSH banding — which needs distance + 1 band
+keys per entry and ~1 GB at a million entries (bench/neardup.py). The index
+lives in this process, holds input hashes rather than outputs, and is warmed
+per user + tool from roast_history's simhash / near_scope columns on first
+use (sql/roast_history.sql); a warm-up the DB couldn't answer is retried on
+the next lookup.
+"""
+
+import hashlib
+import re
+import threading
+
+from config import NEARDUP_MAX_DISTANCE, NEARDUP_MIN_WORDS, NEARDUP_CAPACITY, NEARDUP_WARM_ROWS
+from services.db_service import DatabaseService
+
+BITS = 64
+_WORD = re.compile(r"[^\W\d_]+|\d+")
+
+
+def _words(text: str) -> list[str]:
+    return ["0" if w.isdigit() else w for w in _WORD.findall(text.lower())]
+
+
+def fingerprint(text: str) -> int:
+    """64-bit SimHash: each bit is the majority vote of that bit over the shingle hashes."""
+    words = _words(text)
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    columns = zip(*(format(int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big"), "064b")
+                    for s in shingles))
+    half = len(shingles) / 2
+    return int("".join("1" if col.count("1") > half else "0" for col in columns), 2)
+
+
+class NearDupIndex:
+    """
+    Fingerprints grouped by scope; a lookup is a Hamming scan over that
+    scope's entries (the newest PER_SCOPE of them). Scopes are dropped least
+    recently added first once the index holds more than `capacity` entries.
+    Thread-safe.
+    """
+
+    PER_SCOPE = 500
+
+    def __init__(self, max_distance: int, capacity: int):
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self._scopes: dict[str, tuple[list[int], list[bytes]]] = {}   # scope → (fingerprints, input hashes)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def query(self, scope: str, fp: int) -> tuple[str, int] | None:
+        """(ref, distance) of the closest — newest on a tie — entry in scope within max_distance, or None."""
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if not entry:
+                return None
+            fps, refs = entry
+            d, i = min(((x ^ fp).bit_count(), -i) for i, x in enumerate(fps))
+            ref = refs[-i]
+        return (ref.hex(), d) if d <= self.max_distance else None
+
+    def add(self, scope: str, fp: int, ref: str) -> None:
+        ref_bytes = bytes.fromhex(ref)
+        with self._lock:
+            fps, refs = self._scopes.pop(scope, None) or ([], [])
+            self._scopes[scope] = (fps, refs)   # re-insert: most recently added scope last
+            if any(x == fp and r == ref_bytes for x, r in zip(fps, refs)):
+                return
+            fps.append(fp)
+            refs.append(ref_bytes)
+            self._size += 1
+            if len(fps) > self.PER_SCOPE:
+                del fps[0], refs[0]
+                self._size -= 1
+            while self._size > self.capacity:
+                oldest, _ = next(iter(self._scopes.items()))
+                self._size -= len(self._scopes.pop(oldest)[0])
+
+
+class SimilarityService:
+
+    _index = NearDupIndex(max(NEARDUP_MAX_DISTANCE, 0), NEARDUP_CAPACITY)
+    _warmed: dict[tuple[str, str], None] = {}   # (user_id, tool) pairs loaded from the DB, oldest first
+    _warm_lock = threading.Lock()
+    MAX_WARMED = 50_000
+
+    @staticmethod
+    def fingerprint(text: str) -> int | None:
+        """SimHash of `text`, or None when near matching is off or the text is too short to trust."""
+        if NEARDUP_MAX_DISTANCE < 0 or len(_words(text)) < NEARDUP_MIN_WORDS:
+            return None
+        return fingerprint(text)
+
+    @staticmethod
+    def _scope(user_id: str, tool: str, near_scope: str) -> str:
+        return f"{user_id}\x00{tool}\x00{near_scope}"
+
+    @staticmethod
+    def _warm(user_id: str, tool: str) -> None:
+        with SimilarityService._warm_lock:
+            if (user_id, tool) in SimilarityService._warmed:
+                return
+        try:
+            rows = DatabaseService.get_fingerprints(user_id, tool, NEARDUP_WARM_ROWS)
+        except Exception as e:
+            print(f"[SIMILARITY] warm-up for {tool} failed ({type(e).__name__}) — retrying on next lookup")
+            return
+        for row in rows:
+            SimilarityService._index.add(SimilarityService._scope(user_id, tool, row["near_scope"]),
+                                         row["simhash"] % (1 << BITS), row["input_hash"])
+        # Only a fetch that answered counts — concurrent warm-ups just re-add the same entries
+        with SimilarityService._warm_lock:
+            SimilarityService._warmed[(user_id, tool)] = None
+            if len(SimilarityService._warmed) > SimilarityService.MAX_WARMED:
+                SimilarityService._warmed.pop(next(iter(SimilarityService._warmed)))
+
+    @staticmethod
+    def find(user_id: str, tool: str, near_scope: str, fp: int) -> dict | None:
+        """
+        The history row for a near-identical earlier input, with "similarity"
+        (1 - distance/64) added — or None.
+        """
+        SimilarityService._warm(user_id, tool)
+        match = SimilarityService._index.query(SimilarityService._scope(user_id, tool, near_scope), fp)
+        if match is None:
+            return None
+        hit = DatabaseService.find_history(user_id, tool, match[0])
+        if hit is None:
+            return None
+        print(f"[SIMILARITY] near-duplicate {tool} input (distance {match[1]}) — reusing history")
+        return {**hit, "similarity": round(1 - match[1] / BITS, 3)}
+
+    @staticmethod
+    def remember(user_id: str, tool: str, near_scope: str, fp: int, input_hash: str) -> None:
+        SimilarityService._index.add(SimilarityService._scope(user_id, tool, near_scope), fp, input_hash)
@@ -0,0 +1,55 @@
+-- sql/record_tool_use.sql
+-- ───────────────────────
+-- Server-authoritative XP engine.
+-- Logs a tool use and bumps xp / streak / tools_used in ONE statement so
+-- parallel tool calls (multiple tabs, double-clicks) can never lose updates.
+-- Called from DatabaseService.log_tool_use via supabase.rpc("record_tool_use").
+--
+-- Streak rule: a "day" is an IST calendar day (matches comics.get_ist_hour).
+--   same day as last_active (or a replayed earlier day) → streak unchanged
+--   day after last_active        → streak + 1
+--   anything else / first use    → streak resets to 1
+
+alter table user_stats add column if not exists last_active date;
+
+-- Replays from DatabaseService's outbox (a Supabase outage) carry the use's
+-- own id and time: a use whose first attempt did land is not counted twice,
+-- and a late replay is dated — and streaked — when it happened. Replays can
+-- arrive after newer uses, so last_active never moves backwards.
+alter table tool_uses add column if not exists use_id uuid;
+create unique index if not exists tool_uses_use_id on tool_uses (use_id);
+
+drop function if exists record_tool_use(uuid, text, integer);
+
+create or replace function record_tool_use(p_user_id uuid, p_tool_name text, p_xp integer,
+                                           p_use_id uuid default null, p_used_at timestamptz default now())
+returns table (xp integer, streak integer, tools_used integer)
+language plpgsql
+as $$
+declare
+  today date := (p_used_at at time zone 'Asia/Kolkata')::date;
+begin
+  insert into tool_uses (user_id, tool_name, xp_earned, used_at, use_id)
+  values (p_user_id, p_tool_name, p_xp, p_used_at, p_use_id)
+  on conflict (use_id) do nothing;
+
+  if not found then   -- already recorded: report the totals unchanged
+    return query select s.xp, s.streak, s.tools_used from user_stats s where s.user_id = p_user_id;
+    return;
+  end if;
+
+  return query
+  insert into user_stats as s (user_id, xp, streak, tools_used, last_active)
+  values (p_user_id, p_xp, 1, 1, today)
+  on conflict (user_id) do update set
+    xp          = s.xp + excluded.xp,
+    tools_used  = s.tools_used + 1,
+    streak      = case
+                    when s.last_active >= today    then greatest(s.streak, 1)
+                    when s.last_active = today - 1 then s.streak + 1
+                    else 1
+                  end,
+    last_active = greatest(s.last_active, today)
+  returning s.xp, s.streak, s.tools_used;
+end;
+$$;
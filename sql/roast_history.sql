@@ -0,0 +1,35 @@
+-- sql/roast_history.sql
+-- ─────────────────────
+-- Every LLM result served to a logged-in user, so they can page back
+-- through old roasts (/api/history) and so an identical re-submission is
+-- answered from here instead of a fresh Groq call.
+--
+-- input_hash = sha256 of the normalised tool inputs (services/pipeline_service.py input_hash)
+-- simhash / near_scope = 64-bit SimHash of the long text input (signed) and a
+-- hash of every other input, for near-duplicate reuse
+-- (services/similarity_service.py); null for short inputs
+-- Rows are written in batches by DatabaseService's background writer.
+
+create table if not exists roast_history (
+  id          bigint generated always as identity primary key,
+  user_id     uuid        not null references users (id) on delete cascade,
+  tool        text        not null,
+  mode        text        not null default '',
+  comic       text        not null default '',
+  input_hash  text        not null,
+  simhash     bigint,
+  near_scope  text,
+  output      text        not null,
+  created_at  timestamptz not null default now()
+);
+
+-- Keyset pagination: WHERE user_id = $1 [AND tool = $2] AND id < $cursor ORDER BY id DESC
+create index if not exists roast_history_user_id_idx      on roast_history (user_id, id desc);
+create index if not exists roast_history_user_tool_id_idx on roast_history (user_id, tool, id desc);
+
+-- Dedupe lookup
+create index if not exists roast_history_dedupe_idx on roast_history (user_id, tool, input_hash, id desc);
+
+-- Existing deployments
+alter table roast_history add column if not exists simhash    bigint;
+alter table roast_history add column if not exists near_scope text;
@@ -0,0 +1,118 @@
+-- sql/usage_rollups.sql
+-- ─────────────────────
+-- Precomputed daily / weekly usage rollups over tool_uses.
+-- /api/admin/stats reads ONLY usage_rollups — never raw tool_uses.
+--
+-- usage_rollups   one row per (period, bucket, dim, key)
+--                 period = day | week   (weeks start Monday, UTC — same as
+--                                        DatabaseService.get_weekly_leaderboard)
+--                 dim    = tool | user  (key = tool_name or user_id)
+-- rollup_state    high-water mark: the (xact_id, id) of the last tool_uses
+--                 row already folded in
+--
+-- refresh_usage_rollups(p_batch) folds the next p_batch new rows in and
+-- advances the mark in the same transaction, so re-running it is safe.
+--
+-- The mark is commit-ordered, not id-ordered: ids are handed out at insert,
+-- so a row can commit after a higher id was already folded (outbox replays,
+-- concurrent record_tool_use calls) and an id mark would skip it for good.
+-- Each row carries the id of the transaction that inserted it (xact_id), and
+-- only rows whose transaction is older than every one still running
+-- (pg_snapshot_xmin) are folded — nothing can commit below that line later.
+-- reset_usage_rollups() wipes everything for a backfill (python cli.py backfill).
+
+create table if not exists usage_rollups (
+  period  text    not null check (period in ('day', 'week')),
+  bucket  date    not null,
+  dim     text    not null check (dim in ('tool', 'user')),
+  key     text    not null,
+  uses    integer not null default 0,
+  xp      integer not null default 0,
+  primary key (period, bucket, dim, key)
+);
+
+create table if not exists rollup_state (
+  name        text        primary key,
+  last_id     bigint      not null default 0,
+  updated_at  timestamptz not null default now()
+);
+
+insert into rollup_state (name, last_id) values ('usage', 0)
+on conflict (name) do nothing;
+
+-- Existing rows all get the id of this migration's transaction, so a mark
+-- already past them carries over as (that xact_id, last_id).
+alter table tool_uses add column if not exists xact_id xid8 not null default pg_current_xact_id();
+create index if not exists tool_uses_xact_id on tool_uses (xact_id, id);
+alter table rollup_state add column if not exists last_xact xid8 not null default '0';
+
+update rollup_state s
+set last_xact = (select u.xact_id from tool_uses u where u.id <= s.last_id order by u.id desc limit 1)
+where s.name = 'usage' and s.last_id > 0 and s.last_xact = '0'
+  and exists (select 1 from tool_uses u where u.id <= s.last_id);
+
+
+create or replace function refresh_usage_rollups(p_batch integer default 50000)
+returns table (processed integer, last_id bigint)
+language plpgsql
+as $$
+declare
+  -- Every transaction below this has finished, so no row can still appear under it
+  v_safe      xid8 := pg_snapshot_xmin(pg_current_snapshot());
+  v_from_xact xid8;
+  v_from      bigint;
+  v_to_xact   xid8;
+  v_to        bigint;
+  v_n         integer;
+begin
+  -- Row lock serialises concurrent runs (cron + manual CLI, several workers)
+  select s.last_xact, s.last_id into v_from_xact, v_from from rollup_state s where s.name = 'usage' for update;
+
+  select t.xact_id, t.id, t.n into v_to_xact, v_to, v_n
+  from (select u.xact_id, u.id, row_number() over (order by u.xact_id, u.id) as n
+        from tool_uses u
+        where (u.xact_id, u.id) > (v_from_xact, v_from) and u.xact_id < v_safe
+        order by u.xact_id, u.id
+        limit p_batch) t
+  order by t.n desc
+  limit 1;
+  v_n := coalesce(v_n, 0);
+
+  if v_n > 0 then
+    with new_rows as (
+      select (u.used_at at time zone 'UTC')::date as d, u.tool_name, u.user_id::text as uid, u.xp_earned
+      from tool_uses u
+      where (u.xact_id, u.id) > (v_from_xact, v_from) and (u.xact_id, u.id) <= (v_to_xact, v_to)
+    ), expanded as (
+      select 'day'  as period, d                             as bucket, tool_name, uid, xp_earned from new_rows
+      union all
+      select 'week' as period, date_trunc('week', d)::date   as bucket, tool_name, uid, xp_earned from new_rows
+    )
+    insert into usage_rollups as r (period, bucket, dim, key, uses, xp)
+    select period, bucket, 'tool', tool_name, count(*), coalesce(sum(xp_earned), 0)
+    from expanded group by period, bucket, tool_name
+    union all
+    select period, bucket, 'user', uid, count(*), coalesce(sum(xp_earned), 0)
+    from expanded group by period, bucket, uid
+    on conflict (period, bucket, dim, key) do update set
+      uses = r.uses + excluded.uses,
+      xp   = r.xp   + excluded.xp;
+
+    update rollup_state set last_xact = v_to_xact, last_id = v_to, updated_at = now() where name = 'usage';
+  end if;
+
+  return query select v_n, coalesce(v_to, v_from);
+end;
+$$;
+
+
+create or replace function reset_usage_rollups()
+returns void
+language plpgsql
+as $$
+begin
+  perform 1 from rollup_state where name = 'usage' for update;
+  delete from usage_rollups;
+  update rollup_state set last_xact = '0', last_id = 0, updated_at = now() where name = 'usage';
+end;
+$$;
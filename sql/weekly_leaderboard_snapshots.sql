@@ -0,0 +1,72 @@
+-- sql/weekly_leaderboard_snapshots.sql
+-- ────────────────────────────────────
+-- Frozen weekly leaderboards, so "last week's winners" (or any past week)
+-- is one indexed read instead of a rescan of tool_uses.
+--
+-- weekly_leaderboard_snapshots   one row per (week, user) who used a tool
+--                                that week: their XP / uses totals, their
+--                                position (1 = top) and the display name +
+--                                avatar as they were when the week closed
+-- weekly_snapshot_runs           one row per snapshotted week
+--
+-- Weeks start Monday, UTC — the same buckets as usage_rollups (period =
+-- 'week'), which the snapshot is built from, so usage_rollups must be
+-- refreshed first (LeaderboardService.snapshot_week does both).
+--
+-- snapshot_weekly_leaderboard(p_week) replaces that week's rows in one
+-- transaction: re-running it (cron + scheduler thread, a retry) gives the
+-- same snapshot, never duplicates.
+
+create table if not exists weekly_leaderboard_snapshots (
+  week          date    not null,
+  user_id       uuid    not null references users (id) on delete cascade,
+  position      integer not null,
+  xp            integer not null,
+  uses          integer not null,
+  display_name  text,
+  avatar_url    text,
+  primary key (week, user_id)
+);
+
+-- Top-N of a week: WHERE week = $1 AND position <= $n ORDER BY position
+create unique index if not exists weekly_snapshots_week_position_idx
+  on weekly_leaderboard_snapshots (week, position);
+
+create table if not exists weekly_snapshot_runs (
+  week      date        primary key,
+  users     integer     not null,
+  taken_at  timestamptz not null default now()
+);
+
+
+create or replace function snapshot_weekly_leaderboard(p_week date)
+returns table (week date, users integer)
+language plpgsql
+as $$
+declare
+  v_week date := date_trunc('week', p_week)::date;
+  v_n    integer;
+begin
+  -- Serialise concurrent runs for the same week
+  perform pg_advisory_xact_lock(hashtext('weekly_snapshot'), (v_week - date '2000-01-03'));
+
+  delete from weekly_leaderboard_snapshots s where s.week = v_week;
+
+  insert into weekly_leaderboard_snapshots (week, user_id, position, xp, uses, display_name, avatar_url)
+  select v_week, r.key::uuid,
+         row_number() over (order by r.xp desc, r.uses desc, r.key),
+         r.xp, r.uses, u.display_name, u.avatar_url
+  from usage_rollups r
+  join users u on u.id = r.key::uuid
+  where r.period = 'week' and r.dim = 'user' and r.bucket = v_week;
+
+  get diagnostics v_n = row_count;
+
+  -- By constraint name: a bare (week) would clash with the OUT column
+  insert into weekly_snapshot_runs as w (week, users) values (v_week, v_n)
+  on conflict on constraint weekly_snapshot_runs_pkey
+  do update set users = excluded.users, taken_at = now();
+
+  return query select v_week, v_n;
+end;
+$$;
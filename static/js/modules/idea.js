@@ -0,0 +1,84 @@
+// static/js/modules/idea.js
+// ─────────────────────────
+// Idea Checker: check an idea against a market, or generate ideas from the
+// three-step questionnaire. Markup in templates/modules/idea.html.
+
+let ideaMode = 'check';
+
+// ── Questionnaire nav ──
+let ideaQStep = 0;
+const IDEA_STEP_LABELS = ['Step 1 of 3 — Who are you?', 'Step 2 of 3 — What drives you?', 'Step 3 of 3 — Reality check'];
+
+export function ideaNextStep(to) {
+  document.getElementById('idea-qp-' + ideaQStep).classList.remove('active');
+  document.getElementById('idea-dot-' + ideaQStep).classList.remove('active');
+  document.getElementById('idea-dot-' + ideaQStep).classList.add('done');
+  ideaQStep = to;
+  document.getElementById('idea-qp-' + ideaQStep).classList.add('active');
+  document.getElementById('idea-dot-' + ideaQStep).classList.add('active');
+  if (ideaQStep < 3) document.getElementById('idea-dot-' + ideaQStep).classList.remove('done');
+  document.getElementById('idea-q-label').innerText = IDEA_STEP_LABELS[ideaQStep];
+}
+
+export function switchIdeaMode(mode) {
+  ideaMode = mode;
+  document.getElementById('idea-mode-check').classList.toggle('active', mode === 'check');
+  document.getElementById('idea-mode-create').classList.toggle('active', mode === 'create');
+  document.getElementById('idea-tab-check').classList.toggle('active', mode === 'check');
+  document.getElementById('idea-tab-create').classList.toggle('active', mode === 'create');
+  const btn = document.getElementById('idea-submit-btn');
+  if (mode === 'create') {
+    btn.innerText = 'GENERATE IDEAS 💡';
+    btn.dataset.label = 'GENERATE IDEAS 💡';
+    // reset questionnaire to step 0
+    if (ideaQStep !== 0) ideaNextStep(0);
+  } else {
+    btn.innerText = 'CHECK MY IDEA 💡';
+    btn.dataset.label = 'CHECK MY IDEA 💡';
+  }
+}
+
+export async function submitIdea(fresh = false) {
+  const btn = document.getElementById('idea-submit-btn');
+  const comic = document.getElementById('roaster-comic') ? document.getElementById('roaster-comic').value : 'abhishek_upmanyu';
+  setLoading(btn, true);
+  const extra = fresh ? { fresh: true } : {};
+
+  let data;
+  if (ideaMode === 'create') {
+    const skills = document.getElementById('idea-skills').value.trim();
+    const interests = document.getElementById('idea-interests').value.trim();
+    const edge = document.getElementById('idea-edge').value.trim();
+    const role = getChipValue('idea-chips-role');
+    const market = getChipValue('idea-chips-market');
+    const ideaType = getChipValue('idea-chips-type');
+    const time = getChipValue('idea-chips-time');
+    const budget = getChipValue('idea-chips-budget');
+    const team = getChipValue('idea-chips-team');
+    if (!skills || !interests) { setLoading(btn, false); return alert('Fill in at least your skills and interests!'); }
+    data = await callAPI('/api/idea', { mode: 'create', skills, interests, edge, role, market, idea_type: ideaType, time, budget, team, comic, ...extra });
+  } else {
+    const idea = document.getElementById('idea-input').value;
+    const market = document.getElementById('idea-market').value;
+    if (!idea || !market) { setLoading(btn, false); return alert('Fill in all fields!'); }
+    data = await callAPI('/api/idea', { mode: 'check', idea, market, comic, ...extra });
+  }
+
+  setLoading(btn, false);
+  document.getElementById('idea-verdict-waiting').style.display = 'none';
+  document.getElementById('idea-verdict-result').style.display = 'block';
+
+  const raw = data.message || '';
+  if (ideaMode === 'create') {
+    const match = raw.match(/(?:\[CREATED\])([\s\S]*?)$/i);
+    document.getElementById('idea-text').innerText = match ? match[1].trim() : raw;
+  } else {
+    document.getElementById('idea-text').innerText = raw;
+  }
+  showHistoryNote('idea-history-note', data);
+
+  const earned = addXP(30, null, data.stats);
+  document.getElementById('idea-xp').innerText = `+${earned} XP earned!`;
+  showXPFloat(earned, btn);
+  document.getElementById('idea-share-btn').classList.add('visible');
+}
@@ -0,0 +1,207 @@
+// static/js/modules/leaderboard.js
+// ────────────────────────────────
+// Leaderboard panel: global / weekly boards (pushed live over SSE while the
+// panel is open) and the personal stats tab. Markup in
+// templates/modules/leaderboard.html; loaded by the first openLeaderboard().
+
+const LB_LEVEL_NAMES = ['FRESHER', 'INTERN', 'JUNIOR', 'SENIOR', 'LEAD', 'WIZARD'];
+const LB_LEVEL_THRESHOLDS = [0, 150, 350, 700, 1200, 2000];
+function getLevelName(xp) {
+  for (let i = LB_LEVEL_THRESHOLDS.length - 1; i >= 0; i--) {
+    if (xp >= LB_LEVEL_THRESHOLDS[i]) return LB_LEVEL_NAMES[i];
+  }
+  return 'FRESHER';
+}
+function rankEmoji(r) { return r === 1 ? '🥇' : r === 2 ? '🥈' : r === 3 ? '🥉' : r; }
+function rankClass(r) { return r <= 3 ? `top-${r}` : ''; }
+
+function buildLbRow(entry) {
+  const avatar = entry.avatar_url
+    ? `<img class="lb-avatar" src="${entry.avatar_url}" alt="av"/>`
+    : `<div class="lb-avatar-placeholder">👤</div>`;
+  return `<div class="lb-row ${rankClass(entry.rank)}">
+    <div class="lb-rank">${rankEmoji(entry.rank)}</div>
+    ${avatar}
+    <div class="lb-info">
+      <div class="lb-name">${entry.display_name || 'Anonymous'}</div>
+      <div class="lb-level">${getLevelName(entry.xp)}</div>
+    </div>
+    <div style="text-align:right">
+      <div class="lb-xp">${entry.xp}</div>
+      <div class="lb-xp-label">XP</div>
+    </div>
+  </div>`;
+}
+
+const ALL_ACHIEVEMENTS = [
+  { id: 'first_blood', icon: '🩸', name: 'First Blood' },
+  { id: 'financially_deceased', icon: '💀', name: 'Financially Deceased' },
+  { id: 'anvil_veteran', icon: '⚡', name: 'ANVIL Veteran' },
+  { id: 'resume_arc', icon: '📄', name: 'Resume Arc' },
+  { id: 'comic_collector', icon: '🎭', name: 'Comic Collector' },
+  { id: 'clown_input', icon: '🤡', name: 'Clown Input' },
+  { id: 'seven_day_streak', icon: '🔥', name: '7 Day Streak' },
+  { id: 'stack_overflowed', icon: '⚙️', name: 'Stack Overflowed' },
+  { id: 'idea_assassin', icon: '🗡️', name: 'Idea Assassin' },
+  { id: 'xp_hoarder', icon: '💰', name: 'XP Hoarder' },
+  { id: 'comeback_kid', icon: '🔄', name: 'Comeback Kid' },
+  { id: 'showoff', icon: '📢', name: 'Showoff' },
+];
+
+const LB_EMPTY = {
+  global: '// no warriors yet. be the first.',
+  weekly: '// nobody has grinded this week yet.',
+};
+
+function renderLb(tab, data) {
+  document.getElementById(`lb-${tab}-loading`).style.display = 'none';
+  document.getElementById(`lb-${tab}-list`).innerHTML = data.length
+    ? data.map(buildLbRow).join('')
+    : `<div class="lb-empty">${LB_EMPTY[tab]}</div>`;
+}
+
+async function loadGlobalLb() {
+  try {
+    const res = await fetch('/api/leaderboard');
+    renderLb('global', await res.json());
+  } catch (e) {
+    document.getElementById('lb-global-loading').innerText = '// failed to load. try again.';
+  }
+}
+
+async function loadWeeklyLb() {
+  try {
+    const res = await fetch('/api/leaderboard/weekly');
+    renderLb('weekly', await res.json());
+  } catch (e) {
+    document.getElementById('lb-weekly-loading').innerText = '// failed to load. try again.';
+  }
+}
+
+// While the panel is open the server pushes fresh boards (and our own
+// rank when it moves) instead of us re-fetching. If the stream is
+// refused (503, too many viewers) the fetches above still work.
+let lbStream = null;
+
+function openLbStream() {
+  if (lbStream || !window.EventSource) return;
+  lbStream = new EventSource('/api/leaderboard/stream');
+  lbStream.addEventListener('board', e => {
+    const board = JSON.parse(e.data);
+    renderLb('global', board.global);
+    renderLb('weekly', board.weekly);
+    lbLoaded.global = lbLoaded.weekly = true;
+  });
+  lbStream.addEventListener('rank', e => {
+    const me = JSON.parse(e.data);
+    const el = document.querySelector('.lb-personal-rank');
+    if (!el) return;
+    const moved = me.delta > 0 ? ` ▲${me.delta}` : me.delta < 0 ? ` ▼${-me.delta}` : '';
+    el.textContent = `// GLOBAL RANK #${me.rank}${moved} · ${getLevelName(me.xp)}`;
+  });
+}
+
+function closeLbStream() {
+  if (lbStream) { lbStream.close(); lbStream = null; }
+}
+
+async function loadPersonalLb() {
+  const content = document.getElementById('lb-personal-content');
+  if (!window.__anvilUser) {
+    // Guest — show local stats with Anonymous
+    const unlockedIds = new Set();
+    const achievementsHtml = ALL_ACHIEVEMENTS.map(a =>
+      `<div class="lb-achievement locked">
+        <span class="lb-achievement-icon">${a.icon}</span>
+        <span>${a.name}</span>
+      </div>`).join('');
+    content.innerHTML = `<div class="lb-personal-wrap">
+      <div class="lb-personal-card">
+        <div>
+          <div class="lb-personal-name">ANONYMOUS</div>
+          <div class="lb-personal-rank">// GLOBAL RANK #— · ${getLevelName(xp)}</div>
+        </div>
+      </div>
+      <div class="lb-personal-stats">
+        <div class="lb-stat-box"><div class="lb-stat-num" style="color:var(--accent)">${xp}</div><div class="lb-stat-label">Total XP</div></div>
+        <div class="lb-stat-box"><div class="lb-stat-num" style="color:#ff6b35">${streak}🔥</div><div class="lb-stat-label">Streak</div></div>
+        <div class="lb-stat-box"><div class="lb-stat-num" style="color:#00e5ff">${uses}</div><div class="lb-stat-label">Tools Used</div></div>
+      </div>
+      <div class="lb-achievements-title">// achievements</div>
+      <div class="lb-achievements-grid">${achievementsHtml}</div>
+      <div style="margin-top:20px;text-align:center;">
+        <p style="font-family:var(--mono);font-size:11px;color:var(--text-dim);margin-bottom:12px;">// sign in to save your rank and unlock achievements</p>
+        <button class="lb-signin-btn" onclick="window.location.href='/auth/login'">⬡ SIGN IN WITH GOOGLE</button>
+      </div>
+    </div>`;
+    return;
+  }
+  content.innerHTML = '<div class="lb-loading">// loading your stats...</div>';
+  try {
+    const res = await fetch('/api/leaderboard/personal');
+    const d = await res.json();
+    // Get name + avatar from the meta tag Flask injected — API only returns stats
+    const userMeta = document.getElementById('anvil-user-meta');
+    const userName = userMeta ? userMeta.dataset.name : 'Anonymous';
+    const userAvatar = userMeta ? userMeta.dataset.avatar : '';
+    const unlockedIds = new Set((d.achievements || []).map(a => a.achievement_id));
+    const achievementsHtml = ALL_ACHIEVEMENTS.map(a =>
+      `<div class="lb-achievement ${unlockedIds.has(a.id) ? '' : 'locked'}">
+        <span class="lb-achievement-icon">${a.icon}</span>
+        <span>${a.name}</span>
+      </div>`).join('');
+    content.innerHTML = `<div class="lb-personal-wrap">
+      <div class="lb-personal-card">
+        <img class="lb-personal-avatar" src="${userAvatar}" alt="av" onerror="this.style.display='none'"/>
+        <div>
+          <div class="lb-personal-name">${userName}</div>
+          <div class="lb-personal-rank">// GLOBAL RANK #${d.rank || '—'} · ${getLevelName(d.xp)}</div>
+        </div>
+      </div>
+      <div class="lb-personal-stats">
+        <div class="lb-stat-box"><div class="lb-stat-num" style="color:var(--accent)">${d.xp}</div><div class="lb-stat-label">Total XP</div></div>
+        <div class="lb-stat-box"><div class="lb-stat-num" style="color:#ff6b35">${d.streak}🔥</div><div class="lb-stat-label">Streak</div></div>
+        <div class="lb-stat-box"><div class="lb-stat-num" style="color:#00e5ff">${d.tools_used}</div><div class="lb-stat-label">Tools Used</div></div>
+      </div>
+      <div class="lb-achievements-title">// achievements</div>
+      <div class="lb-achievements-grid">${achievementsHtml}</div>
+    </div>`;
+  } catch (e) {
+    content.innerHTML = '<div class="lb-empty">// failed to load your stats.</div>';
+  }
+}
+
+let lbLoaded = { global: false, weekly: false, personal: false };
+
+export function openLeaderboard() {
+  document.getElementById('lbOverlay').classList.add('active');
+  if (!lbLoaded.global) { loadGlobalLb(); lbLoaded.global = true; }
+  openLbStream();
+}
+
+export function closeLeaderboard() {
+  document.getElementById('lbOverlay').classList.remove('active');
+  closeLbStream();
+}
+
+export function switchLbTab(tab) {
+  ['global', 'weekly', 'personal'].forEach(t => {
+    document.getElementById(`lb-${t}`).classList.toggle('active', t === tab);
+    document.getElementById(`lb-tab-${t}`).classList.toggle('active', t === tab);
+  });
+  if (tab === 'weekly' && !lbLoaded.weekly) { loadWeeklyLb(); lbLoaded.weekly = true; }
+  if (tab === 'personal' && !lbLoaded.personal) { loadPersonalLb(); lbLoaded.personal = true; }
+}
+
+export function init() {
+  document.addEventListener('keydown', e => { if (e.key === 'Escape') closeLeaderboard(); });
+  // The service worker re-validated a board we have already rendered
+  if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.addEventListener('message', e => {
+      if (!e.data || e.data.type !== 'anvil-swr') return;
+      if (e.data.url === '/api/leaderboard' && lbLoaded.global) loadGlobalLb();
+      if (e.data.url === '/api/leaderboard/weekly' && lbLoaded.weekly) loadWeeklyLb();
+      if (e.data.url === '/api/leaderboard/personal' && lbLoaded.personal) loadPersonalLb();
+    });
+  }
+}
@@ -0,0 +1,679 @@
+// static/js/modules/linkedin.js
+// ─────────────────────────────
+// LinkedIn Reality Check: check / create for posts, headlines and
+// connection requests, plus the two-pass PDF profile analysis and its
+// question popup. Markup in templates/modules/linkedin.html.
+
+export function switchLinkedInType(type) {
+  document.getElementById('linkedin-type').value = type;
+  const labels = {
+    post: 'Your LinkedIn Post',
+    headline: 'Your LinkedIn Headline',
+    connection_request: 'Your Connection Request Message'
+  };
+  const placeholders = {
+    post: 'Paste your LinkedIn post here...',
+    headline: 'Paste your LinkedIn headline here...',
+    connection_request: 'Paste your connection request message here...'
+  };
+  document.getElementById('linkedin-content-label').innerText = labels[type] || 'Your Content';
+  document.getElementById('linkedin-content').placeholder = placeholders[type] || 'Paste your content here...';
+  ['post', 'headline', 'connect'].forEach(t => {
+    const btnId = 'btn-li-' + t;
+    const el = document.getElementById(btnId);
+    if (el) el.classList.remove('active');
+  });
+  const activeId = type === 'connection_request' ? 'btn-li-connect' : 'btn-li-' + type;
+  const activeEl = document.getElementById(activeId);
+  if (activeEl) activeEl.classList.add('active');
+}
+
+// ── LINKEDIN ──
+let liMode = 'check'; // 'check' | 'create'
+let liCreateType = 'post';
+
+export function switchLiMode(mode) {
+  liMode = mode;
+  document.getElementById('li-mode-check').classList.toggle('active', mode === 'check');
+  document.getElementById('li-mode-create').classList.toggle('active', mode === 'create');
+  document.getElementById('li-tab-check').classList.toggle('active', mode === 'check');
+  document.getElementById('li-tab-create').classList.toggle('active', mode === 'create');
+
+  // PDF right panel only shows when actively processing a PDF
+  const verdictPanel = document.getElementById('verdict-panel');
+  const pdfRightPanel = document.getElementById('pdf-right-panel');
+  verdictPanel.style.display = '';
+  pdfRightPanel.style.display = 'none';
+  stopPdfQuips();
+  document.getElementById('pdf-spinner-wrap').classList.remove('visible');
+
+  const sub = document.getElementById('li-modal-sub');
+  const btn = document.getElementById('li-submit-btn');
+  if (mode === 'create') {
+    sub.innerText = '// tell us what you want to say. we\'ll write it.';
+    btn.innerText = 'WRITE IT 💼';
+    btn.dataset.label = 'WRITE IT 💼';
+  } else {
+    sub.innerText = '// paste it. we\'ll tell you if it slaps or flops.';
+    btn.innerText = 'CHECK IT 💼';
+    btn.dataset.label = 'CHECK IT 💼';
+  }
+}
+
+export function switchLinkedInCreateType(type) {
+  document.getElementById('linkedin-create-type').value = type;
+  ['post', 'bio', 'headline', 'connect'].forEach(t => {
+    const id = `btn-li-create-${t}`;
+    const el = document.getElementById(id);
+    if (el) el.classList.toggle('active', t === type || (type === 'connection_request' && t === 'connect'));
+  });
+  const labels = {
+    post: 'What do you want to say?',
+    bio: 'Tell us about yourself',
+    headline: 'What do you do?',
+    connection_request: 'Why are you reaching out?'
+  };
+  const placeholders = {
+    post: 'e.g. I just shipped my first open source project, want to share it without sounding like a corporate drone...',
+    bio: 'e.g. CSE student at PTU, building ANVIL — an AI roast platform. Interested in backend and developer tools...',
+    headline: 'e.g. Backend dev, building with Flask and Groq. Open to internships.',
+    connection_request: 'e.g. I want to reach out to a startup founder whose YC application video I watched — want to ask about their early days.'
+  };
+  document.getElementById('li-intent-label').innerText = labels[type] || labels['post'];
+  document.getElementById('linkedin-intent').placeholder = placeholders[type] || placeholders['post'];
+}
+
+// Smart dispatcher — routes to submitPdf if PDF is chosen, else submitLinkedIn
+export function submitLinkedInSmart() {
+  // Fallback: if user drag-dropped onto the invisible <input>, pdfFile may not be set
+  if (!pdfFile) {
+    const inp = document.getElementById('pdf-file-input');
+    if (inp && inp.files && inp.files[0]) {
+      pdfFile = inp.files[0];
+      const chosen = document.getElementById('pdf-file-chosen');
+      if (chosen) { chosen.style.display = 'block'; chosen.textContent = '✓ ' + pdfFile.name; }
+    }
+  }
+  if (liMode === 'check' && pdfFile) {
+    submitPdf();
+  } else {
+    submitLinkedIn();
+  }
+}
+
+// The text result's regenerate button — skips history, never re-reads a chosen PDF
+export function regenerateLinkedIn() { submitLinkedIn(true); }
+
+async function submitLinkedIn(fresh = false) {
+  const btn = document.getElementById('li-submit-btn');
+  const comic = document.getElementById('roaster-comic').value;
+  setLoading(btn, true);
+  const extra = fresh ? { fresh: true } : {};
+
+  let data;
+  if (liMode === 'create') {
+    const intent = document.getElementById('linkedin-intent').value.trim();
+    if (!intent) { setLoading(btn, false); return alert('Tell us what you want to say first!'); }
+    const content_type = document.getElementById('linkedin-create-type').value;
+    data = await callAPI('/api/linkedin', { mode: 'create', intent, content_type, comic, ...extra });
+  } else {
+    const content = document.getElementById('linkedin-content').value.trim();
+    const content_type = document.getElementById('linkedin-type').value;
+    if (!content) { setLoading(btn, false); return alert('Paste your LinkedIn content first!'); }
+    data = await callAPI('/api/linkedin', { mode: 'check', content, content_type, comic, ...extra });
+  }
+
+  setLoading(btn, false);
+  btn.innerText = liMode === 'create' ? 'WRITE IT 💼' : 'CHECK IT 💼';
+  document.getElementById('verdict-waiting').style.display = 'none';
+  document.getElementById('verdict-result').style.display = 'block';
+
+  const raw = data.message || '';
+
+  if (liMode === 'create') {
+    const createdMatch = raw.match(/(?:\[CREATED\])([\s\S]*?)$/i);
+    const createdText = createdMatch ? createdMatch[1].trim() : raw;
+    document.getElementById('roaster-text').innerText = createdText;
+    document.getElementById('linkedin-verdict-label').innerText = '// ready to copy and paste ↑';
+    document.getElementById('linkedin-fixed-text').innerText = '';
+  } else {
+    const verdictMatch = raw.match(/(?:\[VERDICT\]|#\s*VERDICT)([\s\S]*?)(?=(?:\[FIXED\]|#\s*FIXED)|$)/i);
+    const fixedMatch = raw.match(/(?:\[FIXED\]|#\s*FIXED)([\s\S]*?)$/i);
+    document.getElementById('roaster-text').innerText = verdictMatch ? verdictMatch[1].trim() : raw;
+    const fixedText = fixedMatch ? fixedMatch[1].trim() : '';
+    if (fixedText) {
+      document.getElementById('linkedin-fixed-text').innerText = fixedText;
+      document.getElementById('linkedin-verdict-label').innerText = '// fixed version ↓';
+    }
+  }
+  showHistoryNote('linkedin-history-note', data);
+
+  const earned = addXP(25, null, data.stats);
+  document.getElementById('roaster-xp').innerText = `+${earned} XP earned!`;
+  showXPFloat(earned, btn);
+  document.getElementById('roaster-share-btn').classList.add('visible');
+}
+
+// ══════════════════════════════════════════════
+// PDF — Two-Pass LinkedIn PDF Analysis
+// Call 1 (quips) + Call 2 (questions) fire in parallel on PDF upload
+// Call 3 (analyse) fires after the popup question flow completes
+// ════════════════════════════════════════════════════════════════
+
+let pdfFile = null;
+let pdfQuipTimer = null;
+let pdfQuipStep = 0;
+let pdfQuipSteps = [];   // profile-specific quips from Call 1
+let pdfScanQuestions = [];   // targeted questions from Call 2
+let pdfAnswers = {};   // collected answers from popup flow
+let pdfCurrentQ = 0;    // current popup question index
+
+// File input change handler
+export function pdfFileChosen(input) {
+  if (input.files && input.files[0]) {
+    pdfFile = input.files[0];
+    const chosen = document.getElementById('pdf-file-chosen');
+    if (chosen) { chosen.style.display = 'block'; chosen.textContent = '✓ ' + pdfFile.name; }
+  }
+}
+
+// Drag-and-drop wiring
+function wirePdfDropZone() {
+  const zone = document.getElementById('pdf-drop-zone');
+  if (!zone) return;
+  const inp = document.getElementById('pdf-file-input');
+  zone.addEventListener('dragover', e => { e.preventDefault(); zone.classList.add('dragover'); });
+  zone.addEventListener('dragleave', () => zone.classList.remove('dragover'));
+  zone.addEventListener('drop', e => {
+    e.preventDefault();
+    zone.classList.remove('dragover');
+    const file = e.dataTransfer.files[0];
+    if (file && file.type === 'application/pdf') {
+      pdfFile = file;
+      const chosen = document.getElementById('pdf-file-chosen');
+      if (chosen) { chosen.style.display = 'block'; chosen.textContent = '✓ ' + file.name; }
+    }
+  });
+  // Also wire the input itself — browser may route drop events here instead of the parent div
+  if (inp) {
+    inp.addEventListener('drop', e => {
+      e.preventDefault();
+      zone.classList.remove('dragover');
+      const file = e.dataTransfer.files[0];
+      if (file && file.type === 'application/pdf') {
+        pdfFile = file;
+        const chosen = document.getElementById('pdf-file-chosen');
+        if (chosen) { chosen.style.display = 'block'; chosen.textContent = '✓ ' + file.name; }
+      }
+    });
+  }
+}
+
+// Fallback quips — used only while Call 1 is still loading
+const PDF_FALLBACK_QUIPS = [
+  { section: 'Reading Profile', quip: "Dekh raha hoon... ek second." },
+  { section: 'Scanning Sections', quip: "Headline, About, Experience — sab padh raha hoon." },
+  { section: 'Finding Gaps', quip: "Kahan se information missing hai, dhoondh raha hoon." },
+  { section: 'Almost Done', quip: "Bas thoda aur..." },
+];
+
+function parsePdfQuips(raw) {
+  const regex = /\[QUIP:\s*section=([^|]+)\|\s*quip=([^\]]+)\]/g;
+  const quips = [];
+  let m;
+  while ((m = regex.exec(raw)) !== null) {
+    quips.push({ section: m[1].trim(), quip: m[2].trim() });
+  }
+  return quips;
+}
+
+function parsePdfQuestions(raw) {
+  const regex = /\[QUESTION:\s*([^|\]]+)\|([^|\]]+)\|([^\]]+)\]/g;
+  const questions = [];
+  let m;
+  while ((m = regex.exec(raw)) !== null) {
+    questions.push({
+      id: m[1].trim(),
+      label: m[2].trim(),
+      placeholder: m[3].trim(),
+    });
+  }
+  return questions;
+}
+
+// ── Quip animation ──────────────────────────────────────────────────────
+
+const PDF_PILL_MAP = {
+  'headline': 'ppill-headline',
+  'about': 'ppill-about',
+  'experience': 'ppill-exp',
+  'skills': 'ppill-skills',
+  'education': 'ppill-edu',
+  'certifications': 'ppill-certs',
+};
+
+function startPdfQuips(steps) {
+  if (pdfQuipTimer) clearInterval(pdfQuipTimer);
+  pdfQuipStep = 0;
+  const stepsArr = (steps && steps.length) ? steps : PDF_FALLBACK_QUIPS;
+  document.querySelectorAll('.pdf-pill').forEach(p => p.className = 'pdf-pill');
+  document.querySelectorAll('.pdf-quip-dot').forEach((d, i) => d.classList.toggle('active', i === 0));
+
+  function step() {
+    if (pdfQuipStep >= stepsArr.length) return;
+    const s = stepsArr[pdfQuipStep];
+    const txt = document.getElementById('pdf-quip-text');
+    txt.classList.add('fade');
+    setTimeout(() => {
+      document.getElementById('pdf-quip-section').textContent = s.section;
+      txt.textContent = s.quip;
+      txt.classList.remove('fade');
+      // Highlight matching pill
+      const key = s.section.toLowerCase().replace(/^(scanning|reading)\s+/, '').trim();
+      const pillId = PDF_PILL_MAP[key];
+      if (pillId) {
+        const pill = document.getElementById(pillId);
+        if (pill) pill.className = 'pdf-pill scanning';
+      }
+      // Mark previous as done
+      if (pdfQuipStep > 0) {
+        const prevKey = stepsArr[pdfQuipStep - 1].section.toLowerCase().replace(/^(scanning|reading)\s+/, '').trim();
+        const prevId = PDF_PILL_MAP[prevKey];
+        if (prevId) {
+          const prev = document.getElementById(prevId);
+          if (prev) prev.className = 'pdf-pill done';
+        }
+      }
+      document.querySelectorAll('.pdf-quip-dot').forEach((d, i) => d.classList.toggle('active', i === pdfQuipStep));
+      pdfQuipStep++;
+    }, 300);
+  }
+  step();
+  pdfQuipTimer = setInterval(step, 4000);
+}
+
+function stopPdfQuips() {
+  if (pdfQuipTimer) { clearInterval(pdfQuipTimer); pdfQuipTimer = null; }
+}
+
+function pdfShowSpinner() {
+  document.getElementById('pdf-right-panel').style.display = 'block';
+  document.getElementById('pdf-spinner-wrap').classList.add('visible');
+  document.getElementById('pdf-q-wrap').classList.remove('visible');
+  document.getElementById('pdf-output-wrap').classList.remove('visible');
+  document.getElementById('pdf-output-wrap').innerHTML = '';
+}
+
+function pdfHideSpinner() {
+  stopPdfQuips();
+  document.getElementById('pdf-spinner-wrap').classList.remove('visible');
+}
+
+// ── Popup question flow ─────────────────────────────────────────────────
+
+function pdfShowQuestion(index) {
+  const q = pdfScanQuestions[index];
+  if (!q) return;
+  const total = pdfScanQuestions.length;
+
+  document.getElementById('pdfQCounter').textContent = `// ${index + 1} of ${total}`;
+  // Section label: use q.section if present, else derive from question id
+  document.getElementById('pdfQSection').textContent = 'Reading ' + (q.section || 'Profile');
+
+  // Find the best matching quip for this section
+  const matchedQuip = pdfQuipSteps.find(s =>
+    s.section && q.section &&
+    s.section.toLowerCase().includes(q.section.toLowerCase().split(/\s+/)[0])
+  ) || pdfQuipSteps[index] || null;
+  document.getElementById('pdfQQuip').textContent = matchedQuip
+    ? matchedQuip.quip
+    : 'Tere baare mein thoda aur jaanna chahta hoon...';
+
+  document.getElementById('pdfQLabel').textContent = q.label;
+  const input = document.getElementById('pdfQInput');
+  input.placeholder = q.placeholder || '';
+  input.value = '';
+
+  document.getElementById('pdfQOverlay').classList.add('show');
+  setTimeout(() => input.focus(), 280);
+}
+
+function pdfAdvanceQuestion(skip) {
+  const q = pdfScanQuestions[pdfCurrentQ];
+  if (q && !skip) {
+    const val = document.getElementById('pdfQInput').value.trim();
+    if (val) pdfAnswers[q.id] = val;
+  }
+  pdfCurrentQ++;
+  if (pdfCurrentQ < pdfScanQuestions.length) {
+    // Slide out then show next
+    document.getElementById('pdfQOverlay').classList.remove('show');
+    setTimeout(() => pdfShowQuestion(pdfCurrentQ), 260);
+  } else {
+    document.getElementById('pdfQOverlay').classList.remove('show');
+    setTimeout(() => pdfRunAnalysis(), 300);
+  }
+}
+
+// Wire up popup Enter key + Skip button
+function initPdfPopup() {
+  const input = document.getElementById('pdfQInput');
+  const skipBtn = document.getElementById('pdfQSkipBtn');
+  if (input) {
+    input.addEventListener('keydown', e => {
+      if (e.key === 'Enter' && !e.shiftKey) { e.preventDefault(); pdfAdvanceQuestion(false); }
+    });
+  }
+  if (skipBtn) {
+    skipBtn.addEventListener('click', () => pdfAdvanceQuestion(true));
+  }
+}
+
+// ── CALL 1 + CALL 2 (parallel) ──────────────────────────────────────────
+
+async function submitPdf() {
+  if (!pdfFile) { alert('Upload your LinkedIn PDF first!'); return; }
+
+  const btn = document.getElementById('li-submit-btn');
+  btn.disabled = true;
+  btn.innerHTML = '<span class="spinner"></span> READING PDF...';
+
+  pdfShowSpinner();
+  startPdfQuips(PDF_FALLBACK_QUIPS);   // start with fallback immediately
+  pdfAnswers = {};
+  pdfCurrentQ = 0;
+  pdfScanQuestions = [];
+  pdfQuipSteps = [];
+
+  const comic = document.getElementById('roaster-comic').value;
+
+  function makeForm(mode) {
+    const fd = new FormData();
+    fd.append('pdf', pdfFile);
+    fd.append('comic', comic);
+    fd.append('mode', mode);
+    return fd;
+  }
+
+  try {
+    // Fire both in parallel
+    const [quipsRes, scanRes] = await Promise.all([
+      fetch('/api/linkedin-pdf', { method: 'POST', body: makeForm('quips') }),
+      fetch('/api/linkedin-pdf', { method: 'POST', body: makeForm('scan') }),
+    ]);
+    const [quipsData, scanData] = await Promise.all([quipsRes.json(), scanRes.json()]);
+
+    // Swap in real profile-specific quips
+    if (!quipsData.error && quipsData.message) {
+      const parsed = quipsData.quips || parsePdfQuips(quipsData.message);
+      if (parsed.length > 0) {
+        pdfQuipSteps = parsed;
+        stopPdfQuips();
+        startPdfQuips(pdfQuipSteps);
+      }
+    }
+
+    // Handle questions
+    if (scanData.error) {
+      pdfHideSpinner();
+      document.getElementById('pdf-output-wrap').innerHTML =
+        '<div style="padding:20px;font-family:var(--mono);font-size:12px;color:#ff6b6b;border-left:3px solid #ff6b6b;">// ' + escHtml(scanData.error) + '</div>';
+      document.getElementById('pdf-output-wrap').classList.add('visible');
+      btn.disabled = false;
+      btn.innerHTML = 'CHECK IT 💼';
+      return;
+    }
+
+    pdfScanQuestions = scanData.questions || parsePdfQuestions(scanData.message || '');
+
+    // Let quips breathe for 3s before showing first question
+    setTimeout(() => {
+      pdfHideSpinner();
+      if (pdfScanQuestions.length === 0) {
+        pdfRunAnalysis();
+      } else {
+        pdfCurrentQ = 0;
+        pdfShowQuestion(0);
+      }
+    }, 3000);
+
+  } catch (e) {
+    pdfHideSpinner();
+    document.getElementById('pdf-output-wrap').innerHTML =
+      '<div style="padding:20px;font-family:var(--mono);font-size:12px;color:#ff6b6b;">// Something went wrong. Try again.</div>';
+    document.getElementById('pdf-output-wrap').classList.add('visible');
+  }
+
+  btn.disabled = false;
+  btn.innerHTML = 'CHECK IT 💼';
+}
+
+// ── CALL 3: Full analysis with collected answers ─────────────────────────
+
+// Long analyses run as server-side jobs — poll until the result is ready.
+// Survives flaky connections: a failed poll just retries on the next tick.
+async function pollJob(jobId, intervalMs = 1500) {
+  while (true) {
+    await new Promise(r => setTimeout(r, intervalMs));
+    try {
+      const res = await fetch('/api/jobs/' + jobId);
+      if (res.status === 404) return { error: 'Analysis expired. Please try again.' };
+      const job = await res.json();
+      if (job.status === 'done') return job.result;
+      if (job.status === 'error' || job.status === 'cancelled') return { error: job.error || 'Analysis failed. Try again.' };
+    } catch (e) { /* network blip — keep polling */ }
+  }
+}
+
+async function pdfRunAnalysis(fresh = false) {
+  if (!pdfFile) { alert('PDF not found. Please re-upload.'); return; }
+
+  const mainBtn = document.getElementById('li-submit-btn');
+  mainBtn.disabled = true;
+  showHistoryNote('pdf-history-note', {});
+
+  pdfShowSpinner();
+  startPdfQuips(pdfQuipSteps.length ? pdfQuipSteps : PDF_FALLBACK_QUIPS);
+
+  const comic = document.getElementById('roaster-comic').value;
+
+  try {
+    const formData = new FormData();
+    formData.append('pdf', pdfFile);
+    formData.append('comic', comic);
+    formData.append('mode', 'analyse');
+    Object.entries(pdfAnswers).forEach(([qid, val]) => {
+      if (val && val.trim()) formData.append('answer_' + qid, val.trim());
+    });
+
+    formData.append('async', '1');
+    if (fresh) formData.append('fresh', '1');
+
+    const res = await fetch('/api/linkedin-pdf', { method: 'POST', body: formData });
+    let data = await res.json();
+    if (data.job_id) data = await pollJob(data.job_id);
+
+    pdfHideSpinner();
+
+    if (data.error) {
+      document.getElementById('pdf-output-wrap').innerHTML =
+        '<div style="padding:20px;font-family:var(--mono);font-size:12px;color:#ff6b6b;border-left:3px solid #ff6b6b;">// ' + escHtml(data.error) + '</div>';
+      document.getElementById('pdf-output-wrap').classList.add('visible');
+    } else {
+      renderPdfOutput(data.message || '', data.issues);
+      showHistoryNote('pdf-history-note', data);
+      const earned = addXP(30, null, data.stats);
+      showXPFloat(earned, mainBtn);
+    }
+  } catch (e) {
+    pdfHideSpinner();
+    document.getElementById('pdf-output-wrap').innerHTML =
+      '<div style="padding:20px;font-family:var(--mono);font-size:12px;color:#ff6b6b;">// Something went wrong. Try again.</div>';
+    document.getElementById('pdf-output-wrap').classList.add('visible');
+  }
+
+  mainBtn.disabled = false;
+  mainBtn.innerHTML = 'CHECK IT 💼';
+}
+
+// Legacy alias kept for the "Analyse Now" button in pdf-q-wrap; true = regenerate
+export async function submitPdfAnalyse(fresh = false) { await pdfRunAnalysis(fresh); }
+
+
+// `parsed` is the server-validated issue list; the regex parse below is
+// only a fallback for responses that predate it.
+function renderPdfOutput(raw, parsed) {
+  // Split on [SECTION: — each chunk is one issue block
+  const chunks = parsed ? [] : raw.split(/(?=\[SECTION:)/);
+  const issues = parsed ? parsed.slice() : [];
+  const fieldRe = {
+    section:  /\[SECTION:\s*([\s\S]*?)\]/,
+    priority: /\[PRIORITY:\s*([\s\S]*?)\]/,
+    issue:    /\[ISSUE:\s*([\s\S]*?)\]/,
+    was:      /\[WAS:\s*([\s\S]*?)\](?=\s*\[(?:NOW|SECTION|PRIORITY|ISSUE):|$)/,
+    now:      /\[NOW:\s*([\s\S]*?)\](?=\s*\[(?:SECTION|PRIORITY|ISSUE|WAS):|$)/,
+  };
+  chunks.forEach(chunk => {
+    chunk = chunk.trim();
+    if (!chunk.startsWith('[SECTION:')) return;
+    const get = key => { const m = fieldRe[key].exec(chunk); return m ? m[1].trim() : ''; };
+    const section  = get('section');
+    const priority = get('priority');
+    const issue    = get('issue');
+    const was      = get('was');
+    const now      = get('now');
+    if (section && priority) issues.push({ section, priority, issue, was, now });
+  });
+
+  if (issues.length === 0) {
+    document.getElementById('pdf-output-wrap').innerHTML =
+      '<div style="padding:20px;font-family:var(--mono);font-size:12px;color:var(--text);line-height:1.7;white-space:pre-wrap;">' + escHtml(raw) + '</div>';
+    document.getElementById('pdf-output-wrap').classList.add('visible');
+    return;
+  }
+
+  const high = issues.filter(i => i.priority.toLowerCase() === 'high');
+  const med = issues.filter(i => i.priority.toLowerCase() === 'medium');
+  const low = issues.filter(i => i.priority.toLowerCase() === 'low');
+
+  let totalAdd = 0, totalRem = 0;
+  issues.forEach(i => {
+    totalAdd += i.now.split('\n').length;
+    totalRem += i.was.split('\n').length;
+  });
+
+  let html = '';
+
+  // Summary bar
+  html += '<div class="pdf-summary-bar">';
+  html += '<div class="pdf-summary-left">';
+  html += '<div><div class="pdf-issue-count">' + issues.length + '</div><div class="pdf-issue-label">Issues Found</div></div>';
+  html += '<div class="pdf-priority-pills">';
+  if (high.length) html += '<span class="pdf-pri-pill pdf-pri-high">' + high.length + ' High</span>';
+  if (med.length) html += '<span class="pdf-pri-pill pdf-pri-med">' + med.length + ' Medium</span>';
+  if (low.length) html += '<span class="pdf-pri-pill pdf-pri-low">' + low.length + ' Low</span>';
+  html += '</div></div>';
+  html += '<div class="pdf-summary-right">';
+  html += '<div class="pdf-diff-stats"><span class="pdf-diff-add">+' + totalAdd + ' lines</span><span class="pdf-diff-rem">−' + totalRem + ' lines</span></div>';
+  html += '<button class="pdf-copy-all-btn" onclick="pdfCopyAll()">Copy All →</button>';
+  html += '</div></div>';
+
+  function renderGroup(group, label) {
+    if (!group.length) return '';
+    let g = '<div class="pdf-sec-divider">' + label + '</div>';
+    group.forEach((issue, idx) => {
+      const pri = issue.priority.toLowerCase();
+      const dotCls = 'pdf-dot-' + (pri === 'high' ? 'high' : pri === 'medium' ? 'med' : 'low');
+      const lineCls = 'pdf-dot-line-' + (pri === 'high' ? 'high' : pri === 'medium' ? 'med' : 'low');
+      const tagCls = 'pdf-tag-' + (pri === 'high' ? 'high' : pri === 'medium' ? 'med' : 'low');
+      const priLabel = pri.charAt(0).toUpperCase() + pri.slice(1);
+      const uid = 'pdi-' + label.replace(/\s/g, '') + idx;
+      g += '<div class="pdf-issue-card" id="card-' + uid + '">';
+      g += '<div class="pdf-card-head">';
+      g += '<div class="pdf-priority-col"><div class="pdf-dot ' + dotCls + '"></div><div class="pdf-dot-line ' + lineCls + '"></div></div>';
+      g += '<div class="pdf-card-body">';
+      g += '<div class="pdf-card-top">';
+      g += '<span class="pdf-card-section">' + escHtml(issue.section) + '</span>';
+      g += '<span class="pdf-card-tag ' + tagCls + '">' + priLabel + '</span>';
+      g += '</div>';
+      g += '<div class="pdf-card-roast">' + escHtml(issue.issue) + '</div>';
+      g += '</div>';
+      g += '<button class="pdf-compare-btn" onclick="pdfToggleCompare(this)">Compare</button>';
+      g += '</div>';
+      g += '<div class="pdf-diff-grid" id="dg-' + uid + '">';
+      g += '<div class="pdf-diff-old" id="old-' + uid + '">';
+      g += '<div class="pdf-col-label pdf-col-was">✕ Was</div>';
+      g += '<div class="pdf-old-text">' + escHtml(issue.was) + '</div>';
+      g += '</div>';
+      g += '<div class="pdf-diff-new">';
+      g += '<div class="pdf-col-label pdf-col-now"><span>✓ ANVIL Rewrite</span>';
+      g += '<button class="pdf-inline-copy-btn" onclick="pdfCopyCard(this)">Copy</button>';
+      g += '</div>';
+      g += '<div class="pdf-new-text" contenteditable="true">' + escHtml(issue.now) + '</div>';
+      g += '</div></div>';
+      g += '<div class="pdf-card-foot">';
+      g += '<button class="pdf-foot-btn" onclick="pdfCopyCard(this)">Copy Rewrite</button>';
+      g += '<button class="pdf-foot-btn" onclick="pdfDismissCard(this)">Dismiss</button>';
+      g += '</div></div>';
+    });
+    return g;
+  }
+
+  html += renderGroup(high, 'High Priority');
+  html += renderGroup(med, 'Medium Priority');
+  html += renderGroup(low, 'Low Priority');
+  html += '<div class="xp-toast" style="margin-top:14px;">⬡ +30 XP EARNED — LINKEDIN PDF ANALYSED</div>';
+
+  document.getElementById('pdf-output-wrap').innerHTML = html;
+  document.getElementById('pdf-output-wrap').classList.add('visible');
+}
+
+function escHtml(str) {
+  if (!str) return '';
+  return String(str).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
+
+export function pdfToggleCompare(btn) {
+  const card = btn.closest('.pdf-issue-card');
+  const dg = card.querySelector('.pdf-diff-grid');
+  const old = card.querySelector('.pdf-diff-old');
+  const open = old.classList.toggle('visible');
+  dg.classList.toggle('split', open);
+  btn.textContent = open ? 'Hide Original' : 'Compare';
+  btn.classList.toggle('open', open);
+}
+
+export function pdfCopyCard(btn) {
+  const card = btn.closest('.pdf-issue-card');
+  const text = card.querySelector('.pdf-new-text').innerText;
+  navigator.clipboard.writeText(text).then(() => {
+    const orig = btn.textContent;
+    btn.textContent = '✓ Copied';
+    setTimeout(() => btn.textContent = orig, 1500);
+  });
+}
+
+export function pdfDismissCard(btn) {
+  const card = btn.closest('.pdf-issue-card');
+  card.style.opacity = '0.3';
+  btn.classList.add('dismissed');
+  btn.textContent = 'Dismissed';
+  card.querySelector('.pdf-foot-btn:first-child').classList.add('dismissed');
+}
+
+export function pdfCopyAll() {
+  const texts = [];
+  document.querySelectorAll('.pdf-new-text').forEach(el => {
+    texts.push(el.innerText.trim());
+  });
+  navigator.clipboard.writeText(texts.join('\n\n')).then(() => {
+    const btn = document.querySelector('.pdf-copy-all-btn');
+    btn.textContent = '✓ All Copied';
+    setTimeout(() => btn.textContent = 'Copy All →', 1800);
+  });
+}
+
+export function init() {
+  wirePdfDropZone();
+  initPdfPopup();
+}
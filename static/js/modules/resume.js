@@ -0,0 +1,111 @@
+// static/js/modules/resume.js
+// ───────────────────────────
+// Resume Roaster: roast a pasted or form-filled resume, or build one from
+// scratch. Markup in templates/modules/resume.html.
+
+let resumeCurrentMode = 'paste';
+let resumeMainTab = 'check'; // 'check' | 'create'
+
+export function switchResumeMainMode(tab) {
+  resumeMainTab = tab;
+  document.getElementById('resume-main-check').classList.toggle('active', tab === 'check');
+  document.getElementById('resume-main-create').classList.toggle('active', tab === 'create');
+  document.getElementById('resume-tab-check').classList.toggle('active', tab === 'check');
+  document.getElementById('resume-tab-create').classList.toggle('active', tab === 'create');
+  const btn = document.getElementById('resume-submit-btn');
+  const sub = document.getElementById('resume-modal-sub');
+  if (tab === 'create') {
+    resumeCurrentMode = 'create';
+    btn.innerText = 'BUILD MY RESUME 📄';
+    btn.dataset.label = 'BUILD MY RESUME 📄';
+    sub.innerText = '// tell us who you are. we\'ll write the resume.';
+  } else {
+    resumeCurrentMode = 'paste';
+    btn.innerText = 'ROAST MY RESUME 📄';
+    btn.dataset.label = 'ROAST MY RESUME 📄';
+    sub.innerText = '// we\'ll fix it. but we won\'t be nice about it.';
+    // restore sub-mode
+    switchResumeMode(resumeCurrentMode === 'create' ? 'paste' : resumeCurrentMode);
+  }
+}
+
+export function switchResumeMode(mode) {
+  resumeCurrentMode = mode;
+  document.getElementById('resume-mode-paste').classList.toggle('active', mode === 'paste');
+  document.getElementById('resume-mode-form').classList.toggle('active', mode === 'form');
+  document.getElementById('btn-paste').classList.toggle('active', mode === 'paste');
+  document.getElementById('btn-form').classList.toggle('active', mode === 'form');
+}
+
+export async function submitResume(btn, fresh = false) {
+  const comic = document.getElementById('resume-comic').value;
+  let body = { comic };
+  if (fresh) body.fresh = true;
+
+  if (resumeMainTab === 'create') {
+    body.mode = 'create';
+    const name = document.getElementById('create-name').value.trim();
+    if (!name) return alert('Fill in at least your name!');
+    body.name = name;
+    body.role = document.getElementById('create-role').value;
+    body.experience = document.getElementById('create-experience').value;
+    body.projects = document.getElementById('create-projects').value;
+    body.skills = document.getElementById('create-skills').value;
+    body.education = document.getElementById('create-education').value;
+  } else if (resumeCurrentMode === 'paste') {
+    body.mode = 'paste';
+    const text = document.getElementById('resume-text').value.trim();
+    if (!text) return alert('Paste your resume first!');
+    body.resume_text = text;
+  } else {
+    body.mode = 'form';
+    const name = document.getElementById('form-name').value.trim();
+    if (!name) return alert('Fill in at least your name!');
+    body.name = name;
+    body.role = document.getElementById('form-role').value;
+    body.experience = document.getElementById('form-experience').value;
+    body.projects = document.getElementById('form-projects').value;
+    body.skills = document.getElementById('form-skills').value;
+    body.education = document.getElementById('form-education').value;
+  }
+
+  btn.dataset.label = btn.innerText;
+  setLoading(btn, true);
+  const data = await callAPI('/api/resume', body);
+  setLoading(btn, false);
+
+  const raw = data.message || '';
+  let retry = false;
+  document.getElementById('resume-verdict-waiting').style.display = 'none';
+  document.getElementById('resume-verdict-result').style.display = 'flex';
+
+  if (resumeMainTab === 'create') {
+    const match = raw.match(/(?:\[CREATED\])([\s\S]*?)$/i);
+    const createdText = match ? match[1].trim() : raw;
+    document.getElementById('resume-roast-section').style.display = 'none';
+    document.getElementById('resume-fixed-label').innerText = '// your resume — ready to use';
+    document.getElementById('resume-fixed-text').innerText = createdText;
+    document.getElementById('resume-why-section').style.display = 'none';
+  } else {
+    document.getElementById('resume-roast-section').style.display = '';
+    document.getElementById('resume-fixed-label').innerText = '// fixed version';
+    const roastMatch = raw.match(/(?:\[ROAST\]|#\s*ROAST)([\s\S]*?)(?=(?:\[FIXED\]|#\s*FIXED|\[WHY\]|#\s*WHY)|$)/i);
+    const fixedMatch = raw.match(/(?:\[FIXED\]|#\s*FIXED)([\s\S]*?)(?=(?:\[WHY\]|#\s*WHY)|$)/i);
+    const whyMatch = raw.match(/(?:\[WHY\]|#\s*WHY)([\s\S]*?)$/i);
+    document.getElementById('resume-roast-text').innerText = roastMatch ? roastMatch[1].trim() : raw;
+    document.getElementById('resume-fixed-text').innerText = fixedMatch ? fixedMatch[1].trim() : '(no fix returned — hit regenerate)';
+    retry = !fixedMatch;
+    if (whyMatch && whyMatch[1].trim()) {
+      document.getElementById('resume-why-text').innerText = whyMatch[1].trim();
+      document.getElementById('resume-why-section').style.display = 'block';
+    } else {
+      document.getElementById('resume-why-section').style.display = 'none';
+    }
+  }
+  showHistoryNote('resume-history-note', data, retry);
+
+  const earned = addXP(35, null, data.stats);
+  document.getElementById('resume-xp').innerText = `+${earned} XP earned!`;
+  showXPFloat(earned, btn);
+  document.getElementById('resume-share-btn').classList.add('visible');
+}
@@ -0,0 +1,313 @@
+// static/js/modules/share.js
+// ──────────────────────────
+// Share card: renders a tool's result onto a canvas (two templates, three
+// aspect ratios) for download. Markup in templates/modules/share.html;
+// loaded by the first SHARE RESULT click (lazyEntry in index.html).
+
+let shareTemplate = 'halftone';
+let shareRatio = '1:1';
+let shareData = {};
+
+const SHARE_RATIOS = {
+  '1:1': { w: 600, h: 600 },
+  '4:5': { w: 600, h: 750 },
+  '9:16': { w: 600, h: 1067 },
+};
+
+const TOOL_META = {
+  roaster: { name: 'LINKEDIN REALITY CHECK', icon: '💼', color: '#0077b5' },
+  idea: { name: 'IDEA CHECKER', icon: '💡', color: '#ff6b6b' },
+  stack: { name: 'STACK PICKER', icon: '⚙️', color: '#00e676' },
+  resume: { name: 'RESUME ROASTER', icon: '📄', color: '#a855f7' },
+};
+
+export function openSharePanel(tool) {
+  let resultText = '';
+  if (tool === 'resume') {
+    const roast = document.getElementById('resume-roast-text')?.innerText || '';
+    const fixed = document.getElementById('resume-fixed-text')?.innerText || '';
+    resultText = roast; // share the roast section
+  } else {
+    const textEl = document.getElementById(tool === 'roaster' ? 'roaster-text' : tool + '-text');
+    resultText = textEl ? textEl.innerText : '';
+  }
+  const comic = (tool === 'roaster' || tool === 'resume')
+    ? document.getElementById(tool + '-comic')?.options[document.getElementById(tool + '-comic')?.selectedIndex]?.text
+    : '';
+  const lvl = getCurrentLevel();
+  shareData = {
+    tool,
+    text: resultText,
+    comic: comic || '',
+    color: TOOL_META[tool].color,
+    toolName: TOOL_META[tool].name,
+    icon: TOOL_META[tool].icon,
+    level: `LVL ${lvl.idx + 1} — ${lvl.name}`,
+    xp: xp + ' XP',
+  };
+  document.getElementById('shareOverlay').classList.add('active');
+  document.body.style.overflow = 'hidden';
+  renderShareCard();
+}
+
+export function closeSharePanel() {
+  document.getElementById('shareOverlay').classList.remove('active');
+  document.body.style.overflow = '';
+}
+
+export function setShareTemplate(t) {
+  shareTemplate = t;
+  document.querySelectorAll('.share-switch-btn').forEach(b => b.classList.remove('active'));
+  document.getElementById('tmpl-' + t).classList.add('active');
+  renderShareCard();
+}
+
+export function setShareRatio(r) {
+  shareRatio = r;
+  document.querySelectorAll('.share-ratio-btn').forEach(b => b.classList.remove('active'));
+  const map = { '1:1': 'ratio-1', '4:5': 'ratio-2', '9:16': 'ratio-3' };
+  document.getElementById(map[r]).classList.add('active');
+  renderShareCard();
+}
+
+function renderShareCard() {
+  const canvas = document.getElementById('shareCard');
+  const { w, h } = SHARE_RATIOS[shareRatio];
+  canvas.width = w;
+  canvas.height = h;
+  const ctx = canvas.getContext('2d');
+  if (shareTemplate === 'halftone') drawShareHalftone(ctx, w, h);
+  else drawShareMesh(ctx, w, h);
+}
+
+function drawShareHalftone(ctx, w, h) {
+  ctx.fillStyle = '#0a0a0a';
+  ctx.fillRect(0, 0, w, h);
+
+  // Halftone dots — fade from center
+  const dotSpacing = 22;
+  const maxR = 5;
+  const centerX = w * 0.5;
+  const centerY = h * 0.5;
+  const maxDist = Math.sqrt(w * w + h * h) * 0.32;
+  for (let x = 0; x < w + dotSpacing; x += dotSpacing) {
+    for (let y = 0; y < h + dotSpacing; y += dotSpacing) {
+      const dist = Math.sqrt((x - centerX) ** 2 + (y - centerY) ** 2);
+      const t = Math.min(dist / maxDist, 1);
+      const fade = t * t;
+      const r = maxR * t * 1.2;
+      const opacity = fade * 0.18;
+      if (r > 0.3 && opacity > 0.01) {
+        ctx.beginPath();
+        ctx.arc(x, y, Math.min(r, maxR), 0, Math.PI * 2);
+        ctx.fillStyle = `rgba(255,77,0,${opacity})`;
+        ctx.fill();
+      }
+    }
+  }
+
+  // Top accent bar
+  ctx.fillStyle = shareData.color;
+  ctx.fillRect(0, 0, w, 6);
+
+  const pad = w * 0.1;
+  const topY = h * 0.12;
+
+  // Tool label (left)
+  ctx.font = `${w * 0.035}px 'DM Mono', monospace`;
+  ctx.fillStyle = 'rgba(255,255,255,0.35)';
+  ctx.fillText('// ' + shareData.toolName, pad, topY);
+
+  // XP + Level badge — below tool name to avoid overlap
+  const levelY = topY + w * 0.052;
+  ctx.textAlign = 'right';
+  ctx.font = `bold ${w * 0.036}px 'Bebas Neue', sans-serif`;
+  ctx.fillStyle = '#ffcc00';
+  ctx.fillText('⚡ ' + shareData.level, w - pad, levelY);
+  ctx.font = `${w * 0.024}px 'DM Mono', monospace`;
+  ctx.fillStyle = 'rgba(255,204,0,0.55)';
+  ctx.fillText(shareData.xp, w - pad, levelY + w * 0.038);
+  ctx.textAlign = 'left';
+
+  // Icon
+  ctx.font = `${w * 0.07}px Arial`;
+  ctx.fillText(shareData.icon, pad, topY + w * 0.1);
+
+  // Comic style
+  if (shareData.comic) {
+    ctx.font = `500 ${w * 0.03}px 'DM Sans', sans-serif`;
+    ctx.fillStyle = shareData.color;
+    ctx.fillText(shareData.comic, pad + w * 0.1, topY + w * 0.082);
+  }
+
+  // Divider
+  const lineY = topY + w * 0.13;
+  ctx.strokeStyle = 'rgba(255,255,255,0.1)';
+  ctx.lineWidth = 1;
+  ctx.beginPath();
+  ctx.moveTo(pad, lineY);
+  ctx.lineTo(w - pad, lineY);
+  ctx.stroke();
+
+  // Result text — bounded region
+  const bottomY = h - h * 0.1;
+  const textY = lineY + h * 0.07;
+  const fontSize = Math.min(w * 0.042, h * 0.028);
+  const textMaxY = bottomY - h * 0.06;
+  ctx.font = `300 ${fontSize}px 'DM Sans', sans-serif`;
+  ctx.fillStyle = '#e0e0e0';
+  wrapShareText(ctx, shareData.text, pad, textY, w - pad * 2, fontSize * 1.8, textMaxY);
+
+  // Watermark only at bottom
+  ctx.font = `${w * 0.048}px 'Bebas Neue', sans-serif`;
+  ctx.fillStyle = 'rgba(255,255,255,0.28)';
+  ctx.textAlign = 'right';
+  ctx.fillText('ANVIL', w - pad, bottomY + h * 0.035);
+  ctx.textAlign = 'left';
+
+  // Bottom accent
+  ctx.fillStyle = shareData.color;
+  ctx.fillRect(0, h - 4, w, 4);
+}
+
+function drawShareMesh(ctx, w, h) {
+  ctx.fillStyle = '#080808';
+  ctx.fillRect(0, 0, w, h);
+
+  const blobs = [
+    { x: w * 0.2, y: h * 0.2, r: w * 0.55, c: 'rgba(255,77,0,0.12)' },
+    { x: w * 0.8, y: h * 0.5, r: w * 0.45, c: 'rgba(255,100,20,0.08)' },
+    { x: w * 0.3, y: h * 0.8, r: w * 0.5, c: 'rgba(255,60,0,0.1)' },
+    { x: w * 0.7, y: h * 0.15, r: w * 0.3, c: 'rgba(255,180,0,0.06)' },
+  ];
+  blobs.forEach(b => {
+    const grad = ctx.createRadialGradient(b.x, b.y, 0, b.x, b.y, b.r);
+    grad.addColorStop(0, b.c);
+    grad.addColorStop(1, 'transparent');
+    ctx.fillStyle = grad;
+    ctx.fillRect(0, 0, w, h);
+  });
+
+  ctx.strokeStyle = 'rgba(255,77,0,0.05)';
+  ctx.lineWidth = 0.5;
+  for (let x = 0; x < w; x += 40) { ctx.beginPath(); ctx.moveTo(x, 0); ctx.lineTo(x, h); ctx.stroke(); }
+  for (let y = 0; y < h; y += 40) { ctx.beginPath(); ctx.moveTo(0, y); ctx.lineTo(w, y); ctx.stroke(); }
+
+  const cp = w * 0.08, cx = cp, cy = h * 0.08, cw = w - cp * 2, ch = h - h * 0.16;
+  ctx.fillStyle = 'rgba(255,255,255,0.03)';
+  shareRoundRect(ctx, cx, cy, cw, ch, 12); ctx.fill();
+  ctx.strokeStyle = 'rgba(255,77,0,0.25)'; ctx.lineWidth = 1;
+  shareRoundRect(ctx, cx, cy, cw, ch, 12); ctx.stroke();
+  ctx.fillStyle = shareData.color;
+  shareRoundRect(ctx, cx, cy, cw, 3, [12, 12, 0, 0]); ctx.fill();
+
+  const pad = cx + cw * 0.1;
+  const topY = cy + ch * 0.12;
+
+  // Tool label (left)
+  ctx.font = `${w * 0.033}px 'DM Mono', monospace`;
+  ctx.fillStyle = 'rgba(255,255,255,0.3)';
+  ctx.fillText('// ' + shareData.toolName, pad, topY);
+
+  // XP + Level badge — below tool name to avoid overlap
+  const badgeX = cx + cw - cw * 0.1;
+  const meshLevelY = topY + w * 0.052;
+  ctx.textAlign = 'right';
+  ctx.font = `bold ${w * 0.036}px 'Bebas Neue', sans-serif`;
+  ctx.fillStyle = '#ffcc00';
+  ctx.fillText('⚡ ' + shareData.level, badgeX, meshLevelY);
+  ctx.font = `${w * 0.024}px 'DM Mono', monospace`;
+  ctx.fillStyle = 'rgba(255,204,0,0.55)';
+  ctx.fillText(shareData.xp, badgeX, meshLevelY + w * 0.038);
+  ctx.textAlign = 'left';
+
+  // Icon + comic
+  ctx.font = `${w * 0.07}px Arial`;
+  ctx.fillText(shareData.icon, pad, topY + w * 0.1);
+
+  if (shareData.comic) {
+    ctx.font = `500 ${w * 0.03}px 'DM Sans', sans-serif`;
+    ctx.fillStyle = shareData.color;
+    ctx.fillText(shareData.comic, pad + w * 0.1, topY + w * 0.082);
+  }
+
+  // Divider
+  const lineY = topY + w * 0.13;
+  ctx.strokeStyle = 'rgba(255,77,0,0.2)'; ctx.lineWidth = 1;
+  ctx.beginPath(); ctx.moveTo(pad, lineY); ctx.lineTo(cx + cw - cw * 0.1, lineY); ctx.stroke();
+
+  // Result text — bounded region
+  const bottomY = cy + ch - ch * 0.08;
+  const textMaxY = bottomY - ch * 0.08;
+  const fontSize = Math.min(w * 0.04, h * 0.026);
+  ctx.font = `300 ${fontSize}px 'DM Sans', sans-serif`;
+  ctx.fillStyle = '#d0d0d0';
+  wrapShareText(ctx, shareData.text, pad, lineY + ch * 0.07, cw * 0.8, fontSize * 1.85, textMaxY);
+
+  // Watermark bottom right only
+  ctx.font = `${w * 0.044}px 'Bebas Neue', sans-serif`;
+  ctx.fillStyle = 'rgba(255,255,255,0.28)';
+  ctx.textAlign = 'right';
+  ctx.fillText('ANVIL', cx + cw - cw * 0.1, bottomY + ch * 0.03);
+  ctx.textAlign = 'left';
+}
+
+function wrapShareText(ctx, text, x, y, maxWidth, lineHeight, maxY) {
+  if (!text) return;
+  const words = text.split(' ');
+  let line = '', curY = y;
+  const ellipsis = '...';
+  for (let i = 0; i < words.length; i++) {
+    const test = line + words[i] + ' ';
+    if (ctx.measureText(test).width > maxWidth && i > 0) {
+      // Check if next line would exceed maxY
+      if (maxY && curY + lineHeight > maxY) {
+        // Truncate current line with ellipsis
+        while (ctx.measureText(line + ellipsis).width > maxWidth && line.length > 0) {
+          line = line.slice(0, -1);
+        }
+        ctx.fillText(line.trim() + ellipsis, x, curY);
+        return;
+      }
+      ctx.fillText(line, x, curY);
+      line = words[i] + ' ';
+      curY += lineHeight;
+    } else { line = test; }
+  }
+  // Final line — truncate if needed
+  if (maxY && curY > maxY) return;
+  if (ctx.measureText(line).width > maxWidth) {
+    while (ctx.measureText(line + ellipsis).width > maxWidth && line.length > 0) {
+      line = line.slice(0, -1);
+    }
+    ctx.fillText(line.trim() + ellipsis, x, curY);
+  } else {
+    ctx.fillText(line, x, curY);
+  }
+}
+
+function shareRoundRect(ctx, x, y, w, h, r) {
+  if (typeof r === 'number') r = [r, r, r, r];
+  ctx.beginPath();
+  ctx.moveTo(x + r[0], y);
+  ctx.lineTo(x + w - r[1], y); ctx.quadraticCurveTo(x + w, y, x + w, y + r[1]);
+  ctx.lineTo(x + w, y + h - r[2]); ctx.quadraticCurveTo(x + w, y + h, x + w - r[2], y + h);
+  ctx.lineTo(x + r[3], y + h); ctx.quadraticCurveTo(x, y + h, x, y + h - r[3]);
+  ctx.lineTo(x, y + r[0]); ctx.quadraticCurveTo(x, y, x + r[0], y);
+  ctx.closePath();
+}
+
+export function downloadShareCard() {
+  const canvas = document.getElementById('shareCard');
+  const link = document.createElement('a');
+  link.download = `anvil-${shareTemplate}-${shareRatio.replace(':', '-')}.png`;
+  link.href = canvas.toDataURL('image/png');
+  link.click();
+}
+
+export function init() {
+  // Close share on overlay click
+  document.getElementById('shareOverlay').addEventListener('click', e => {
+    if (e.target === document.getElementById('shareOverlay')) closeSharePanel();
+  });
+}
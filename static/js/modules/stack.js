@@ -0,0 +1,83 @@
+// static/js/modules/stack.js
+// ──────────────────────────
+// Stack Picker: pick a stack for a project, or suggest a project from the
+// three-step questionnaire. Markup in templates/modules/stack.html.
+
+let stackMode = 'check';
+
+// ── Questionnaire nav ──
+let stackQStep = 0;
+const STACK_STEP_LABELS = ['Step 1 of 3 — Your level', 'Step 2 of 3 — Your goal', 'Step 3 of 3 — Interests & constraints'];
+
+export function stackNextStep(to) {
+  document.getElementById('stack-qp-' + stackQStep).classList.remove('active');
+  document.getElementById('stack-dot-' + stackQStep).classList.remove('active');
+  document.getElementById('stack-dot-' + stackQStep).classList.add('done');
+  stackQStep = to;
+  document.getElementById('stack-qp-' + stackQStep).classList.add('active');
+  document.getElementById('stack-dot-' + stackQStep).classList.add('active');
+  if (stackQStep < 3) document.getElementById('stack-dot-' + stackQStep).classList.remove('done');
+  document.getElementById('stack-q-label').innerText = STACK_STEP_LABELS[stackQStep];
+}
+
+export function switchStackMode(mode) {
+  stackMode = mode;
+  document.getElementById('stack-mode-check').classList.toggle('active', mode === 'check');
+  document.getElementById('stack-mode-create').classList.toggle('active', mode === 'create');
+  document.getElementById('stack-tab-check').classList.toggle('active', mode === 'check');
+  document.getElementById('stack-tab-create').classList.toggle('active', mode === 'create');
+  const btn = document.getElementById('stack-submit-btn');
+  if (mode === 'create') {
+    btn.innerText = 'SUGGEST A PROJECT ⚙️';
+    btn.dataset.label = 'SUGGEST A PROJECT ⚙️';
+  } else {
+    btn.innerText = 'PICK MY STACK ⚙️';
+    btn.dataset.label = 'PICK MY STACK ⚙️';
+  }
+}
+
+export async function submitStack(fresh = false) {
+  const btn = document.getElementById('stack-submit-btn');
+  const comic = document.getElementById('roaster-comic') ? document.getElementById('roaster-comic').value : 'abhishek_upmanyu';
+  setLoading(btn, true);
+  const extra = fresh ? { fresh: true } : {};
+
+  let data;
+  if (stackMode === 'create') {
+    const interests = document.getElementById('stack-interests').value.trim();
+    const shipped = document.getElementById('stack-shipped').value.trim();
+    const known = document.getElementById('stack-known').value.trim();
+    const learn = document.getElementById('stack-learn').value.trim();
+    const exp = getChipValue('stack-chips-exp');
+    const pref = getChipValue('stack-chips-pref');
+    const goal = getChipValue('stack-chips-goal');
+    const time = getChipValue('stack-chips-time');
+    const deadline = getChipValue('stack-chips-deadline');
+    if (!interests) { setLoading(btn, false); return alert('Tell us what domains interest you!'); }
+    data = await callAPI('/api/stack', { mode: 'create', interests, shipped, known, learn, exp, pref, goal, time, deadline, comic, ...extra });
+  } else {
+    const project = document.getElementById('stack-project').value;
+    const level = document.getElementById('stack-level').value;
+    const priority = document.getElementById('stack-priority').value;
+    if (!project) { setLoading(btn, false); return alert('Describe your project!'); }
+    data = await callAPI('/api/stack', { mode: 'check', project, level, priority, comic, ...extra });
+  }
+
+  setLoading(btn, false);
+  document.getElementById('stack-verdict-waiting').style.display = 'none';
+  document.getElementById('stack-verdict-result').style.display = 'block';
+
+  const raw = data.message || '';
+  if (stackMode === 'create') {
+    const match = raw.match(/(?:\[CREATED\])([\s\S]*?)$/i);
+    document.getElementById('stack-text').innerText = match ? match[1].trim() : raw;
+  } else {
+    document.getElementById('stack-text').innerText = raw;
+  }
+  showHistoryNote('stack-history-note', data);
+
+  const earned = addXP(20, null, data.stats);
+  document.getElementById('stack-xp').innerText = `+${earned} XP earned!`;
+  showXPFloat(earned, btn);
+  document.getElementById('stack-share-btn').classList.add('visible');
+}
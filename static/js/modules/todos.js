@@ -0,0 +1,61 @@
+// static/js/modules/todos.js
+// ──────────────────────────
+// The hero to-do list (localStorage only). Its markup is part of the shell;
+// loadModule('todos') runs on idle, or on the first add / tab switch.
+
+let todos = JSON.parse(localStorage.getItem('anvil_todos') || '[]');
+
+function saveTodos() { localStorage.setItem('anvil_todos', JSON.stringify(todos)); }
+
+function renderTodos() {
+  const list = document.getElementById('todo-list');
+  const empty = document.getElementById('todo-empty');
+  list.innerHTML = '';
+  if (todos.length === 0) {
+    empty.style.display = 'block';
+    return;
+  }
+  empty.style.display = 'none';
+  todos.forEach((todo, i) => {
+    const li = document.createElement('li');
+    li.className = 'todo-item' + (todo.done ? ' done' : '');
+    li.innerHTML = `
+      <span class="todo-check" onclick="toggleTodo(${i})">${todo.done ? '✓' : '○'}</span>
+      <span class="todo-text">${todo.text}</span>
+      <button class="todo-delete" onclick="deleteTodo(${i})">✕</button>`;
+    list.appendChild(li);
+  });
+}
+
+export function addTodo() {
+  const input = document.getElementById('todo-input');
+  const text = input.value.trim();
+  if (!text) return;
+  todos.unshift({ text, done: false });
+  saveTodos();
+  renderTodos();
+  input.value = '';
+}
+
+export function toggleTodo(i) {
+  todos[i].done = !todos[i].done;
+  saveTodos();
+  renderTodos();
+}
+
+export function deleteTodo(i) {
+  todos.splice(i, 1);
+  saveTodos();
+  renderTodos();
+}
+
+export function switchTodoTab(tab) {
+  document.getElementById('todo-personal').classList.toggle('active', tab === 'personal');
+  document.getElementById('todo-roadmap').classList.toggle('active', tab === 'roadmap');
+  document.getElementById('tab-personal').classList.toggle('active', tab === 'personal');
+  document.getElementById('tab-roadmap').classList.toggle('active', tab === 'roadmap');
+}
+
+export function init() {
+  renderTodos();
+}
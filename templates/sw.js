@@ -0,0 +1,139 @@
+// templates/sw.js
+// ───────────────
+// Service worker, served at /sw.js (app.py) with the shell version baked in
+// so every index.html change ships a new worker and a fresh shell cache.
+//
+//   /                       stale-while-revalidate — repeat visits render from
+//                           cache at once, the fresh page is cached for next time
+//   tool modules            cache-first; the versioned /modules/*.html and
+//                           /static/js/modules/*.js are precached on install so
+//                           a cached shell always opens tools of its own version
+//
+// A new worker waits (no skipWaiting) until no page runs the old shell: the
+// old worker keeps serving that shell's modules from its cache, and only
+// then does activate drop the old cache — an old shell never gets fetched
+// new module code under its old ?v=.
+//   leaderboards, stats     stale-while-revalidate; when the network copy
+//                           differs the page gets {type: "anvil-swr", url} and
+//                           re-renders
+//   tool responses          network only; their `stats` are folded into the
+//                           cached /api/user/stats so it never lags a roast
+//   Google Fonts            cache-first (the files are immutable)
+//   /auth/*                 drops the per-user caches before the sign in/out
+//                           navigation, since the shell and stats are per user
+
+const VERSION     = '{{ version }}';
+const SHELL_CACHE = `anvil-shell-${VERSION}`;
+const USER_CACHE  = 'anvil-user';
+const FONT_CACHE  = 'anvil-fonts';
+
+const SWR_PATHS  = ['/api/leaderboard', '/api/leaderboard/weekly', '/api/leaderboard/personal', '/api/user/stats'];
+const TOOL_PATHS = ['/api/linkedin', '/api/idea', '/api/stack', '/api/resume', '/api/linkedin-pdf'];
+const FONT_HOSTS = ['fonts.googleapis.com', 'fonts.gstatic.com'];
+const MODULE_URLS = [
+  ...{{ module_markup | tojson }}.map(name => `/modules/${name}.html?v=${VERSION}`),
+  ...{{ modules | tojson }}.map(name => `/static/js/modules/${name}.js?v=${VERSION}`),
+];
+
+self.addEventListener('install', event => {
+  event.waitUntil(caches.open(SHELL_CACHE).then(cache => cache.addAll(['/', ...MODULE_URLS])));
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(keys
+        .filter(k => k.startsWith('anvil-shell-') && k !== SHELL_CACHE)
+        .map(k => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+});
+
+async function notify(url) {
+  const clients = await self.clients.matchAll({ type: 'window' });
+  clients.forEach(c => c.postMessage({ type: 'anvil-swr', url }));
+}
+
+// Serve the cached copy (if any) now, refresh the cache in the background.
+async function staleWhileRevalidate(event, cacheName, key, announce) {
+  const cache  = await caches.open(cacheName);
+  const cached = await cache.match(key);
+  const update = fetch(event.request).then(async res => {
+    if (res.ok) {
+      const changed = cached && (await cached.clone().text()) !== (await res.clone().text());
+      await cache.put(key, res.clone());
+      if (changed && announce) await notify(key);
+    } else if (res.status === 401) {
+      await cache.delete(key);   // signed out server-side — stop serving their stats
+    }
+    return res;
+  });
+  if (cached) {
+    event.waitUntil(update.catch(() => {}));
+    return cached;
+  }
+  return update;
+}
+
+async function cacheFirst(request, cacheName) {
+  const cached = await caches.match(request);
+  if (cached) return cached;
+  const res = await fetch(request);
+  if (res.ok || res.type === 'opaque') (await caches.open(cacheName)).put(request, res.clone());
+  return res;
+}
+
+// Tool responses carry the new XP totals; keep the cached stats in step.
+async function toolCall(request) {
+  const res = await fetch(request);
+  const type = res.headers.get('Content-Type') || '';
+  if (res.ok && type.startsWith('application/json')) {
+    res.clone().json().then(async data => {
+      if (!data || !data.stats) return;
+      const cache  = await caches.open(USER_CACHE);
+      const cached = await cache.match('/api/user/stats');
+      if (!cached) return;
+      const stats = { ...(await cached.json()), ...data.stats };
+      await cache.put('/api/user/stats', new Response(JSON.stringify(stats), {
+        headers: { 'Content-Type': 'application/json' },
+      }));
+    }).catch(() => {});
+  }
+  return res;
+}
+
+async function dropUserCaches() {
+  await caches.delete(USER_CACHE);
+  await (await caches.open(SHELL_CACHE)).delete('/');
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+
+  if (FONT_HOSTS.includes(url.hostname)) {
+    event.respondWith(cacheFirst(request, FONT_CACHE));
+    return;
+  }
+  if (url.origin !== self.location.origin) return;
+
+  if (url.pathname.startsWith('/auth/')) {
+    if (request.mode === 'navigate') event.respondWith(dropUserCaches().then(() => fetch(request)));
+    return;
+  }
+  if (request.method === 'GET' && request.mode === 'navigate' && url.pathname === '/') {
+    event.respondWith(staleWhileRevalidate(event, SHELL_CACHE, '/', false));
+    return;
+  }
+  if (request.method === 'GET' && MODULE_URLS.includes(url.pathname + url.search)) {
+    event.respondWith(cacheFirst(request, SHELL_CACHE));
+    return;
+  }
+  if (request.method === 'GET' && SWR_PATHS.includes(url.pathname)) {
+    event.respondWith(staleWhileRevalidate(event, USER_CACHE, url.pathname, true));
+    return;
+  }
+  if (request.method === 'POST' && TOOL_PATHS.includes(url.pathname)) {
+    event.respondWith(toolCall(request));
+  }
+});